@@ -1,9 +1,16 @@
 import streamlit as st
+from config.settings import settings
 from core.reactor_agent import create_reactor_agent
+from core.archives import ArchiveEntry, assign_output_names, iter_zip, safe_member_name
+from core.generation_tasks import create_generation_executor
 from core.image_processor import create_image_processor
+from core.result_store import get_session_result_store
+from core.upload_pipeline import create_speculative_preprocessor
 from utils.validators import validate_prompt
-import io
-import time
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Optional
+import atexit
 import traceback
 # Add to imports
 from utils.spell_checker import check_style_prompt, display_spelling_help, spell_checker
@@ -36,6 +43,30 @@ MENU_BOTTOM = """
 
 PIXEL_DIVIDER = "▓▒░" * 25
 
+# Preprocessed uploads kept in memory, keyed by content hash
+UPLOAD_CACHE_ENTRIES = 16
+PREPROCESS_WORKERS = 2
+PREPROCESS_POLL_INTERVAL = 0.3  # seconds between checks while an upload preprocesses
+
+# Batch mode: several uploads go through the same bounded pools as single images
+BATCH_MAX_FILES = 50
+BATCH_GRID_COLUMNS = 4
+
+# Background generations running at once (the agent's rate limit still applies)
+GENERATION_WORKERS = 4
+GENERATION_POLL_INTERVAL = 0.5  # seconds between progress refreshes
+
+# Progress bar position and label per generation stage
+STAGE_PROGRESS = {
+    'preprocess': (0.10, "📊 Image preprocessed"),
+    'queued': (0.20, "⏳ Waiting for a free reactor slot"),
+    'rate_limit_wait': (0.30, "🚦 Waiting for the API rate limit"),
+    'api_call': (0.50, "🔄 Reactor Agent is transforming your image"),
+    'retry': (0.40, "🔁 Retrying after an error"),
+    'done': (1.00, "✅ Transformation complete"),
+    'failed': (1.00, "❌ Transformation failed"),
+}
+
 # ============================================================================
 # CUSTOM CSS FOR VINTAGE 8-BIT AESTHETIC
 # ============================================================================
@@ -221,6 +252,42 @@ VINTAGE_CSS = """
 # ============================================================================
 
 
+@dataclass
+class SessionStats:
+    """Per-session view of generation outcomes; the agent itself is shared"""
+
+    success_count: int = 0
+    error_count: int = 0
+    generation_time: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def record_success(self, seconds: float):
+        self.success_count += 1
+        self.generation_time = seconds
+
+    def record_error(self, error: Optional[str] = None):
+        self.error_count += 1
+        if error:
+            self.last_error = error
+
+    @property
+    def generation_time_text(self) -> str:
+        return f"{self.generation_time:.2f}s" if self.generation_time is not None else 'N/A'
+
+
+@dataclass
+class StoredResult:
+    """Keys of a generated image and its preview in the session result store"""
+
+    key: str
+    display_key: str
+    image_info: dict
+
+    @property
+    def extension(self) -> str:
+        return self.image_info['format'].lower()
+
+
 class SessionStateManager:
     """Manage session state variables"""
 
@@ -230,13 +297,13 @@ class SessionStateManager:
         defaults = {
             'generated_image': None,
             'processing': False,
-            'error_count': 0,
-            'success_count': 0,
-            'last_error': None,
-            'generation_time': None,
+            'stats': SessionStats(),
             'uploaded_file_name': None,
-            'reactor_agent': None,
-            'image_processor': None
+            'preprocess_handles': {},
+            'batch': None,
+            'generation_task': None,
+            'generation_prompt': None,
+            'generation_outcome': None
         }
 
         for key, value in defaults.items():
@@ -248,7 +315,10 @@ class SessionStateManager:
         """Reset session state"""
         st.session_state.generated_image = None
         st.session_state.processing = False
-        st.session_state.generation_time = None
+        st.session_state.generation_task = None
+        st.session_state.generation_outcome = None
+        st.session_state.batch = None
+        st.session_state.stats.generation_time = None
         st.session_state.uploaded_file_name = None
 
 # ============================================================================
@@ -263,14 +333,15 @@ def display_ascii_banner():
 
 def display_stats_panel():
     """Display statistics panel"""
+    stats = st.session_state.stats
     stats_html = f"""
     <div class="status-box">
     ╔════════════════════════════════════════════════════════════════╗
     ║  📊 SESSION STATISTICS                                        ║
     ╠════════════════════════════════════════════════════════════════╣
-    ║  ✅ Successful Generations: {st.session_state.success_count:03d}                     ║
-    ║  ❌ Failed Attempts: {st.session_state.error_count:03d}                              ║
-    ║  ⏱️  Last Generation Time: {st.session_state.generation_time or 'N/A':>20} ║
+    ║  ✅ Successful Generations: {stats.success_count:03d}                     ║
+    ║  ❌ Failed Attempts: {stats.error_count:03d}                              ║
+    ║  ⏱️  Last Generation Time: {stats.generation_time_text:>20} ║
     ╚════════════════════════════════════════════════════════════════╝
     </div>
     """
@@ -282,13 +353,311 @@ def display_pixel_divider():
     st.markdown(f'<div class="pixel-divider">{PIXEL_DIVIDER}</div>', unsafe_allow_html=True)
 
 
-def initialize_components():
-    """Initialize Reactor Agent and Image Processor"""
-    if st.session_state.reactor_agent is None:
-        st.session_state.reactor_agent = create_reactor_agent()
+@st.cache_resource(show_spinner=False)
+def get_shared_components():
+    """
+    Reactor Agent and Image Processor shared by every browser session
+
+    Built once per process, so all sessions reuse one API client and one
+    rate limiter. Both objects are thread-safe; per-session numbers live in
+    SessionStats.
+    """
+    reactor_agent = create_reactor_agent()
+    image_processor = create_image_processor()
+    atexit.register(reactor_agent.close)
+    return reactor_agent, image_processor
+
+
+@st.cache_resource(show_spinner=False)
+def get_generation_executor():
+    """Thread pool running generations off the script thread, shared by every session"""
+    reactor_agent, _ = get_shared_components()
+    executor = create_generation_executor(reactor_agent, max_workers=GENERATION_WORKERS)
+    atexit.register(executor.shutdown)
+    return executor
+
+
+@st.cache_resource(show_spinner=False)
+def get_upload_preprocessor():
+    """
+    Background upload preprocessing with a digest-keyed cache, shared by every session
+
+    Reruns and other sessions uploading the same file reuse the result, so
+    the image is decoded and encoded once rather than on every interaction.
+    """
+    _, image_processor = get_shared_components()
+    preprocessor = create_speculative_preprocessor(
+        image_processor, max_workers=PREPROCESS_WORKERS, max_entries=UPLOAD_CACHE_ENTRIES
+    )
+    atexit.register(preprocessor.shutdown)
+    return preprocessor
+
+
+def start_preprocessing(uploaded_files):
+    """
+    Speculatively preprocess new uploads while the prompt is being written
+
+    Work for replaced or removed uploads is cancelled.
+
+    Returns:
+        One PreprocessHandle per upload, in upload order
+    """
+    previous = st.session_state.preprocess_handles
+    handles = {}
+    for uploaded_file in uploaded_files:
+        upload_id = (getattr(uploaded_file, 'file_id', None)
+                     or (uploaded_file.name, uploaded_file.size))
+        handle = previous.pop(upload_id, None)
+        if handle is None:
+            handle = get_upload_preprocessor().submit(upload_id, uploaded_file.getvalue())
+        handles[upload_id] = handle
+
+    for handle in previous.values():
+        handle.cancel()
+    st.session_state.preprocess_handles = handles
+    return list(handles.values())
+
+
+@st.fragment(run_every=PREPROCESS_POLL_INTERVAL)
+def await_preprocessing(handle):
+    """Placeholder while an upload preprocesses; reruns the app once it is ready"""
+    if handle.done:
+        st.rerun()
+    st.info("⚙️ Preprocessing in the background... keep writing your prompt!")
+
+
+def _format_stage(event: dict, started_at: float) -> str:
+    """One line of the generation stage log"""
+    data = event['data']
+    detail = {
+        'preprocess': lambda: f"{data.get('width')}x{data.get('height')}",
+        'queued': lambda: f"{data.get('ahead', 0)} ahead",
+        'rate_limit_wait': lambda: f"{data.get('seconds', 0):.2f}s",
+        'api_call': lambda: f"attempt {data.get('attempt')}/{data.get('max_attempts')}",
+        'retry': lambda: f"waiting {data.get('wait')}s: {data.get('error', '')[:60]}",
+        'done': lambda: f"{data.get('seconds', 0):.2f}s API time",
+        'failed': lambda: data.get('error', '')[:80],
+    }.get(event['stage'], lambda: "")()
+    return f"+{event['at'] - started_at:6.2f}s  {event['stage'].upper():<16} {detail}"
+
+
+@st.fragment(run_every=GENERATION_POLL_INTERVAL)
+def display_generation_progress():
+    """Follow the session's background generation; reruns the app once it finishes"""
+    task = st.session_state.generation_task
+    if task is None:
+        return
+
+    if task.done:
+        finish_generation(task)
+        st.rerun()
+
+    events = task.events
+    fraction, label = STAGE_PROGRESS.get(task.stage, (0.0, task.stage))
+    st.progress(fraction, text=f"{label} ({task.elapsed:.1f}s)")
+    st.code("\n".join(_format_stage(event, task.submitted_at) for event in events))
+
+
+def store_result(prepared) -> StoredResult:
+    """Move a generated image and its preview out of memory into the shared store"""
+    store = get_session_result_store()
+    return StoredResult(store.put(prepared.image_bytes), store.put(prepared.display_bytes),
+                        prepared.image_info)
+
+
+def load_result(key: str) -> Optional[bytes]:
+    """Stored bytes, or None once evicted to stay within the store's budget"""
+    try:
+        return get_session_result_store().get(key)
+    except (KeyError, FileNotFoundError):
+        return None
+
+
+def finish_generation(task):
+    """Move a finished task's result or error into the session"""
+    stats = st.session_state.stats
+    st.session_state.generation_task = None
+    st.session_state.processing = False
+
+    if task.error is None:
+        _, image_processor = get_shared_components()
+        st.session_state.generated_image = store_result(
+            image_processor.prepare_generated(task.result)
+        )
+        stats.record_success(task.elapsed)
+        st.session_state.generation_outcome = {'success': True}
+    else:
+        stats.record_error(task.error)
+        st.session_state.generation_outcome = {
+            'success': False, 'error': task.error, 'details': task.error_details
+        }
+
+
+def display_generation_outcome():
+    """Announce the last finished generation once"""
+    outcome = st.session_state.generation_outcome
+    if outcome is None:
+        return
+    st.session_state.generation_outcome = None
+
+    if outcome['success']:
+        success_msg = f"""
+        <div class="status-box">
+        ✅ TRANSFORMATION COMPLETE!
+        ━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        Generation Time: {st.session_state.stats.generation_time_text}
+        Style Applied: {(st.session_state.generation_prompt or '')[:50]}...
+        Status: SUCCESS ✓
+        </div>
+        """
+        st.markdown(success_msg, unsafe_allow_html=True)
+        st.balloons()
+        return
+
+    st.error(f"""
+    ❌ TRANSFORMATION FAILED!
+
+    Error: {outcome['error']}
+
+    💡 Troubleshooting Tips:
+    • Try a simpler style prompt
+    • Check your internet connection
+    • Verify the image format
+    • Wait a moment and try again
+    """)
+
+    with st.expander("🔍 Technical Details"):
+        st.code(outcome['details'])
+
+
+def start_batch(uploaded_files, handles, style_prompt: str, **options):
+    """
+    Submit one background generation per upload
+
+    Every task shares the process-wide agent and the bounded executor, so
+    a batch runs GENERATION_WORKERS images at a time under the agent's rate
+    limit. Tasks wait for their own preprocessing, which may still be running.
+    """
+    generation_executor = get_generation_executor()
+    entries = [
+        ArchiveEntry(index=index, name=safe_member_name(uploaded_file.name) or f"image_{index}",
+                     path="")
+        for index, uploaded_file in enumerate(uploaded_files)
+    ]
+    assign_output_names(entries)
+
+    items = [
+        {'name': entry.name, 'output_name': entry.output_name, 'result': None, 'error': None,
+         'task': generation_executor.submit(handle.future, style_prompt, **options)}
+        for entry, handle in zip(entries, handles)
+    ]
+    return {'items': items, 'prompt': style_prompt, 'zip_key': None}
+
+
+def settle_batch(batch) -> bool:
+    """
+    Collect finished batch items into the session
+
+    Returns:
+        Whether every item has finished
+    """
+    stats = st.session_state.stats
+    _, image_processor = get_shared_components()
+    for item in batch['items']:
+        task = item['task']
+        if task is None or not task.done:
+            continue
+        if task.error is None:
+            item['result'] = store_result(image_processor.prepare_generated(task.result))
+            stats.record_success(task.elapsed)
+        else:
+            item['error'] = task.error
+            stats.record_error(task.error)
+        item['task'] = None
+    return all(item['task'] is None for item in batch['items'])
+
+
+def display_batch_grid(batch):
+    """Grid of batch items: results as they finish, the current stage otherwise"""
+    items = batch['items']
+    finished = sum(item['task'] is None for item in items)
+    st.progress(finished / len(items), text=f"{finished}/{len(items)} images finished")
+
+    columns = st.columns(BATCH_GRID_COLUMNS)
+    for index, item in enumerate(items):
+        with columns[index % BATCH_GRID_COLUMNS]:
+            preview = None
+            if item['result'] is not None:
+                preview = load_result(item['result'].display_key)
+            if preview is not None:
+                st.image(preview, caption=item['output_name'], use_container_width=True)
+            elif item['result'] is not None:
+                st.warning(f"⌛ {item['output_name']}: result expired from the cache")
+            elif item['error'] is not None:
+                st.error(f"❌ {item['name']}: {item['error']}")
+            else:
+                _, label = STAGE_PROGRESS.get(item['task'].stage, (0.0, item['task'].stage))
+                st.info(f"{item['name']}\n\n{label}")
+
+
+@st.fragment(run_every=GENERATION_POLL_INTERVAL)
+def display_batch_progress():
+    """Follow a running batch; reruns the app once every item has finished"""
+    batch = st.session_state.batch
+    if batch is None:
+        return
+
+    if settle_batch(batch):
+        st.session_state.processing = False
+        st.rerun()
+
+    display_batch_grid(batch)
+
+
+def _batch_zip_members(batch):
+    for item in batch['items']:
+        result = item['result']
+        data = load_result(result.key) if result is not None else None
+        if data is not None:
+            yield str(PurePosixPath(item['output_name']).with_suffix(f".{result.extension}")), data
+
+
+def display_batch_panel(uploaded_files, handles):
+    """Main area in batch mode"""
+    st.markdown("### 🗂️ BATCH TRANSFORMATION")
+    batch = st.session_state.batch
+
+    if batch is not None and st.session_state.processing:
+        display_batch_progress()
+        return
+
+    if batch is not None:
+        display_batch_grid(batch)
+        succeeded = sum(item['result'] is not None for item in batch['items'])
+        if succeeded:
+            zip_data = load_result(batch['zip_key']) if batch['zip_key'] else None
+            if zip_data is None:
+                # Streamed into the store once per batch, one member in memory at a time
+                batch['zip_key'] = get_session_result_store().put_stream(
+                    iter_zip(_batch_zip_members(batch))
+                )
+                zip_data = load_result(batch['zip_key'])
+            st.download_button(
+                label=f"📦 DOWNLOAD ALL {succeeded} IMAGES (ZIP)",
+                data=zip_data,
+                file_name="nanozilla_batch.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+        return
+
+    ready = sum(handle.done for handle in handles)
+    st.info(f"""
+    🗂️ {len(uploaded_files)} IMAGES UPLOADED ({ready} preprocessed)
 
-    if st.session_state.image_processor is None:
-        st.session_state.image_processor = create_image_processor()
+    Describe your style in the sidebar and click GENERATE to
+    transform them all in parallel!
+    """)
 
 
 # ============================================================================
@@ -314,7 +683,9 @@ def main():
 
     # Initialize session state
     SessionStateManager.initialize()
-    initialize_components()
+    reactor_agent, image_processor = get_shared_components()
+    generation_executor = get_generation_executor()
+    stats = st.session_state.stats
 
     # Display banner
     display_ascii_banner()
@@ -333,20 +704,30 @@ def main():
 
         # File upload section
         st.markdown("#### 📁 FILE UPLOAD")
-        uploaded_file = st.file_uploader(
-            "Select Image File",
+        uploaded_files = st.file_uploader(
+            "Select Image Files",
             type=['jpg', 'jpeg', 'png', 'webp'],
-            help="Upload a black & white or color image to transform",
+            accept_multiple_files=True,
+            help="Upload a black & white or color image to transform, or several for batch mode",
             label_visibility="collapsed"
-        )
+        ) or []
+
+        if len(uploaded_files) > BATCH_MAX_FILES:
+            st.warning(f"⚠️ Only the first {BATCH_MAX_FILES} images are processed")
+            uploaded_files = uploaded_files[:BATCH_MAX_FILES]
 
-        if uploaded_file:
-            try:
-                st.success(f"✓ {uploaded_file.name}")
-                st.session_state.uploaded_file_name = uploaded_file.name
-            except Exception as e:
-                st.error(f"✗ {str(e)}")
-                uploaded_file = None
+        # Start preprocessing before anything else renders
+        preprocess_handles = start_preprocessing(uploaded_files)
+
+        batch_mode = len(uploaded_files) > 1
+        uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+        preprocess_handle = preprocess_handles[0] if len(uploaded_files) == 1 else None
+
+        if batch_mode:
+            st.success(f"✓ {len(uploaded_files)} images (batch mode)")
+        elif uploaded_file:
+            st.success(f"✓ {uploaded_file.name}")
+            st.session_state.uploaded_file_name = uploaded_file.name
 
         st.markdown("---")
 
@@ -401,6 +782,12 @@ def main():
                 help="Number of retry attempts on failure"
             )
 
+            chroma_transfer = st.checkbox(
+                "Chroma Transfer",
+                value=settings.CHROMA_TRANSFER,
+                help="Generate from a small proxy and keep the original's full-resolution detail"
+            )
+
         st.markdown("---")
 
         # Generate button
@@ -446,16 +833,19 @@ def main():
 
         # System info
         with st.expander("🖥️ SYSTEM INFO"):
-            agent_status = "✅ READY" if st.session_state.reactor_agent else "❌ OFFLINE"
-            processor_status = "✅ READY" if st.session_state.image_processor else "❌ OFFLINE"
+            agent_status = "✅ READY" if reactor_agent else "❌ OFFLINE"
+            processor_status = "✅ READY" if image_processor else "❌ OFFLINE"
+            agent_stats = reactor_agent.get_stats()
 
             st.code(f"""
 NANozILLA v2.0 - 8BIT EDITION
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 Reactor Agent: {agent_status}
 Image Processor: {processor_status}
-Errors: {st.session_state.error_count}
-Success: {st.session_state.success_count}
+Errors: {stats.error_count}
+Success: {stats.success_count}
+Server Generations: {agent_stats['generation_count']}
+Server Avg Time: {agent_stats['average_generation_time']:.2f}s
 Status: {'🔄 PROCESSING' if st.session_state.processing else '✅ READY'}
             """)
 
@@ -465,111 +855,120 @@ Status: {'🔄 PROCESSING' if st.session_state.processing else '✅ READY'}
 
     display_pixel_divider()
 
-    # Create two columns for before/after
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown("### 📤 ORIGINAL IMAGE")
-
-        if uploaded_file and st.session_state.image_processor:
-            try:
-                with st.spinner("🖼️ Processing uploaded image..."):
-                    image_bytes, format_info = st.session_state.image_processor.process_uploaded_image(
-                        uploaded_file)
-                    original_image = st.session_state.image_processor.prepare_for_display(
-                        image_bytes)
-
-                    if original_image:
-                        st.image(original_image, caption="Original Image", use_container_width=True)
-
-                        # Display image info
-                        info_box = f"""
-                        <div class="status-box">
-                        📊 IMAGE ANALYSIS
-                        ━━━━━━━━━━━━━━━━━━━━
-                        Size: {format_info['width']}x{format_info['height']}
-                        Format: {format_info['format']}
-                        Mode: {format_info['mode']}
-                        File Size: {format_info['file_size_mb']}MB
-                        Color: {format_info.get('color_analysis', {}).get('color_mode', 'Unknown')}
-                        Grayscale: {format_info.get('color_analysis', {}).get('is_grayscale', False)}
-                        </div>
-                        """
-                        st.markdown(info_box, unsafe_allow_html=True)
-
-            except Exception as e:
-                st.error(f"❌ Error processing image: {str(e)}")
-                st.session_state.error_count += 1
-        else:
-            st.info("""
-            ⚠️ NO IMAGE UPLOADED
+    batch_running = st.session_state.batch is not None and st.session_state.processing
+    prepared_upload = None
+    upload_error = None
+    if preprocess_handle is not None and preprocess_handle.done:
+        upload_error = preprocess_handle.error
+        if upload_error is None:
+            prepared_upload = preprocess_handle.result()
+
+    if batch_mode or batch_running:
+        display_batch_panel(uploaded_files, preprocess_handles)
+    else:
+        # Create two columns for before/after
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### 📤 ORIGINAL IMAGE")
+
+            if upload_error:
+                st.error(f"❌ Error processing image: {str(upload_error)}")
+                stats.record_error()
+            elif preprocess_handle is not None and prepared_upload is None:
+                await_preprocessing(preprocess_handle)
+            elif prepared_upload:
+                format_info = prepared_upload.image_info
+                model_input = format_info.get('model_input', {})
+                model_input_label = (f"{model_input.get('format')} {model_input.get('mode')}, "
+                                     f"{model_input.get('bytes', 0) / 1024:.0f}KB")
+                st.image(prepared_upload.display_bytes, caption="Original Image",
+                         use_container_width=True)
+
+                # Display image info
+                info_box = f"""
+                <div class="status-box">
+                📊 IMAGE ANALYSIS
+                ━━━━━━━━━━━━━━━━━━━━
+                Size: {format_info['width']}x{format_info['height']}
+                Format: {format_info['format']}
+                Mode: {format_info['mode']}
+                File Size: {format_info['file_size_mb']}MB
+                Color: {format_info.get('color_analysis', {}).get('color_mode', 'Unknown')}
+                Grayscale: {format_info.get('color_analysis', {}).get('is_grayscale', False)}
+                Model Input: {model_input_label}
+                </div>
+                """
+                st.markdown(info_box, unsafe_allow_html=True)
+            else:
+                st.info("""
+                ⚠️ NO IMAGE UPLOADED
             
-            Please upload an image from the sidebar to begin your 
-            AI-powered transformation journey!
-            """)
-
-    with col2:
-        st.markdown("### 🎨 GENERATED IMAGE")
-
-        if st.session_state.generated_image and st.session_state.image_processor:
-            try:
-                generated_image = st.session_state.image_processor.prepare_for_display(
-                    st.session_state.generated_image
+                Please upload an image from the sidebar to begin your
+                AI-powered transformation journey!
+                """)
+
+        with col2:
+            st.markdown("### 🎨 GENERATED IMAGE")
+
+            # Only keys live in the session; bytes are read from the shared store on demand
+            generated = st.session_state.generated_image
+            preview = load_result(generated.display_key) if generated else None
+            image_bytes = load_result(generated.key) if generated else None
+            if generated and (preview is None or image_bytes is None):
+                st.warning("""
+                ⌛ RESULT EXPIRED
+
+                This result was evicted from the server's result cache.
+                Click GENERATE to create it again.
+                """)
+            elif generated:
+                st.image(preview, caption="AI Transformed", use_container_width=True)
+
+                # Download the generated bytes as returned; nothing is re-encoded
+                st.download_button(
+                    label="📥 DOWNLOAD TRANSFORMED IMAGE",
+                    data=image_bytes,
+                    file_name=(
+                        f"nanozilla_{st.session_state.uploaded_file_name or 'output'}"
+                        f".{generated.extension}"
+                    ),
+                    mime=f"image/{generated.extension}",
+                    use_container_width=True
                 )
 
-                if generated_image:
-                    st.image(generated_image, caption="AI Transformed", use_container_width=True)
-
-                    # Download button
-                    buf = io.BytesIO()
-                    generated_image.save(buf, format="PNG")
-
-                    st.download_button(
-                        label="📥 DOWNLOAD TRANSFORMED IMAGE",
-                        data=buf.getvalue(),
-                        file_name=(
-                            f"nanozilla_{st.session_state.uploaded_file_name or 'output'}.png"
-                        ),
-                        mime="image/png",
-                        use_container_width=True
-                    )
-
-                    # Display generation info
-                    if st.session_state.generation_time:
-                        info_box = f"""
-                        <div class="status-box">
-                        ⏱️ GENERATION COMPLETE
-                        ━━━━━━━━━━━━━━━━━━━━━━━━
-                        Processing Time: {st.session_state.generation_time}
-                        Status: SUCCESSFUL ✓
-                        Quality: High
-                        </div>
-                        """
-                        st.markdown(info_box, unsafe_allow_html=True)
-
-            except Exception as e:
-                st.error(f"❌ Error displaying generated image: {str(e)}")
-                st.session_state.error_count += 1
-        else:
-            st.info("""
-            ⚠️ NO GENERATED IMAGE
-            
-            Your AI-transformed masterpiece will appear here after 
-            you click the GENERATE button!
-            """)
+                # Display generation info
+                if stats.generation_time is not None:
+                    info_box = f"""
+                    <div class="status-box">
+                    ⏱️ GENERATION COMPLETE
+                    ━━━━━━━━━━━━━━━━━━━━━━━━
+                    Processing Time: {stats.generation_time_text}
+                    Status: SUCCESSFUL ✓
+                    Quality: High
+                    </div>
+                    """
+                    st.markdown(info_box, unsafe_allow_html=True)
+            else:
+                st.info("""
+                ⚠️ NO GENERATED IMAGE
+
+                Your AI-transformed masterpiece will appear here after
+                you click the GENERATE button!
+                """)
 
     # ========================================================================
     # GENERATION LOGIC
     # ========================================================================
     if generate_btn:
         # Validation checks
-        if not uploaded_file:
+        if not uploaded_files:
             st.error("""
             ⚠️ ERROR: No image uploaded!
             
             Please upload an image file to begin transformation.
             """)
-            st.session_state.error_count += 1
+            stats.record_error()
             return
 
         if not style_prompt:
@@ -578,7 +977,7 @@ Status: {'🔄 PROCESSING' if st.session_state.processing else '✅ READY'}
             
             Please describe how you want to transform your image.
             """)
-            st.session_state.error_count += 1
+            stats.record_error()
             return
 
         # Validate prompt
@@ -586,11 +985,11 @@ Status: {'🔄 PROCESSING' if st.session_state.processing else '✅ READY'}
             validate_prompt(style_prompt)
         except Exception as e:
             st.error(f"⚠️ ERROR: {str(e)}")
-            st.session_state.error_count += 1
+            stats.record_error()
             return
 
         # Check if components are available
-        if not st.session_state.reactor_agent:
+        if not reactor_agent:
             st.error("""
             ❌ CRITICAL: Reactor Agent not available!
             
@@ -598,7 +997,7 @@ Status: {'🔄 PROCESSING' if st.session_state.processing else '✅ READY'}
             """)
             return
 
-        if not st.session_state.image_processor:
+        if not image_processor:
             st.error("""
             ❌ CRITICAL: Image Processor not available!
             
@@ -606,84 +1005,42 @@ Status: {'🔄 PROCESSING' if st.session_state.processing else '✅ READY'}
             """)
             return
 
-        # Set processing state
-        st.session_state.processing = True
-
-        try:
-            # Process image
-            with st.spinner("📊 Processing image data..."):
-                image_bytes, image_info = st.session_state.image_processor.process_uploaded_image(
-                    uploaded_file)
-                time.sleep(0.5)  # Visual feedback
-
-            # Generate transformation
-                progress_text = (
-                    "🔄 NANozILLA Reactor Agent is transforming your image..."
-                )
-
-            with st.spinner(progress_text):
-                start_time = time.time()
-
-                # Show progress bar
-                progress_bar = st.progress(0)
-                for i in range(100):
-                    time.sleep(0.01)  # Faster progress for better UX
-                    progress_bar.progress(i + 1)
-
-                # Execute colorization
-                generated_bytes = st.session_state.reactor_agent.execute_colorization(
-                    image_bytes=image_bytes,
-                    style_prompt=style_prompt,
-                    quality=quality,
-                    safety_level=safety_level,
-                    retry_attempts=retry_attempts
-                )
+        options = {'quality': quality, 'safety_level': safety_level,
+                   'retry_attempts': retry_attempts, 'chroma_transfer': chroma_transfer}
 
-                end_time = time.time()
-                generation_time = f"{end_time - start_time:.2f}s"
-
-            # Store results
-            st.session_state.generated_image = generated_bytes
-            st.session_state.generation_time = generation_time
-            st.session_state.success_count += 1
-            st.session_state.processing = False
-
-            # Success message
-            success_msg = f"""
-            <div class="status-box">
-            ✅ TRANSFORMATION COMPLETE!
-            ━━━━━━━━━━━━━━━━━━━━━━━━━━━
-            Generation Time: {generation_time}
-            Style Applied: {style_prompt[:50]}...
-            Status: SUCCESS ✓
-            </div>
-            """
-            st.markdown(success_msg, unsafe_allow_html=True)
-
-            # Auto-scroll to result
-            st.balloons()
-            time.sleep(1)
+        if batch_mode:
+            st.session_state.batch = start_batch(uploaded_files, preprocess_handles, style_prompt,
+                                                 **options)
+            st.session_state.processing = True
             st.rerun()
 
-        except Exception as e:
-            st.session_state.processing = False
-            st.session_state.error_count += 1
-            st.session_state.last_error = str(e)
+        if upload_error is not None or preprocess_handle is None:
+            st.error(f"⚠️ ERROR: Image could not be processed: {upload_error}")
+            stats.record_error()
+            return
 
-            st.error(f"""
-            ❌ TRANSFORMATION FAILED!
-            
-            Error: {str(e)}
-            
-            💡 Troubleshooting Tips:
-            • Try a simpler style prompt
-            • Check your internet connection
-            • Verify the image format
-            • Wait a moment and try again
-            """)
+        # Hand the work to the background executor; the progress fragment follows it.
+        # Preprocessing started at upload, so usually only the backend call is left.
+        image_info = None
+        if prepared_upload is not None:
+            image_info = {'width': prepared_upload.image_info['width'],
+                          'height': prepared_upload.image_info['height']}
+        source = (prepared_upload.image_bytes if prepared_upload is not None
+                  else preprocess_handle.future)
+        st.session_state.generation_task = generation_executor.submit(
+            source,
+            style_prompt,
+            image_info=image_info,
+            **options
+        )
+        st.session_state.generation_prompt = style_prompt
+        st.session_state.processing = True
+        st.rerun()  # disables the Generate button while the task runs
+
+    if st.session_state.generation_task is not None:
+        display_generation_progress()
 
-            with st.expander("🔍 Technical Details"):
-                st.code(traceback.format_exc())
+    display_generation_outcome()
 
     # ========================================================================
     # FOOTER
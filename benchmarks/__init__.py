@@ -0,0 +1,12 @@
+"""
+Micro-benchmarks for NANozILLA Reactor
+
+Run with:
+    python -m benchmarks run --output benchmarks/baseline.json
+    python -m benchmarks compare --baseline benchmarks/baseline.json
+"""
+
+import os
+
+# Benchmarks never call a real model; allow running without an API key
+os.environ.setdefault("GENERATION_BACKEND", "simulator")
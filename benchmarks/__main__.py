@@ -0,0 +1,85 @@
+"""
+Command line entry point: python -m benchmarks {run,compare,quality,encoding}
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.runner import (
+    compare_results, format_comparison, load_baseline, run_suite, write_baseline
+)
+from benchmarks.encoding import format_encoding, run_encoding
+from benchmarks.quality import format_quality, run_quality
+from benchmarks.suite import build_suite
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def _print_progress(name, result):
+    print(f"{name:<58} {result['median_s'] * 1000:>10.3f}ms  (x{result['number']})",
+          file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="NANozILLA micro-benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and write a JSON baseline")
+    run_parser.add_argument("--output", default=DEFAULT_BASELINE)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Run benchmarks and compare to a baseline"
+    )
+    compare_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    compare_parser.add_argument("--threshold", type=float, default=0.25,
+                                help="Relative slowdown flagged as regression (0.25 = 25%%)")
+    compare_parser.add_argument("--output", help="Also write the new results as JSON")
+
+    quality_parser = subparsers.add_parser(
+        "quality", help="Score chroma-transfer output against direct generation"
+    )
+    quality_parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048])
+    quality_parser.add_argument("--proxy", type=int, nargs="+", default=[512, 640, 1024])
+    quality_parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    encoding_parser = subparsers.add_parser(
+        "encoding", help="Encode time vs bytes for each encoding profile"
+    )
+    encoding_parser.add_argument("--sizes", type=int, nargs="+", default=[2048])
+    encoding_parser.add_argument("--json", action="store_true",
+                                 help="Print JSON instead of a table")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--rounds", type=int, default=5)
+        sub.add_argument("--min-time", type=float, default=0.05)
+        sub.add_argument("--filter", help="Only run benchmarks whose name contains this")
+
+    args = parser.parse_args(argv)
+    if args.command == "quality":
+        results = run_quality(sizes=args.sizes, proxy_dimensions=args.proxy)
+        print(json.dumps(results, indent=2) if args.json else format_quality(results))
+        return 0
+    if args.command == "encoding":
+        results = run_encoding(sizes=args.sizes)
+        print(json.dumps(results, indent=2) if args.json else format_encoding(results))
+        return 0
+
+    document = run_suite(build_suite(), rounds=args.rounds, min_time=args.min_time,
+                         name_filter=args.filter, progress=_print_progress)
+
+    if args.command == "run":
+        write_baseline(document, args.output)
+        print(json.dumps({"written": args.output, "benchmarks": len(document["results"])}))
+        return 0
+
+    if args.output:
+        write_baseline(document, args.output)
+    comparison = compare_results(load_baseline(args.baseline), document, threshold=args.threshold)
+    print(format_comparison(comparison))
+    return 1 if comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Encode time against output bytes for every encoding profile
+
+Each profile encodes the same color and grayscale fixtures in every
+delivery format; the median encode time comes from runner.time_callable.
+"""
+
+from typing import Dict, Sequence
+
+from benchmarks.fixtures import make_image
+from benchmarks.runner import time_callable
+
+ENCODING_SIZES = (2048,)
+ENCODING_FORMATS = ("PNG", "JPEG", "WEBP")
+
+
+def run_encoding(sizes: Sequence[int] = ENCODING_SIZES, formats: Sequence[str] = ENCODING_FORMATS,
+                 rounds: int = 3, min_time: float = 0.05) -> Dict[str, Dict[str, float]]:
+    """
+    Time and size every profile/format pair
+
+    Returns:
+        Mapping of "{size}-{color|gray}-{format}-{profile}" to median_s and bytes
+    """
+    from core.image_processor import ENCODING_PROFILES
+
+    results = {}
+    for size in sizes:
+        for variant, image in (("color", make_image(size, size * 3 // 4, grayscale=False)),
+                               ("gray", make_image(size, size * 3 // 4).convert("L"))):
+            for image_format in formats:
+                for profile in ENCODING_PROFILES.values():
+                    timing = time_callable(lambda: profile.encode(image, image_format),
+                                           rounds=rounds, min_time=min_time)
+                    results[f"{size}-{variant}-{image_format}-{profile.name}"] = {
+                        "median_s": timing["median_s"],
+                        "bytes": len(profile.encode(image, image_format)),
+                    }
+    return results
+
+
+def format_encoding(results: Dict[str, Dict[str, float]]) -> str:
+    """Human-readable table of run_encoding() results"""
+    lines = [f"{'case':<32} {'encode':>10} {'bytes':>12}"]
+    for name, row in results.items():
+        lines.append(f"{name:<32} {row['median_s'] * 1000:>8.1f}ms {row['bytes']:>12,}")
+    return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""
+Deterministic synthetic fixtures for benchmarks
+"""
+
+import io
+import random
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+
+class FixtureUpload(io.BytesIO):
+    """In-memory upload exposing the Streamlit UploadedFile attributes"""
+
+    def __init__(self, data: bytes, name: str, content_type: str):
+        super().__init__(data)
+        self.name = name
+        self.type = content_type
+        self.size = len(data)
+
+
+def make_image(width: int, height: int, grayscale: bool = True, seed: int = 0) -> Image.Image:
+    """
+    Build a photo-like test image: smooth gradients plus film grain
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        grayscale: Whether all three channels are identical
+        seed: RNG seed for the grain
+
+    Returns:
+        RGB PIL image
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    base = 40 + 160 * (0.6 * x + 0.4 * y) + 30 * np.sin(8 * x) * np.cos(6 * y)
+    grain = rng.normal(0, 12, size=(height, width)).astype(np.float32)
+
+    if grayscale:
+        luma = np.clip(base + grain, 0, 255).astype(np.uint8)
+        pixels = np.repeat(luma[:, :, None], 3, axis=2)
+    else:
+        tint = np.array([1.0, 0.85, 0.65], dtype=np.float32)
+        pixels = np.clip((base + grain)[:, :, None] * tint, 0, 255).astype(np.uint8)
+
+    return Image.fromarray(pixels, mode="RGB")
+
+
+def encode_image(image: Image.Image, image_format: str) -> bytes:
+    """Encode a PIL image with Pillow defaults"""
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_upload(size: int, image_format: str, grayscale: bool = True, seed: int = 0) -> bytes:
+    """Encoded 4:3 upload whose longest side is `size` pixels"""
+    image = make_image(size, max(size * 3 // 4, 1), grayscale=grayscale, seed=seed)
+    return encode_image(image, image_format)
+
+
+FILLER_WORDS = [
+    'with', 'and', 'soft', 'bold', 'light', 'colors', 'tones', 'sunset', 'portrait',
+    'street', 'city', 'night', 'golden', 'hour', 'film', 'grain', 'style', 'the', 'of',
+]
+
+MISSPELLINGS = ['vibrante', 'aestetic', 'watercolour', 'vintaje', 'gothik', 'steampunck']
+
+
+def make_prompt_corpus(count: int = 200, seed: int = 0) -> List[str]:
+    """
+    Build a reproducible corpus of style prompts with occasional misspellings
+
+    Args:
+        count: Number of prompts
+        seed: RNG seed
+
+    Returns:
+        List of prompts between 3 and 40 words long
+    """
+    from utils.spell_checker import SpellChecker
+
+    rng = random.Random(seed)
+    terms = sorted(SpellChecker.ARTISTIC_TERMS)
+    prompts = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(3, 40)):
+            roll = rng.random()
+            if roll < 0.35:
+                words.append(rng.choice(terms))
+            elif roll < 0.45:
+                words.append(rng.choice(MISSPELLINGS))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+        prompts.append(" ".join(words))
+    return prompts
+
+
+def make_vocabulary(size: int = 50000, seed: int = 0) -> Dict[str, int]:
+    """
+    Build a reproducible vocabulary of pronounceable terms
+
+    Frequencies follow a Zipf-like curve so ranking by frequency matters.
+
+    Returns:
+        Mapping of term to frequency, always including ARTISTIC_TERMS
+    """
+    from utils.spell_checker import SpellChecker
+
+    rng = random.Random(seed)
+    consonants, vowels = 'bcdfghjklmnprstvwz', 'aeiou'
+    vocabulary = {term: size for term in SpellChecker.ARTISTIC_TERMS}
+    while len(vocabulary) < size:
+        syllables = rng.randint(2, 5)
+        term = ''.join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables))
+        vocabulary.setdefault(term, max(1, size // (len(vocabulary) + 1)))
+    return vocabulary
+
+
+def make_long_prompt(vocabulary: Dict[str, int], length: int = 2000, typo_rate: float = 0.2,
+                     seed: int = 0) -> str:
+    """
+    Build a prompt of about `length` characters drawn from a vocabulary
+
+    A `typo_rate` share of words get one random character edit.
+    """
+    rng = random.Random(seed)
+    terms = sorted(vocabulary)
+    words = []
+    total = 0
+    while total < length:
+        word = rng.choice(terms)
+        if rng.random() < typo_rate and len(word) > 4:
+            i = rng.randrange(len(word))
+            word = word[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[i + 1:]
+        words.append(word)
+        total += len(word) + 1
+    return ' '.join(words)[:length]
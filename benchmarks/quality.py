@@ -0,0 +1,125 @@
+"""
+Output quality of chroma-transfer mode against direct generation
+
+Both paths run the same fixture through a ReactorAgent on a zero-latency
+SimulatorBackend; the direct output is the reference. The simulator's
+duotone also rewrites luminance, so the RGB scores include that change
+while the Cb/Cr scores isolate what the low-resolution proxy costs.
+"""
+
+import io
+from typing import Dict, Sequence
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.fixtures import encode_image, make_image
+
+QUALITY_SIZES = (1024, 2048)
+PROXY_DIMENSIONS = (512, 640, 1024)
+SSIM_WINDOW = 7
+QUALITY_PROMPT = "warm vintage tones with golden highlights"
+
+
+def psnr(reference: np.ndarray, candidate: np.ndarray, peak: float = 255.0) -> float:
+    """Peak signal-to-noise ratio in dB (inf for identical arrays)"""
+    mse = np.mean((reference.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    if mse == 0:
+        return float("inf")
+    return float(10 * np.log10(peak * peak / mse))
+
+
+def _box_mean(plane: np.ndarray, window: int) -> np.ndarray:
+    """Mean over every window x window box (valid positions only), via summed-area table"""
+    table = np.pad(plane, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    sums = (table[window:, window:] - table[:-window, window:]
+            - table[window:, :-window] + table[:-window, :-window])
+    return sums / (window * window)
+
+
+def ssim(reference: np.ndarray, candidate: np.ndarray, window: int = SSIM_WINDOW,
+         peak: float = 255.0) -> float:
+    """
+    Mean structural similarity of two single-channel planes
+
+    Uses uniform windows instead of the Gaussian of the original paper,
+    which keeps it to a few numpy passes.
+    """
+    x = reference.astype(np.float64)
+    y = candidate.astype(np.float64)
+    c1 = (0.01 * peak) ** 2
+    c2 = (0.03 * peak) ** 2
+
+    mu_x = _box_mean(x, window)
+    mu_y = _box_mean(y, window)
+    var_x = _box_mean(x * x, window) - mu_x * mu_x
+    var_y = _box_mean(y * y, window) - mu_y * mu_y
+    cov = _box_mean(x * y, window) - mu_x * mu_y
+
+    index = (((2 * mu_x * mu_y + c1) * (2 * cov + c2))
+             / ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2)))
+    return float(index.mean())
+
+
+def compare_images(reference: Image.Image, candidate: Image.Image) -> Dict[str, float]:
+    """PSNR/SSIM over RGB and over the Cb/Cr planes"""
+    ref_rgb = np.asarray(reference.convert("RGB"))
+    cand_rgb = np.asarray(candidate.convert("RGB"))
+    ref_ycc = np.asarray(reference.convert("YCbCr"))
+    cand_ycc = np.asarray(candidate.convert("YCbCr"))
+
+    return {
+        "rgb_psnr": psnr(ref_rgb, cand_rgb),
+        "rgb_ssim": float(np.mean([ssim(ref_rgb[..., c], cand_rgb[..., c]) for c in range(3)])),
+        "chroma_psnr": psnr(ref_ycc[..., 1:], cand_ycc[..., 1:]),
+        "chroma_ssim": float(np.mean([ssim(ref_ycc[..., c], cand_ycc[..., c]) for c in (1, 2)])),
+    }
+
+
+def _agent():
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    agent.min_call_interval = 0
+    return agent
+
+
+def run_quality(sizes: Sequence[int] = QUALITY_SIZES,
+                proxy_dimensions: Sequence[int] = PROXY_DIMENSIONS) -> Dict[str, Dict[str, float]]:
+    """
+    Score chroma transfer at each proxy dimension against direct generation
+
+    Returns:
+        Mapping of "{size}-chroma-{proxy}" to metrics plus upload_bytes
+        (the model input size) and direct_upload_bytes
+    """
+    agent = _agent()
+    results = {}
+    for size in sizes:
+        original = encode_image(make_image(size, size * 3 // 4), "PNG")
+        direct_bytes = agent.execute_colorization(original, QUALITY_PROMPT, chroma_transfer=False)
+        direct = Image.open(io.BytesIO(direct_bytes))
+
+        for proxy_dimension in proxy_dimensions:
+            agent.chroma_proxy_dimension = proxy_dimension
+            recomposed = agent.execute_colorization(original, QUALITY_PROMPT, chroma_transfer=True)
+            metrics = compare_images(direct, Image.open(io.BytesIO(recomposed)))
+            proxy = agent.image_processor.make_chroma_proxy(original, proxy_dimension)
+            metrics["upload_bytes"] = len(proxy)
+            metrics["direct_upload_bytes"] = len(original)
+            results[f"{size}-chroma-{proxy_dimension}"] = metrics
+    return results
+
+
+def format_quality(results: Dict[str, Dict[str, float]]) -> str:
+    """Human-readable table of run_quality() results"""
+    lines = [f"{'case':<22} {'rgb psnr':>9} {'rgb ssim':>9} "
+             f"{'cbcr psnr':>10} {'cbcr ssim':>10} {'upload':>14}"]
+    for name, metrics in results.items():
+        upload = f"{metrics['upload_bytes'] / metrics['direct_upload_bytes']:.1%}"
+        lines.append(
+            f"{name:<22} {metrics['rgb_psnr']:>9.2f} {metrics['rgb_ssim']:>9.4f} "
+            f"{metrics['chroma_psnr']:>10.2f} {metrics['chroma_ssim']:>10.4f} {upload:>14}"
+        )
+    return "\n".join(lines)
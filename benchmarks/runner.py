@@ -0,0 +1,183 @@
+"""
+Benchmark runner, JSON baselines and regression comparison
+"""
+
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+BASELINE_SCHEMA = 1
+
+
+def time_callable(
+    func: Callable[[], Any],
+    rounds: int = 5,
+    min_time: float = 0.05,
+    warmup: int = 1
+) -> Dict[str, Any]:
+    """
+    Time a zero-argument callable
+
+    The number of calls per round is calibrated so that each round lasts at
+    least `min_time` seconds; statistics are reported per call.
+
+    Args:
+        func: Callable to benchmark
+        rounds: Number of timed rounds
+        min_time: Minimum duration of one round in seconds
+        warmup: Untimed calls before measuring
+
+    Returns:
+        Dictionary with median/min/mean/stdev seconds per call
+    """
+    for _ in range(warmup):
+        func()
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": len(samples),
+        "number": number,
+    }
+
+
+def run_suite(
+    suite: Dict[str, Callable[[], Callable[[], Any]]],
+    rounds: int = 5,
+    min_time: float = 0.05,
+    name_filter: Optional[str] = None,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run every benchmark in a suite
+
+    Args:
+        suite: Mapping of benchmark name to a factory returning the callable to time
+        rounds: Timed rounds per benchmark
+        min_time: Minimum round duration in seconds
+        name_filter: Only run benchmarks whose name contains this substring
+        progress: Optional callback invoked after each benchmark
+
+    Returns:
+        Baseline document ready to be written as JSON
+    """
+    results = {}
+    for name, factory in suite.items():
+        if name_filter and name_filter not in name:
+            continue
+        result = time_callable(factory(), rounds=rounds, min_time=min_time)
+        results[name] = result
+        if progress:
+            progress(name, result)
+
+    return {
+        "schema": BASELINE_SCHEMA,
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def write_baseline(document: Dict[str, Any], path: str):
+    """Write a baseline document as JSON"""
+    with open(path, "w") as baseline_file:
+        json.dump(document, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """Load a baseline document written by write_baseline"""
+    with open(path) as baseline_file:
+        document = json.load(baseline_file)
+    if document.get("schema") != BASELINE_SCHEMA:
+        raise ValueError(f"Unsupported baseline schema: {document.get('schema')}")
+    return document
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.25,
+    metric: str = "median_s"
+) -> Dict[str, Any]:
+    """
+    Compare two baseline documents
+
+    Args:
+        baseline: Reference document
+        current: Freshly measured document
+        threshold: Relative slowdown (0.25 = 25%) flagged as a regression
+        metric: Statistic to compare
+
+    Returns:
+        Dictionary with per-benchmark rows and the list of regressions
+    """
+    rows = []
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            rows.append({"name": name, "status": "new", "current": result[metric]})
+            continue
+
+        ratio = result[metric] / reference[metric] if reference[metric] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "status": status,
+            "baseline": reference[metric],
+            "current": result[metric],
+            "ratio": ratio,
+        })
+
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    return {"rows": rows, "regressions": regressions, "missing": missing, "threshold": threshold}
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """Render a comparison as a plain-text table"""
+    lines = [f"{'BENCHMARK':<58} {'BASELINE':>12} {'CURRENT':>12} {'RATIO':>7}  STATUS"]
+    for row in comparison["rows"]:
+        baseline = f"{row['baseline'] * 1000:.3f}ms" if "baseline" in row else "-"
+        ratio = f"{row['ratio']:.2f}x" if "ratio" in row else "-"
+        lines.append(
+            f"{row['name']:<58} {baseline:>12} {row['current'] * 1000:>10.3f}ms {ratio:>7}  "
+            f"{row['status'].upper()}"
+        )
+    for name in comparison["missing"]:
+        lines.append(f"{name:<58} {'':>12} {'':>12} {'':>7}  MISSING")
+    lines.append(
+        f"{len(comparison['regressions'])} regression(s) beyond "
+        f"{comparison['threshold'] * 100:.0f}%"
+    )
+    return "\n".join(lines)
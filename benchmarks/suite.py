@@ -0,0 +1,369 @@
+"""
+Benchmark cases for the preprocessing, spell checking and serialization paths
+"""
+
+import io
+import json
+import os
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Sequence
+
+from benchmarks.fixtures import (
+    FixtureUpload, encode_image, make_image, make_long_prompt, make_prompt_corpus,
+    make_upload, make_vocabulary
+)
+
+IMAGE_SIZES = (512, 2048, 4096)
+UPLOAD_FORMATS = ("JPEG", "PNG", "WEBP")
+CONVERT_TARGETS = ("PNG", "JPEG", "JPG", "WEBP", "BMP")
+PROMPT_COUNT = 200
+VOCABULARY_SIZE = 50000
+LONG_PROMPT_CHARS = 2000
+
+Suite = Dict[str, Callable[[], Callable[[], Any]]]
+
+
+# ============================================================================
+# IMAGE PROCESSOR
+# ============================================================================
+
+
+def _process_uploaded_image(size: int, image_format: str):
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    data = make_upload(size, image_format)
+    name = f"fixture.{image_format.lower()}"
+    content_type = f"image/{image_format.lower()}"
+
+    def run():
+        return processor.process_uploaded_image(
+            FixtureUpload(data, name, content_type), validate_colors=True, auto_resize=True
+        )
+    return run
+
+
+def _resize_image(size: int):
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    image = make_image(size, size * 3 // 4)
+    return partial(processor._resize_image, image, 2048 if size > 2048 else size // 2)
+
+
+def _analyze_colors(size: int, grayscale: bool):
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    image = make_image(size, size * 3 // 4, grayscale=grayscale)
+    return partial(processor._analyze_colors, image)
+
+
+def _encode_model_input(size: int, variant: str):
+    """Backend input encode of a grayscale image: 'rgb' (three channels), 'gray' or 'gray-lossy'"""
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor(lossy_input=variant == "gray-lossy")
+    image = make_image(size, size * 3 // 4)
+    image_info = {"color_analysis": {"is_grayscale": variant != "rgb"}}
+    return partial(processor._encode_model_input, image, image_info)
+
+
+def _convert_format(size: int, target: str, profile: str = "balanced"):
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    master = encode_image(make_image(size, size * 3 // 4, grayscale=False), "PNG")
+    return partial(processor.convert_format, master, target, profile=profile)
+
+
+def _streamlit_rerun(size: int, cached: bool):
+    """
+    Image work one Streamlit rerun does with an upload and a generated result shown
+
+    Uncached is the former path: preprocess the upload, decode it again for
+    the preview and re-encode the generated image for the download button.
+    Cached is the current path: hash the upload and look the prepared
+    images up; the download serves the stored bytes.
+    """
+    from core.image_processor import ImageProcessor, content_digest
+
+    processor = ImageProcessor()
+    upload = FixtureUpload(make_upload(size, "JPEG"), "fixture.jpg", "image/jpeg")
+    generated = encode_image(make_image(size, size * 3 // 4, grayscale=False), "PNG")
+
+    if not cached:
+        def run():
+            image_bytes, _ = processor.process_uploaded_image(upload)
+            processor.prepare_for_display(image_bytes).load()
+            buffer = io.BytesIO()
+            processor.prepare_for_display(generated).save(buffer, format="PNG")
+        return run
+
+    prepared = {content_digest(upload): processor.prepare_upload(upload)}
+    result = processor.prepare_generated(generated)
+
+    def run():
+        return prepared[content_digest(upload)], result.image_bytes
+    return run
+
+
+# ============================================================================
+# REACTOR AGENT
+# ============================================================================
+
+
+def _colorize(size: int, proxy_dimension: int = 0):
+    """
+    One generation on a zero-latency simulator, so only local image work is timed
+
+    proxy_dimension 0 sends the full image; otherwise chroma transfer runs
+    with a proxy of that size.
+    """
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    agent.min_call_interval = 0
+    agent.chroma_proxy_dimension = proxy_dimension
+    original = encode_image(make_image(size, size * 3 // 4), "PNG")
+    return partial(agent.execute_colorization, original, "warm vintage tones",
+                   chroma_transfer=bool(proxy_dimension))
+
+
+# ============================================================================
+# RESULT VARIANTS
+# ============================================================================
+
+
+def _render_variants(size: int, master_format: str, cached: bool, proxy: bool = False):
+    """
+    A gallery's thumbnail and preview of one result
+
+    Rendered from the full master, from a warm decode proxy, or served as
+    cache hits. draft() only reduces JPEG decodes, so PNG masters (the
+    common case) gain nothing without the proxy.
+    """
+    import tempfile
+    from core.derivatives import PROXY_DIMENSION, DerivativeCache, parse_variant_spec
+    from core.result_store import BoundedResultStore, ResultStore
+
+    workdir = tempfile.TemporaryDirectory(prefix="nanozilla-bench-")
+    masters = ResultStore(os.path.join(workdir.name, "masters"))
+    variants = BoundedResultStore(os.path.join(workdir.name, "variants"), 1 << 30)
+    derivatives = DerivativeCache([masters], variants,
+                                  proxy_dimension=PROXY_DIMENSION if proxy else 0)
+    key = masters.put(encode_image(make_image(size, size * 3 // 4, grayscale=False), master_format))
+    specs = [parse_variant_spec("webp:256"), parse_variant_spec("jpeg:1024")]
+
+    if cached or proxy:
+        derivatives.get_many(key, specs)
+    if cached:
+        def run(workdir=workdir):  # holds the temporary stores open
+            return derivatives.get_many(key, specs)
+        return run
+
+    def run(workdir=workdir):
+        return derivatives._render(key, specs)
+    return run
+
+
+# ============================================================================
+# SPELL CHECKER
+# ============================================================================
+
+
+def _check_prompt_corpus(prompt_count: int, cache_size: int = 0):
+    from utils.spell_checker import SpellChecker
+
+    checker = SpellChecker(cache_size=cache_size)
+    corpus = make_prompt_corpus(prompt_count)
+
+    def run():
+        for prompt in corpus:
+            checker.check_prompt(prompt)
+    return run
+
+
+def _build_spell_index(vocabulary_size: int):
+    from utils.spell_checker import SymSpellIndex
+
+    vocabulary = make_vocabulary(vocabulary_size)
+    return partial(SymSpellIndex, vocabulary)
+
+
+def _check_long_prompt(vocabulary_size: int, prompt_chars: int):
+    from utils.spell_checker import SpellChecker
+
+    vocabulary = make_vocabulary(vocabulary_size)
+    checker = SpellChecker(vocabulary, cache_size=0)
+    prompt = make_long_prompt(vocabulary, prompt_chars)
+    return partial(checker.check_prompt, prompt)
+
+
+def _build_lexicon_file(vocabulary: Dict[str, int]):
+    """Compile a vocabulary into a temporary directory that lives as long as it is referenced"""
+    import tempfile
+    from utils.lexicon import build_lexicon
+
+    workdir = tempfile.TemporaryDirectory(prefix="nanozilla-bench-")
+    build_lexicon(vocabulary, os.path.join(workdir.name, "bench.nzlx"))
+    return workdir
+
+
+def _load_lexicon(vocabulary_size: int):
+    from utils.lexicon import Lexicon
+
+    workdir = _build_lexicon_file(make_vocabulary(vocabulary_size))
+
+    def run():
+        Lexicon(os.path.join(workdir.name, "bench.nzlx")).close()
+    return run
+
+
+def _check_long_prompt_lexicon(vocabulary_size: int, prompt_chars: int):
+    from utils.lexicon import Lexicon
+    from utils.spell_checker import SpellChecker
+
+    vocabulary = make_vocabulary(vocabulary_size)
+    workdir = _build_lexicon_file(vocabulary)
+    checker = SpellChecker(index=Lexicon(os.path.join(workdir.name, "bench.nzlx")), cache_size=0)
+    prompt = make_long_prompt(vocabulary, prompt_chars)
+
+    def run(workdir=workdir):  # holds the temporary lexicon directory open
+        return checker.check_prompt(prompt)
+    return run
+
+
+# ============================================================================
+# RESPONSE SERIALIZATION
+# ============================================================================
+
+
+def _serialize_colorize_response(size: int):
+    from core.api_server import ColorizationResponse
+
+    generated = encode_image(make_image(size, size * 3 // 4, grayscale=False), "PNG")
+
+    def run():
+        response = ColorizationResponse(
+            success=True,
+            data={
+                "image_data": generated.hex(),
+                "generation_id": "gen_benchmark00",
+                "processing_time": 1.0,
+                "image_info": {"format": "PNG", "width": size, "height": size * 3 // 4,
+                               "file_size": len(generated), "color_mode": "Color"},
+                "style_prompt_used": "vintage warm tones",
+            },
+            metadata={"version": "2.0.0", "model": "benchmark",
+                      "timestamp": datetime.utcnow().isoformat()},
+        )
+        return response.model_dump_json()
+    return run
+
+
+def _serialize_job_status(size: int, batch_size: int):
+    from fastapi.encoders import jsonable_encoder
+
+    generated = encode_image(make_image(size, size * 3 // 4, grayscale=False), "PNG")
+    job = {
+        "job_id": "batch_benchmark0",
+        "status": "completed",
+        "progress": 100,
+        "total_images": batch_size,
+        "processed_images": batch_size,
+        "results": [
+            {"original_filename": f"img_{i}.jpg", "success": True,
+             "image_data": generated.hex(), "processing_time": 1.0,
+             "image_info": {"width": size, "height": size * 3 // 4, "format": "JPEG"}}
+            for i in range(batch_size)
+        ],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+    def run():
+        return json.dumps(jsonable_encoder({"success": True, "data": job}))
+    return run
+
+
+# ============================================================================
+# SUITE
+# ============================================================================
+
+
+def build_suite(
+    image_sizes: Sequence[int] = IMAGE_SIZES,
+    upload_formats: Sequence[str] = UPLOAD_FORMATS,
+    convert_targets: Sequence[str] = CONVERT_TARGETS,
+    prompt_count: int = PROMPT_COUNT,
+    vocabulary_size: int = VOCABULARY_SIZE,
+    prompt_chars: int = LONG_PROMPT_CHARS
+) -> Suite:
+    """
+    Build the benchmark suite
+
+    Factories are lazy: fixtures are only generated for benchmarks that run.
+
+    Returns:
+        Mapping of benchmark name to factory returning the callable to time
+    """
+    suite: Suite = {}
+
+    for size in image_sizes:
+        for image_format in upload_formats:
+            suite[f"image_processor.process_uploaded_image[{size}-{image_format}]"] = partial(
+                _process_uploaded_image, size, image_format)
+        suite[f"image_processor._resize_image[{size}]"] = partial(_resize_image, size)
+        for variant, grayscale in (("gray", True), ("color", False)):
+            suite[f"image_processor._analyze_colors[{size}-{variant}]"] = partial(
+                _analyze_colors, size, grayscale)
+        for variant in ("rgb", "gray", "gray-lossy"):
+            suite[f"image_processor._encode_model_input[{size}-{variant}]"] = partial(
+                _encode_model_input, size, variant)
+
+    rerun_size = image_sizes[-1]
+    suite[f"app.rerun[{rerun_size}-uncached]"] = partial(_streamlit_rerun, rerun_size, False)
+    suite[f"app.rerun[{rerun_size}-cached]"] = partial(_streamlit_rerun, rerun_size, True)
+
+    colorize_size = min(image_sizes[-1], 2048)
+    suite[f"reactor.colorize[{colorize_size}-direct]"] = partial(_colorize, colorize_size)
+    suite[f"reactor.colorize[{colorize_size}-chroma-640]"] = partial(_colorize, colorize_size, 640)
+
+    convert_size = min(image_sizes[-1], 2048)
+    for master_format in ("PNG", "JPEG"):
+        suite[f"derivatives.render[{convert_size}-{master_format}]"] = partial(
+            _render_variants, convert_size, master_format, False)
+    suite[f"derivatives.render[{convert_size}-PNG-proxy]"] = partial(
+        _render_variants, convert_size, "PNG", False, True)
+    suite[f"derivatives.render[{convert_size}-PNG-cached]"] = partial(
+        _render_variants, convert_size, "PNG", True)
+    for target in convert_targets:
+        suite[f"image_processor.convert_format[{convert_size}-{target}]"] = partial(
+            _convert_format, convert_size, target)
+    for target in ("PNG", "JPEG", "WEBP"):
+        for profile in ("fast", "smallest"):
+            suite[f"image_processor.convert_format[{convert_size}-{target}-{profile}]"] = partial(
+                _convert_format, convert_size, target, profile)
+
+    suite[f"spell_checker.check_prompt[corpus-{prompt_count}]"] = partial(
+        _check_prompt_corpus, prompt_count)
+    suite[f"spell_checker.check_prompt[corpus-{prompt_count}-memoized]"] = partial(
+        _check_prompt_corpus, prompt_count, prompt_count)
+    suite[f"spell_checker.build_index[vocab-{vocabulary_size}]"] = partial(
+        _build_spell_index, vocabulary_size)
+    suite[f"spell_checker.check_prompt[vocab-{vocabulary_size}-{prompt_chars}chars]"] = partial(
+        _check_long_prompt, vocabulary_size, prompt_chars)
+    suite[f"lexicon.load[vocab-{vocabulary_size}]"] = partial(_load_lexicon, vocabulary_size)
+    suite[f"lexicon.check_prompt[vocab-{vocabulary_size}-{prompt_chars}chars]"] = partial(
+        _check_long_prompt_lexicon, vocabulary_size, prompt_chars)
+
+    serialize_size = min(image_sizes[-1], 1024)
+    suite[f"serialization.colorize_response[{serialize_size}]"] = partial(
+        _serialize_colorize_response, serialize_size)
+    suite[f"serialization.job_status[{serialize_size}-x10]"] = partial(
+        _serialize_job_status, serialize_size, 10)
+
+    return suite
@@ -9,19 +9,116 @@ class Settings:
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     MODEL_NAME = os.getenv("MODEL_NAME", "imagen-3.0-generate-002")
 
+    # Generation Backend ("gemini" or "simulator")
+    GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "gemini").lower()
+    MIN_CALL_INTERVAL = float(os.getenv("MIN_CALL_INTERVAL", "1.0"))
+
+    # Chroma Transfer (send a small proxy, keep the original's full-resolution luminance)
+    CHROMA_TRANSFER = os.getenv("CHROMA_TRANSFER", "false").lower() in ("1", "true", "yes")
+    CHROMA_PROXY_DIMENSION = int(os.getenv("CHROMA_PROXY_DIMENSION", "640"))
+
+    # Send grayscale model inputs as JPEG instead of lossless PNG
+    LOSSY_MODEL_INPUT = os.getenv("LOSSY_MODEL_INPUT", "false").lower() in ("1", "true", "yes")
+
+    # Encoding profiles ("fast", "balanced" or "smallest") per hop
+    MODEL_INPUT_ENCODING = os.getenv("MODEL_INPUT_ENCODING", "fast")
+    OUTPUT_ENCODING = os.getenv("OUTPUT_ENCODING", "balanced")
+
+    # Simulator Backend (offline load tests and benchmarks)
+    SIMULATOR_LATENCY_DISTRIBUTION = os.getenv("SIMULATOR_LATENCY_DISTRIBUTION", "lognormal")
+    SIMULATOR_LATENCY_MEAN = float(os.getenv("SIMULATOR_LATENCY_MEAN", "0.5"))  # seconds
+    SIMULATOR_LATENCY_STDDEV = float(os.getenv("SIMULATOR_LATENCY_STDDEV", "0.1"))  # seconds
+    SIMULATOR_ERROR_RATE_429 = float(os.getenv("SIMULATOR_ERROR_RATE_429", "0.0"))
+    SIMULATOR_ERROR_RATE_503 = float(os.getenv("SIMULATOR_ERROR_RATE_503", "0.0"))
+    SIMULATOR_TIMEOUT_RATE = float(os.getenv("SIMULATOR_TIMEOUT_RATE", "0.0"))
+    SIMULATOR_TIMEOUT_SECONDS = float(os.getenv("SIMULATOR_TIMEOUT_SECONDS", "30.0"))
+    SIMULATOR_MAX_RPS = float(os.getenv("SIMULATOR_MAX_RPS", "0"))  # 0 = uncapped
+    SIMULATOR_SEED = int(os.getenv("SIMULATOR_SEED", "0"))
+
+    # Profiling (admin only, nothing is installed unless enabled)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN")
+    PROFILING_OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", "profiles")
+
     # Image Processing Limits
     MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
     MAX_DIMENSION = 4096
     MIN_DIMENSION = 32
+    MAX_IMAGE_PIXELS = MAX_DIMENSION * MAX_DIMENSION
+
+    # Upload Ingestion
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+    MAX_BATCH_IMAGES = 10
+    MAX_REQUEST_SIZE = MAX_IMAGE_SIZE * MAX_BATCH_IMAGES + 1024 * 1024  # multipart overhead
+
+    # Archive Batches (tar/zip upload or URL manifest; results kept on disk)
+    WORK_DIR = os.getenv("WORK_DIR", "data/work")
+    RESULT_STORE_DIR = os.getenv("RESULT_STORE_DIR", "data/results")
+    MAX_ARCHIVE_SIZE = int(os.getenv("MAX_ARCHIVE_SIZE", str(4 * 1024 * 1024 * 1024)))  # 4GB
+    MAX_ARCHIVE_UNPACKED_SIZE = int(
+        os.getenv("MAX_ARCHIVE_UNPACKED_SIZE", str(8 * 1024 * 1024 * 1024))
+    )
+    MAX_ARCHIVE_ENTRIES = int(os.getenv("MAX_ARCHIVE_ENTRIES", "10000"))
+    MAX_ARCHIVE_CONCURRENCY = 8
+    # Comma-separated hosts manifest blobs may come from (empty = any public host)
+    MANIFEST_ALLOWED_HOSTS = [
+        host.strip().lower()
+        for host in os.getenv("MANIFEST_ALLOWED_HOSTS", "").split(",") if host.strip()
+    ]
+    # Let manifest and callback URLs reach private/loopback addresses (local development only)
+    ALLOW_PRIVATE_URLS = os.getenv("ALLOW_PRIVATE_URLS", "false").lower() in ("1", "true", "yes")
+
+    # Streamlit Session Results (shared disk store, least recently used evicted past the budget)
+    SESSION_RESULT_STORE_DIR = os.getenv("SESSION_RESULT_STORE_DIR", "data/session_results")
+    SESSION_RESULT_STORE_MAX_BYTES = int(
+        os.getenv("SESSION_RESULT_STORE_MAX_BYTES", str(1024 * 1024 * 1024))
+    )  # 1GB
+
+    # Result Variants (single-image results kept as masters, plus their format/size derivatives;
+    # least recently used evicted from each store past its budget)
+    MASTER_STORE_DIR = os.getenv("MASTER_STORE_DIR", "data/masters")
+    MASTER_STORE_MAX_BYTES = int(
+        os.getenv("MASTER_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+    )  # 2GB
+    DERIVATIVE_STORE_DIR = os.getenv("DERIVATIVE_STORE_DIR", "data/derivatives")
+    DERIVATIVE_STORE_MAX_BYTES = int(
+        os.getenv("DERIVATIVE_STORE_MAX_BYTES", str(256 * 1024 * 1024))
+    )  # 256MB
+    MAX_VARIANTS_PER_REQUEST = 8
+
+    # Job Progress Push (long-poll and Server-Sent Events)
+    JOB_LONG_POLL_MAX_WAIT = 60  # seconds
+    JOB_EVENTS_KEEPALIVE = float(os.getenv("JOB_EVENTS_KEEPALIVE", "15"))  # seconds
+
+    # Webhook Callbacks (batch callback_url is refused unless WEBHOOK_SECRET is set)
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+    WEBHOOK_DEAD_LETTER_PATH = os.getenv("WEBHOOK_DEAD_LETTER_PATH", "data/webhooks.sqlite3")
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "20"))
+    WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "6"))
+    WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "10"))  # seconds
+    MAX_CALLBACK_URL_LENGTH = 2048
+
+    # Spell Checker Lexicons (build with: python -m utils.lexicon build)
+    LEXICON_PATH = os.getenv("LEXICON_PATH", "data/lexicon/base.nzlx")
+    # Word lists compiled into LEXICON_PATH when it is missing or older than them
+    LEXICON_SOURCES = os.getenv("LEXICON_SOURCES", "data/lexicon/*.txt")
+    TENANT_LEXICON_DIR = os.getenv("TENANT_LEXICON_DIR", "data/lexicon/tenants")
+    SPELL_CHECK_CACHE_SIZE = int(os.getenv("SPELL_CHECK_CACHE_SIZE", "1024"))
 
     # Generation Settings
     MAX_PROMPT_LENGTH = 2000
+    MAX_ANALYZE_PROMPTS = 5000  # per /api/v1/prompts/analyze call
     DEFAULT_QUALITY = "high"
     DEFAULT_SAFETY_LEVEL = "block_some"
 
     # Validation
-    if not GEMINI_API_KEY:
+    if GENERATION_BACKEND not in ("gemini", "simulator"):
+        raise ValueError(f"Unknown GENERATION_BACKEND: {GENERATION_BACKEND}")
+    if GENERATION_BACKEND == "gemini" and not GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY not found in environment variables")
+    if PROFILING_ENABLED and not PROFILING_ADMIN_TOKEN:
+        raise ValueError("PROFILING_ADMIN_TOKEN is required when PROFILING_ENABLED is set")
 
 
 settings = Settings()
@@ -1,16 +1,45 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Dict, Any
+import json
+import math
+import os
+import shutil
+import time
 import uuid
 from datetime import datetime
+from urllib.parse import urlencode
 import asyncio
 
+import httpx
+
+from config.settings import settings
+from core.archives import (
+    ArchiveEntry, fetch_blob, iter_result_tar, manifest_entries, spool_body, unpack_archive
+)
+from core.derivatives import (
+    MIN_VARIANT_DIMENSION, VARIANT_FORMATS, DerivativeCache, VariantSpec, create_derivative_cache,
+    make_variant_spec, parse_variant_spec
+)
+from core.generation_backend import BackendError
 from core.reactor_agent import create_reactor_agent
-from core.image_processor import create_image_processor
-from utils.validators import validate_prompt
-from utils.spell_checker import check_style_prompt
+from core.image_processor import create_image_processor, get_encoding_profile
+from core.job_events import TERMINAL_STATUSES, JobEventLog, format_sse
+from core.result_store import (
+    BoundedResultStore, ResultStore, get_derivative_store, get_master_store, get_result_store
+)
+from core.upload_ingest import IngestedUpload, ingest_file, ingest_upload
+from core.webhooks import WebhookDispatcher, create_webhook_dispatcher
+from utils.validators import (
+    FORMAT_MIME_TYPES, UnsupportedImageError, UploadTooLargeError, outbound_request_guard,
+    validate_blob_url, validate_blob_urls, validate_callback_url, validate_prompt
+)
+from utils.spell_checker import SpellChecker, check_style_prompt, get_spell_checker
+
+ANALYZE_LINES_PER_CHUNK = 64  # NDJSON lines per streamed chunk
+ARCHIVE_UPLOAD_PATH = "/api/v1/colorize/archive"
 
 # ============================================================================
 # API MODELS
@@ -19,9 +48,9 @@ from utils.spell_checker import check_style_prompt
 
 class ColorizationRequest(BaseModel):
     style_prompt: str = Field(..., min_length=10, max_length=2000)
-    quality: str = Field("high", regex="^(high|medium|low)$")
-    safety_level: str = Field("block_some", regex="^(block_some|block_most|block_none)$")
-    output_format: str = Field("png", regex="^(png|jpeg|webp)$")
+    quality: str = Field("high", pattern="^(high|medium|low)$")
+    safety_level: str = Field("block_some", pattern="^(block_some|block_most|block_none)$")
+    output_format: str = Field("png", pattern="^(png|jpeg|webp)$")
 
 
 class BatchColorizationRequest(BaseModel):
@@ -29,6 +58,23 @@ class BatchColorizationRequest(BaseModel):
     concurrent: int = Field(3, ge=1, le=5)
 
 
+class ManifestItem(BaseModel):
+    url: str
+    name: Optional[str] = None
+
+
+class ManifestBatchRequest(BaseModel):
+    style_prompt: str = Field(..., max_length=2000)
+    items: List[ManifestItem] = Field(..., min_length=1, max_length=settings.MAX_ARCHIVE_ENTRIES)
+    concurrent: int = Field(3, ge=1, le=settings.MAX_ARCHIVE_CONCURRENCY)
+    callback_url: Optional[str] = None
+
+
+class PromptAnalysisRequest(BaseModel):
+    prompts: List[str] = Field(..., min_length=1, max_length=settings.MAX_ANALYZE_PROMPTS)
+    tenant: Optional[str] = None
+
+
 class ColorizationResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
@@ -45,6 +91,64 @@ class JobStatusResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+# ============================================================================
+# REQUEST BODY LIMIT
+# ============================================================================
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware capping request bodies as they arrive
+
+    An oversized Content-Length is refused before anything is read, and
+    chunked bodies are counted on the receive stream, so multipart parsing
+    never spools more than the cap. Crossing it raises a 413 HTTPException
+    from receive(), which FastAPI passes through its body parsing.
+
+    Args:
+        app: Wrapped ASGI application
+        limit_for: Byte limit for a request path
+        reject: Builds the 413 response sent when the app has not responded yet
+    """
+
+    def __init__(self, app, limit_for: Callable[[str], int], reject: Callable[[], Response]):
+        self.app = app
+        self.limit_for = limit_for
+        self.reject = reject
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = self.limit_for(scope["path"])
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                return await self.reject()(scope, receive, send)
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(413, "Request body too large")
+            return message
+
+        async def tracked_send(message):
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as e:
+            if e.status_code != 413 or started:
+                raise
+            await self.reject()(scope, receive, send)
+
 # ============================================================================
 # API SERVER
 # ============================================================================
@@ -77,10 +181,36 @@ class NANozILLAAPI:
         self.reactor_agent = None
         self.image_processor = None
         self.jobs = {}  # In-memory job storage
+        self.job_events: Dict[str, JobEventLog] = {}
+        self.webhooks: Optional[WebhookDispatcher] = None
+        self.result_store: Optional[ResultStore] = None
+        self.master_store: Optional[BoundedResultStore] = None
+        self.derivatives: Optional[DerivativeCache] = None
 
         # Setup routes
+        self._setup_upload_limit()
         self._setup_routes()
         self._setup_exception_handlers()
+        self.app.router.add_event_handler("shutdown", self._shutdown)
+
+        # Admin profiling surface (zero cost unless enabled)
+        if settings.PROFILING_ENABLED:
+            self._setup_profiling()
+
+    def _setup_upload_limit(self):
+        """Reject oversized request bodies before multipart parsing buffers them"""
+
+        def limit_for(path: str) -> int:
+            # Archive uploads stream to disk and enforce their own, larger cap
+            if path == ARCHIVE_UPLOAD_PATH:
+                return settings.MAX_ARCHIVE_SIZE
+            return settings.MAX_REQUEST_SIZE
+
+        self.app.add_middleware(
+            BodySizeLimitMiddleware,
+            limit_for=limit_for,
+            reject=lambda: self._error_response(413, "Request body too large")
+        )
 
     def _setup_routes(self):
         """Setup API routes"""
@@ -107,22 +237,41 @@ class NANozILLAAPI:
 
         @self.app.post("/api/v1/colorize", response_model=ColorizationResponse)
         async def colorize_image(
+            request: Request,
             background_tasks: BackgroundTasks,
             image: UploadFile = File(..., description="Image file to colorize"),
             style_prompt: str = Form(..., description="Style description"),
             quality: str = Form("high"),
             safety_level: str = Form("block_some"),
-            output_format: str = Form("png")
+            output_format: str = Form("png"),
+            chroma_transfer: Optional[bool] = Form(
+                None,
+                description="Generate from a low-resolution proxy and keep the upload's luminance"
+            ),
+            input_profile: Optional[str] = Form(
+                None, description="Encoding profile of the model input: fast, balanced or smallest"
+            ),
+            output_profile: Optional[str] = Form(
+                None,
+                description=("Encoding profile of the result; "
+                             "a PNG result is re-encoded only when set")
+            )
         ):
             """
             Colorize a single image with AI
+
+            Send `Accept: image/*` to receive the raw image bytes instead of
+            the JSON envelope (metadata moves to X-* headers). The generated
+            master is kept in the bounded master store; other formats and
+            sizes are served later from /api/v1/results/{result_id}.
             """
+            wrapped_file = None
             try:
                 # Validate inputs
-                if not image.content_type.startswith('image/'):
-                    raise HTTPException(400, "File must be an image")
-
                 validate_prompt(style_prompt)
+                for profile in (input_profile, output_profile):
+                    if profile:
+                        get_encoding_profile(profile)
 
                 # Spell check prompt
                 corrected_prompt, _ = check_style_prompt(style_prompt)
@@ -136,24 +285,12 @@ class NANozILLAAPI:
                 if not self.reactor_agent or not self.image_processor:
                     raise HTTPException(503, "Service components not available")
 
-                # Process image
-                image_data = await image.read()
-
-                # Create in-memory file-like object
-                class UploadFileWrapper:
-                    def __init__(self, data, filename, content_type):
-                        self.data = data
-                        self.name = filename
-                        self.type = content_type
-
-                    def getvalue(self):
-                        return self.data
-
-                wrapped_file = UploadFileWrapper(image_data, image.filename, image.content_type)
+                # Stream upload with size cap, magic-byte sniffing and header probe
+                wrapped_file = await ingest_upload(image)
 
                 # Process image
                 processed_bytes, image_info = self.image_processor.process_uploaded_image(
-                    wrapped_file, validate_colors=True, auto_resize=True
+                    wrapped_file, validate_colors=True, auto_resize=True, profile=input_profile
                 )
 
                 # Generate colorization
@@ -162,27 +299,57 @@ class NANozILLAAPI:
                     style_prompt=corrected_prompt,
                     quality=quality,
                     safety_level=safety_level,
-                    retry_attempts=3
+                    retry_attempts=3,
+                    chroma_transfer=chroma_transfer
                 )
+                result_id = await asyncio.to_thread(self._get_master_store().put, generated_bytes)
+
+                # Convert format if needed, off the event loop. Delivery formats are
+                # rendered through the derivative cache, so /api/v1/results serves
+                # the same variant later without encoding it again
+                if output_format.lower() != 'png' or output_profile:
+                    if output_format.lower() in VARIANT_FORMATS:
+                        spec = make_variant_spec(output_format, profile=output_profile,
+                                                 default_profile=settings.OUTPUT_ENCODING)
+                        generated_bytes = await asyncio.to_thread(
+                            self._get_derivatives().get, result_id, spec
+                        )
+                    else:
+                        generated_bytes, _ = await asyncio.to_thread(
+                            self.image_processor.convert_format,
+                            generated_bytes, output_format.upper(), profile=output_profile
+                        )
 
-                # Convert format if needed
-                if output_format.lower() != 'png':
-                    converted_bytes, _ = self.image_processor.convert_format(
-                        generated_bytes, output_format.upper()
+                generation_id = f"gen_{uuid.uuid4().hex[:12]}"
+                if request.headers.get("accept", "").startswith("image/"):
+                    return Response(
+                        content=generated_bytes,
+                        media_type=FORMAT_MIME_TYPES.get(output_format.upper(),
+                                                         "application/octet-stream"),
+                        headers={
+                            "X-Generation-Id": generation_id,
+                            "X-Result-Id": result_id,
+                            "X-Processing-Time":
+                                f"{self.reactor_agent.last_generation_time or 0:.3f}",
+                            "X-Image-Width": str(image_info.get('width')),
+                            "X-Image-Height": str(image_info.get('height'))
+                        }
                     )
-                    generated_bytes = converted_bytes
 
                 # Prepare response
                 response_data = {
                     "image_data": generated_bytes.hex(),  # Convert to hex for JSON
-                    "generation_id": f"gen_{uuid.uuid4().hex[:12]}",
+                    "generation_id": generation_id,
+                    "result_id": result_id,
+                    "result_url": f"/api/v1/results/{result_id}",
                     "processing_time": self.reactor_agent.last_generation_time,
                     "image_info": {
                         "format": output_format.upper(),
                         "width": image_info.get('width'),
                         "height": image_info.get('height'),
                         "file_size": len(generated_bytes),
-                        "color_mode": image_info.get('color_analysis', {}).get('color_mode', 'RGB')
+                        "color_mode": image_info.get('color_analysis', {}).get('color_mode', 'RGB'),
+                        "model_input": image_info.get('model_input')
                     },
                     "style_prompt_used": corrected_prompt
                 }
@@ -197,45 +364,53 @@ class NANozILLAAPI:
                     }
                 )
 
-            except ValueError as e:
-                raise HTTPException(400, f"Validation error: {str(e)}")
             except Exception as e:
-                raise HTTPException(500, f"Processing error: {str(e)}")
+                raise self._to_http_exception(e, "Processing error")
+            finally:
+                if wrapped_file:
+                    wrapped_file.close()
 
         @self.app.post("/api/v1/colorize/batch")
         async def batch_colorize(
             background_tasks: BackgroundTasks,
             images: List[UploadFile] = File(..., description="Multiple image files"),
             style_prompt: str = Form(..., description="Style description for all images"),
-            concurrent: int = Form(3)
+            concurrent: int = Form(3),
+            callback_url: Optional[str] = Form(
+                None, description="URL to POST the signed completion event to"
+            )
         ):
             """
             Process multiple images in batch
+
+            With callback_url, a signed `job.completed` or `job.failed` event
+            is POSTed there when the job ends (see core/webhooks.py).
             """
+            ingested = []
             try:
                 # Validate inputs
-                if len(images) > 10:
-                    raise HTTPException(400, "Maximum 10 images per batch")
+                if len(images) > settings.MAX_BATCH_IMAGES:
+                    raise HTTPException(
+                        400, f"Maximum {settings.MAX_BATCH_IMAGES} images per batch"
+                    )
 
                 validate_prompt(style_prompt)
+                await self._check_callback_url(callback_url)
+
+                # Spell check once: every image in the batch shares the prompt
+                corrected_prompt, _ = check_style_prompt(style_prompt)
+
+                # Ingest every upload now: request files are closed once we respond
+                for image in images:
+                    ingested.append(await ingest_upload(image))
 
                 # Create job
-                job_id = f"batch_{uuid.uuid4().hex[:12]}"
-                job = {
-                    "job_id": job_id,
-                    "status": "processing",
-                    "progress": 0,
-                    "total_images": len(images),
-                    "processed_images": 0,
-                    "results": [],
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-                self.jobs[job_id] = job
+                job_id = self._create_job(f"batch_{uuid.uuid4().hex[:12]}", "batch", len(images),
+                                          callback_url)
 
                 # Process in background
                 background_tasks.add_task(
-                    self._process_batch_job, job_id, images, style_prompt, concurrent
+                    self._process_batch_job, job_id, ingested, corrected_prompt, concurrent
                 )
 
                 return {
@@ -252,26 +427,253 @@ class NANozILLAAPI:
                 }
 
             except Exception as e:
-                raise HTTPException(500, f"Batch processing error: {str(e)}")
+                for upload in ingested:
+                    upload.close()
+                raise self._to_http_exception(e, "Batch processing error")
+
+        @self.app.post(ARCHIVE_UPLOAD_PATH)
+        async def archive_colorize(
+            request: Request,
+            background_tasks: BackgroundTasks,
+            style_prompt: str = Query(..., description="Style description for all images"),
+            concurrent: int = Query(3, ge=1, le=settings.MAX_ARCHIVE_CONCURRENCY),
+            callback_url: Optional[str] = Query(None)
+        ):
+            """
+            Colorize every image of a tar or zip archive sent as the request body
+
+            The body is streamed to disk and unpacked entry by entry. Results
+            go to the result store; download them with
+            GET /api/v1/jobs/{job_id}/results.tar.
+            """
+            job_id = f"archive_{uuid.uuid4().hex[:12]}"
+            work_dir = os.path.join(settings.WORK_DIR, job_id)
+            try:
+                validate_prompt(style_prompt)
+                await self._check_callback_url(callback_url)
+                corrected_prompt, _ = check_style_prompt(style_prompt)
+
+                os.makedirs(work_dir)
+                archive_path = os.path.join(work_dir, "upload")
+                await spool_body(request.stream(), archive_path, settings.MAX_ARCHIVE_SIZE)
+                entries, rejected = await asyncio.to_thread(
+                    unpack_archive, archive_path, os.path.join(work_dir, "inputs"),
+                    settings.MAX_ARCHIVE_ENTRIES, settings.MAX_IMAGE_SIZE,
+                    settings.MAX_ARCHIVE_UNPACKED_SIZE
+                )
+                os.unlink(archive_path)
+                if not entries:
+                    raise ValueError("Archive contains no images")
+
+                return self._start_archive_job(
+                    background_tasks, job_id, entries, work_dir, corrected_prompt, concurrent,
+                    callback_url, rejected
+                )
+
+            except Exception as e:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                raise self._to_http_exception(e, "Archive processing error")
+
+        @self.app.post("/api/v1/colorize/manifest")
+        async def manifest_colorize(request: ManifestBatchRequest,
+                                    background_tasks: BackgroundTasks):
+            """
+            Colorize images referenced by URL
+
+            Each blob is fetched into the job's work directory when a worker
+            picks it up. Results are downloaded as for archive jobs.
+            """
+            job_id = f"archive_{uuid.uuid4().hex[:12]}"
+            work_dir = os.path.join(settings.WORK_DIR, job_id)
+            try:
+                validate_prompt(request.style_prompt)
+                await self._check_callback_url(request.callback_url)
+                await asyncio.to_thread(validate_blob_urls, [item.url for item in request.items])
+                corrected_prompt, _ = check_style_prompt(request.style_prompt)
+
+                entries = manifest_entries(
+                    [(item.url, item.name) for item in request.items],
+                    os.path.join(work_dir, "inputs")
+                )
+                return self._start_archive_job(
+                    background_tasks, job_id, entries, work_dir, corrected_prompt,
+                    request.concurrent, request.callback_url, []
+                )
+
+            except Exception as e:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                raise self._to_http_exception(e, "Manifest processing error")
+
+        @self.app.get("/api/v1/jobs/{job_id}/results.tar")
+        async def download_job_results(job_id: str):
+            """
+            Stream an archive or manifest job's outputs as a tar
+
+            The tar is assembled on the fly from the result store, so the
+            download starts at once and uses constant memory.
+            """
+            job = self.jobs.get(job_id)
+            if not job:
+                raise HTTPException(404, "Job not found")
+            if job.get("kind") != "archive":
+                raise HTTPException(
+                    409, "Only archive and manifest jobs keep their results in the result store"
+                )
+            if job["status"] not in TERMINAL_STATUSES:
+                raise HTTPException(409, "Job is still processing")
+
+            members = [(result["output_name"], result["result_key"])
+                       for result in job["results"] if result["success"]]
+            return StreamingResponse(
+                iter_result_tar(self._get_result_store(), members),
+                media_type="application/x-tar",
+                headers={"Content-Disposition": f'attachment; filename="{job_id}.tar"'}
+            )
+
+        @self.app.get("/api/v1/results/{result_id}")
+        async def get_result(
+            request: Request,
+            result_id: str,
+            image_format: str = Query("png", alias="format", description="png, jpeg or webp"),
+            max_dim: Optional[int] = Query(None, ge=MIN_VARIANT_DIMENSION,
+                                           le=settings.MAX_DIMENSION),
+            profile: Optional[str] = Query(
+                None, description="Encoding profile: fast, balanced or smallest"
+            )
+        ):
+            """
+            Serve a stored result, or a format/size variant of it
+
+            Variants are rendered from the stored master on first request and
+            cached; responses are immutable, so clients may cache them forever.
+            """
+            try:
+                derivatives = self._get_derivatives()
+                store = derivatives.master_store(result_id)
+                spec = make_variant_spec(image_format, max_dim, profile, settings.OUTPUT_ENCODING)
+
+                # The ETag comes from the request alone: revalidation reads neither the
+                # master nor the variant
+                headers = {
+                    "ETag": f'"{spec.key(result_id)}"',
+                    "Cache-Control": "public, max-age=31536000, immutable"
+                }
+                if request.headers.get("if-none-match") == headers["ETag"]:
+                    return Response(status_code=304, headers=headers)
+
+                as_stored = max_dim is None and profile is None and \
+                    spec.format == await asyncio.to_thread(derivatives.master_format, result_id)
+                if as_stored:
+                    data = await asyncio.to_thread(store.get, result_id)
+                else:
+                    data = await asyncio.to_thread(derivatives.get, result_id, spec)
+                return Response(content=data, media_type=FORMAT_MIME_TYPES[spec.format],
+                                headers=headers)
+
+            except (KeyError, FileNotFoundError):
+                raise HTTPException(404, "Result not found")
+            except Exception as e:
+                raise self._to_http_exception(e, "Result error")
+
+        @self.app.get("/api/v1/results/{result_id}/variants")
+        async def prepare_result_variants(
+            result_id: str,
+            spec: List[str] = Query(
+                ..., description="format[:max_dim[:profile]], e.g. webp:512 (repeatable)"
+            )
+        ):
+            """
+            Render several variants of a result from one decode and return their URLs
+
+            Galleries call this once per image, then fetch each URL from the cache.
+            """
+            try:
+                if len(spec) > settings.MAX_VARIANTS_PER_REQUEST:
+                    raise HTTPException(
+                        400, f"Maximum {settings.MAX_VARIANTS_PER_REQUEST} variants per request"
+                    )
+                specs = [parse_variant_spec(text, settings.OUTPUT_ENCODING) for text in spec]
+                variants = await asyncio.to_thread(self._get_derivatives().get_many,
+                                                   result_id, specs)
+                return {
+                    "success": True,
+                    "data": {
+                        "result_id": result_id,
+                        "variants": [
+                            {"spec": item.label, "url": self._variant_url(result_id, item),
+                             "bytes": len(variants[item])}
+                            for item in specs
+                        ]
+                    },
+                    "metadata": {
+                        "version": "2.0.0",
+                        "timestamp": datetime.utcnow().isoformat()
+                    }
+                }
+
+            except (KeyError, FileNotFoundError):
+                raise HTTPException(404, "Result not found")
+            except Exception as e:
+                raise self._to_http_exception(e, "Result error")
 
         @self.app.get("/api/v1/jobs/{job_id}")
-        async def get_job_status(job_id: str):
+        async def get_job_status(
+            job_id: str,
+            wait: float = Query(0, ge=0, le=settings.JOB_LONG_POLL_MAX_WAIT),
+            since: Optional[int] = Query(None, ge=0),
+            include_results: bool = True
+        ):
             """
             Get status of a batch processing job
+
+            With `wait`, long-polls: responds as soon as the job changes
+            after version `since` (default: the current version) or the job
+            finishes, and after at most `wait` seconds otherwise. Pass
+            include_results=false to skip the hex-encoded results while the
+            job is still running.
             """
             job = self.jobs.get(job_id)
             if not job:
                 raise HTTPException(404, "Job not found")
 
+            events = self.job_events.get(job_id)
+            if wait and events is not None and job["status"] not in TERMINAL_STATUSES:
+                await events.wait(events.version if since is None else since, wait)
+
+            data = job if include_results else {k: v for k, v in job.items() if k != "results"}
             return {
                 "success": True,
-                "data": job,
+                "data": {**data, "version": events.version if events else 0},
                 "metadata": {
                     "version": "2.0.0",
                     "timestamp": datetime.utcnow().isoformat()
                 }
             }
 
+        @self.app.get("/api/v1/jobs/{job_id}/events")
+        async def stream_job_events(job_id: str, request: Request,
+                                    last_event_id: int = Query(0, ge=0)):
+            """
+            Stream job progress as Server-Sent Events
+
+            One `item` event per finished image (without image data), then a
+            final `completed` or `failed` event, after which the stream
+            ends. Reconnecting clients resume with the Last-Event-ID header.
+            """
+            events = self.job_events.get(job_id)
+            if job_id not in self.jobs or events is None:
+                raise HTTPException(404, "Job not found")
+
+            header = request.headers.get("last-event-id", "")
+            if header.isdigit():
+                last_event_id = int(header)
+
+            return StreamingResponse(
+                self._job_event_stream(events, last_event_id),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
         @self.app.get("/api/v1/analytics/usage")
         async def get_usage_analytics():
             """
@@ -309,25 +711,34 @@ class NANozILLAAPI:
                 }
             }
 
+        @self.app.post("/api/v1/prompts/analyze")
+        async def analyze_prompts(request: PromptAnalysisRequest):
+            """
+            Validate and spell check many prompts, streamed back as NDJSON
+
+            One line per prompt in input order, then a summary line.
+            """
+            try:
+                checker = get_spell_checker(request.tenant)
+            except ValueError as e:
+                raise HTTPException(400, f"Validation error: {str(e)}")
+
+            return StreamingResponse(
+                self._analyze_prompt_lines(request.prompts, checker),
+                media_type="application/x-ndjson"
+            )
+
+    def _setup_profiling(self):
+        """Setup admin-only profiling middleware and routes"""
+        from core.profiling import install_profiling
+        install_profiling(self.app)
+
     def _setup_exception_handlers(self):
         """Setup global exception handlers"""
 
         @self.app.exception_handler(HTTPException)
         async def http_exception_handler(request, exc):
-            return JSONResponse(
-                status_code=exc.status_code,
-                content={
-                    "success": False,
-                    "error": {
-                        "code": exc.status_code,
-                        "message": exc.detail
-                    },
-                    "metadata": {
-                        "version": "2.0.0",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                }
-            )
+            return self._error_response(exc.status_code, exc.detail, headers=exc.headers)
 
         @self.app.exception_handler(Exception)
         async def general_exception_handler(request, exc):
@@ -346,12 +757,105 @@ class NANozILLAAPI:
                 }
             )
 
-    async def _process_batch_job(self, job_id: str, images: List[UploadFile], style_prompt: str, concurrent: int):
+    def _to_http_exception(self, error: Exception, context: str) -> HTTPException:
+        """Map request handling errors to HTTP status codes"""
+        if isinstance(error, HTTPException):
+            return error
+        if isinstance(error, UploadTooLargeError):
+            return HTTPException(413, str(error))
+        if isinstance(error, UnsupportedImageError):
+            return HTTPException(415, str(error))
+        if isinstance(error, ValueError):
+            return HTTPException(400, f"Validation error: {str(error)}")
+        if isinstance(error, BackendError) and error.status_code in (429, 503, 504):
+            # Pass backend throttling through so clients can back off
+            headers = None
+            if error.retry_after is not None:
+                headers = {"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+            return HTTPException(error.status_code, f"{context}: {str(error)}", headers=headers)
+        return HTTPException(500, f"{context}: {str(error)}")
+
+    def _error_response(
+        self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None
+    ) -> JSONResponse:
+        """Build the standard error envelope"""
+        return JSONResponse(
+            status_code=status_code,
+            headers=headers,
+            content={
+                "success": False,
+                "error": {
+                    "code": status_code,
+                    "message": message
+                },
+                "metadata": {
+                    "version": "2.0.0",
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            }
+        )
+
+    def _analyze_prompt_lines(self, prompts: List[str], checker: SpellChecker) -> Iterator[bytes]:
+        """Yield NDJSON analysis lines, a few dozen per chunk"""
+        errors = []
+        for prompt in prompts:
+            try:
+                validate_prompt(prompt)
+                errors.append(None)
+            except ValueError as e:
+                errors.append(str(e))
+
+        # Invalid prompts are not spell checked
+        checked = checker.check_prompts(
+            prompt if error is None else "" for prompt, error in zip(prompts, errors)
+        )
+
+        summary = {"total": len(prompts), "valid": 0, "invalid": 0, "with_issues": 0}
+        lines = []
+        outcomes = zip(prompts, errors, checked)
+        for index, (prompt, error, (corrected_prompt, issues)) in enumerate(outcomes):
+            if error is None:
+                summary["valid"] += 1
+                summary["with_issues"] += bool(issues)
+                line = {"index": index, "valid": True, "error": None,
+                        "corrected_prompt": corrected_prompt,
+                        "changed": corrected_prompt != prompt, "issues": issues}
+            else:
+                summary["invalid"] += 1
+                line = {"index": index, "valid": False, "error": error,
+                        "corrected_prompt": None, "changed": False, "issues": []}
+
+            lines.append(json.dumps(line))
+            if len(lines) >= ANALYZE_LINES_PER_CHUNK:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+
+        lines.append(json.dumps({
+            "summary": summary,
+            "metadata": {"version": "2.0.0", "timestamp": datetime.utcnow().isoformat()}
+        }))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    async def _job_event_stream(self, events: JobEventLog,
+                                last_event_id: int) -> AsyncIterator[bytes]:
+        """Replay events after last_event_id, then follow the job until it ends"""
+        yield b"retry: 3000\n\n"
+        while True:
+            for event in events.since(last_event_id):
+                last_event_id = event["id"]
+                yield format_sse(event)
+            if events.closed:
+                return
+            if not await events.wait(last_event_id, settings.JOB_EVENTS_KEEPALIVE):
+                yield format_sse(comment="keep-alive")
+
+    async def _process_batch_job(
+        self, job_id: str, images: List[IngestedUpload], style_prompt: str, concurrent: int
+    ):
         """Process batch job in background"""
+        job = self.jobs[job_id]
+        events = self.job_events[job_id]
         try:
-            job = self.jobs[job_id]
-            results = []
-
             # Initialize components
             if not self.reactor_agent:
                 self.reactor_agent = create_reactor_agent()
@@ -364,48 +868,31 @@ class NANozILLAAPI:
             async def process_single_image(image_file, index):
                 async with semaphore:
                     try:
-                        # Read and process image
-                        image_data = await image_file.read()
-
-                        class UploadFileWrapper:
-                            def __init__(self, data, filename):
-                                self.data = data
-                                self.name = filename
-                                self.type = 'image/jpeg'
-
-                            def getvalue(self):
-                                return self.data
-
-                        wrapped_file = UploadFileWrapper(image_data, image_file.filename)
-
-                        # Process image
-                        processed_bytes, image_info = self.image_processor.process_uploaded_image(
-                            wrapped_file)
-
-                        # Generate colorization
-                        generated_bytes = self.reactor_agent.execute_colorization(
-                            image_bytes=processed_bytes,
-                            style_prompt=style_prompt,
-                            quality="high",
-                            safety_level="block_some"
+                        # Off the event loop, so progress streams while images process
+                        generated_bytes, image_info, processing_time = await asyncio.to_thread(
+                            self._colorize_batch_image, image_file, style_prompt
                         )
 
                         result = {
-                            "original_filename": image_file.filename,
+                            "original_filename": image_file.name,
                             "success": True,
                             "image_data": generated_bytes.hex(),
-                            "processing_time": self.reactor_agent.last_generation_time,
+                            "processing_time": processing_time,
                             "image_info": image_info
                         }
 
                     except Exception as e:
                         result = {
-                            "original_filename": image_file.filename,
+                            "original_filename": image_file.name,
                             "success": False,
                             "error": str(e),
                             "processing_time": 0
                         }
 
+                    finally:
+                        image_file.close()
+
+                    self._record_item(job, events, index, result)
                     return result
 
             # Process all images
@@ -418,11 +905,236 @@ class NANozILLAAPI:
             job["processed_images"] = len(images)
             job["results"] = batch_results
             job["updated_at"] = datetime.utcnow()
+            self._finish_job(job, events)
 
         except Exception as e:
             job["status"] = "failed"
             job["error_message"] = str(e)
             job["updated_at"] = datetime.utcnow()
+            self._finish_job(job, events)
+
+    async def _process_archive_job(
+        self, job_id: str, entries: List[ArchiveEntry], work_dir: str, style_prompt: str,
+        concurrent: int
+    ):
+        """
+        Process an archive or manifest job in background
+
+        A fixed pool of workers pulls entries from a shared iterator, so
+        memory stays flat however many entries there are. Outputs go to the
+        result store; the job keeps only their keys.
+        """
+        job = self.jobs[job_id]
+        events = self.job_events[job_id]
+        http = None
+        try:
+            if not self.reactor_agent:
+                self.reactor_agent = create_reactor_agent()
+            if not self.image_processor:
+                self.image_processor = create_image_processor()
+            store = self._get_result_store()
+
+            if any(entry.url for entry in entries):
+                http = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=concurrent),
+                    timeout=httpx.Timeout(60.0),
+                    follow_redirects=True,
+                    # Every hop, redirects included, must stay on allowed public hosts
+                    event_hooks={"request": [outbound_request_guard(validate_blob_url)]}
+                )
+
+            pending = iter(entries)
+
+            async def worker():
+                # Workers share the iterator; next() never yields to the loop
+                for entry in pending:
+                    result = await self._colorize_archive_entry(entry, style_prompt, store, http)
+                    job["results"].append(result)
+                    self._record_item(job, events, entry.index, result)
+
+            await asyncio.gather(*(worker() for _ in range(min(concurrent, len(entries)))))
+
+            job["results"].sort(key=lambda result: result["index"])
+            job["status"] = "completed"
+            job["progress"] = 100
+            job["updated_at"] = datetime.utcnow()
+            self._finish_job(job, events)
+
+        except Exception as e:
+            job["status"] = "failed"
+            job["error_message"] = str(e)
+            job["updated_at"] = datetime.utcnow()
+            self._finish_job(job, events)
+
+        finally:
+            if http is not None:
+                await http.aclose()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    async def _colorize_archive_entry(
+        self, entry: ArchiveEntry, style_prompt: str, store: ResultStore,
+        http: Optional[httpx.AsyncClient]
+    ) -> Dict[str, Any]:
+        """Fetch (for manifests), colorize and store one entry"""
+        result = {"index": entry.index, "original_filename": entry.name,
+                  "output_name": entry.output_name}
+        try:
+            if entry.url:
+                await fetch_blob(http, entry.url, entry.path, settings.MAX_IMAGE_SIZE)
+
+            def colorize():
+                with ingest_file(entry.path, entry.name) as upload:
+                    generated_bytes, image_info, processing_time = self._colorize_batch_image(
+                        upload, style_prompt
+                    )
+                return store.put(generated_bytes), len(generated_bytes), image_info, processing_time
+
+            key, size, image_info, processing_time = await asyncio.to_thread(colorize)
+            result.update({
+                "success": True,
+                "result_key": key,
+                "result_url": f"/api/v1/results/{key}",
+                "bytes": size,
+                "width": image_info.get("width"),
+                "height": image_info.get("height"),
+                "processing_time": processing_time
+            })
+
+        except Exception as e:
+            result.update({"success": False, "error": str(e), "processing_time": 0})
+
+        finally:
+            if os.path.exists(entry.path):
+                os.unlink(entry.path)
+
+        return result
+
+    def _create_job(self, job_id: str, kind: str, total_images: int, callback_url: Optional[str],
+                    **extra) -> str:
+        """Register a processing job and its event log"""
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "processing",
+            "progress": 0,
+            "total_images": total_images,
+            "processed_images": 0,
+            "results": [],
+            "callback_url": callback_url,
+            **extra,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        self.job_events[job_id] = JobEventLog()
+        return job_id
+
+    def _start_archive_job(
+        self, background_tasks: BackgroundTasks, job_id: str, entries: List[ArchiveEntry],
+        work_dir: str, style_prompt: str, concurrent: int, callback_url: Optional[str],
+        rejected: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        result_url = f"/api/v1/jobs/{job_id}/results.tar"
+        self._create_job(job_id, "archive", len(entries), callback_url,
+                         rejected_entries=rejected, result_url=result_url)
+        background_tasks.add_task(self._process_archive_job, job_id, entries, work_dir,
+                                  style_prompt, concurrent)
+        return {
+            "success": True,
+            "data": {
+                "job_id": job_id,
+                "status": "processing",
+                "total_images": len(entries),
+                "rejected_entries": rejected,
+                "result_url": result_url
+            },
+            "metadata": {
+                "version": "2.0.0",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        }
+
+    def _record_item(self, job: Dict[str, Any], events: JobEventLog, index: int,
+                     result: Dict[str, Any]):
+        """Count a finished image and publish its progress event"""
+        job["processed_images"] += 1
+        job["progress"] = int(100 * job["processed_images"] / job["total_images"])
+        job["updated_at"] = datetime.utcnow()
+        events.publish("item", {
+            "index": index,
+            "original_filename": result["original_filename"],
+            "success": result["success"],
+            "error": result.get("error"),
+            "processing_time": result["processing_time"],
+            "processed_images": job["processed_images"],
+            "total_images": job["total_images"],
+            "progress": job["progress"]
+        })
+
+    async def _check_callback_url(self, callback_url: Optional[str]):
+        if callback_url:
+            await asyncio.to_thread(validate_callback_url, callback_url)
+            if self._get_webhooks() is None:
+                raise HTTPException(400, "Webhook callbacks are not enabled on this server")
+
+    def _get_result_store(self) -> ResultStore:
+        if self.result_store is None:
+            self.result_store = get_result_store()
+        return self.result_store
+
+    def _get_master_store(self) -> BoundedResultStore:
+        if self.master_store is None:
+            self.master_store = get_master_store()
+        return self.master_store
+
+    def _get_derivatives(self) -> DerivativeCache:
+        if self.derivatives is None:
+            # Single-image masters first, then archive and manifest outputs
+            self.derivatives = create_derivative_cache(
+                [self._get_master_store(), self._get_result_store()], get_derivative_store()
+            )
+        return self.derivatives
+
+    def _variant_url(self, result_id: str, spec: VariantSpec) -> str:
+        params = {"format": spec.format.lower(), "profile": spec.profile}
+        if spec.max_dim:
+            params["max_dim"] = spec.max_dim
+        return f"/api/v1/results/{result_id}?{urlencode(params)}"
+
+    def _finish_job(self, job: Dict[str, Any], events: JobEventLog):
+        """Announce a finished job to SSE/long-poll waiters and its callback URL"""
+        summary = self._job_summary(job)
+        events.publish(job["status"], summary, final=True)
+        if job.get("callback_url"):
+            # Only queues the event; delivery happens on the dispatcher's worker
+            self._get_webhooks().enqueue(job["callback_url"], f"job.{job['status']}", summary)
+
+    def _get_webhooks(self) -> Optional[WebhookDispatcher]:
+        if self.webhooks is None:
+            self.webhooks = create_webhook_dispatcher()
+        return self.webhooks
+
+    async def _shutdown(self):
+        if self.webhooks is not None:
+            await self.webhooks.aclose()
+
+    def _colorize_batch_image(self, image_file: IngestedUpload, style_prompt: str):
+        """Process and colorize one batch image (runs in a worker thread)"""
+        started = time.perf_counter()
+        processed_bytes, image_info = self.image_processor.process_uploaded_image(image_file)
+        generated_bytes = self.reactor_agent.execute_colorization(
+            image_bytes=processed_bytes,
+            style_prompt=style_prompt,
+            quality="high",
+            safety_level="block_some"
+        )
+        return generated_bytes, image_info, time.perf_counter() - started
+
+    def _job_summary(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job fields for push events: everything except the results"""
+        summary = {k: v for k, v in job.items() if k != "results"}
+        summary["succeeded"] = sum(1 for result in job["results"] if result.get("success"))
+        summary["failed_images"] = len(job["results"]) - summary["succeeded"]
+        return summary
 
 
 # Create API server instance
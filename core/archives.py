@@ -0,0 +1,289 @@
+"""
+Archive batches: tar/zip uploads and URL manifests in, tar streams out
+
+An uploaded archive is spooled to the job's work directory as it arrives
+and then unpacked one entry at a time into numbered input files, so
+neither the archive nor its images are ever held in memory. Entry names
+are only kept as metadata (they never become filesystem paths), which
+rules out path traversal. Outputs are streamed back as a tar assembled on
+the fly from the result store, or as a zip for the Streamlit batch mode.
+"""
+
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+import httpx
+
+from core.result_store import ResultStore
+from utils.validators import UploadTooLargeError
+
+COPY_CHUNK_SIZE = 256 * 1024
+TAR_BLOCK = 512
+
+# Magic bytes of the containers we accept; plain tar is recognised by "ustar" at 257
+ARCHIVE_SIGNATURES = (
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),  # empty zip
+    (b'\x1f\x8b', 'tar'),  # gzip-compressed tar
+    (b'BZh', 'tar'),
+    (b'\xfd7zXZ\x00', 'tar'),
+)
+
+
+class ArchiveError(ValueError):
+    """Upload is not a usable archive or exceeds the archive limits"""
+
+
+@dataclass
+class ArchiveEntry:
+    """One image of an archive or manifest batch"""
+
+    index: int
+    name: str  # sanitized relative name, for reports and output naming only
+    path: str  # input file in the work directory
+    output_name: str = ""
+    url: Optional[str] = None
+
+
+def safe_member_name(name: str) -> Optional[str]:
+    """
+    Relative POSIX name for an archive member, or None to skip it
+
+    Absolute prefixes and '..' components are dropped; hidden files and
+    macOS resource forks (__MACOSX, ._*) are skipped.
+    """
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    if not parts or parts[0] == '__MACOSX' or any(part.startswith('.') for part in parts):
+        return None
+    return '/'.join(parts)
+
+
+def assign_output_names(entries: List[ArchiveEntry]):
+    """Output name per entry: the input name as .png, suffixed with the index on clashes"""
+    used = set()
+    for entry in entries:
+        path = PurePosixPath(entry.name).with_suffix('.png')
+        if str(path) in used:
+            path = path.with_name(f"{path.stem}_{entry.index}.png")
+        used.add(str(path))
+        entry.output_name = str(path)
+
+
+def sniff_archive_format(header: bytes) -> Optional[str]:
+    """'zip', 'tar' or None from the first 512 bytes of a file"""
+    for signature, archive_format in ARCHIVE_SIGNATURES:
+        if header.startswith(signature):
+            return archive_format
+    if header[257:262] == b'ustar':
+        return 'tar'
+    return None
+
+
+async def spool_body(chunks: AsyncIterator[bytes], path: str, max_bytes: int) -> int:
+    """
+    Write a streamed request body to disk, aborting past max_bytes
+
+    Returns:
+        Number of bytes written
+    """
+    total = 0
+    with open(path, 'wb') as handle:
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLargeError(
+                    f"Archive too large. Max size: {max_bytes // (1024 * 1024)}MB"
+                )
+            handle.write(chunk)
+    return total
+
+
+def unpack_archive(
+    archive_path: str,
+    inputs_dir: str,
+    max_entries: int,
+    max_entry_bytes: int,
+    max_total_bytes: int
+) -> Tuple[List[ArchiveEntry], List[Dict[str, str]]]:
+    """
+    Unpack the regular files of a tar or zip archive, one entry at a time
+
+    Sizes are counted while copying rather than trusted from the headers,
+    so decompression bombs stop at max_total_bytes.
+
+    Returns:
+        Tuple (entries, rejected) where rejected lists skipped members with a reason
+
+    Raises:
+        ArchiveError: Unknown format, corrupt archive or too many entries
+    """
+    with open(archive_path, 'rb') as handle:
+        archive_format = sniff_archive_format(handle.read(TAR_BLOCK))
+    if archive_format is None:
+        raise ArchiveError(
+            "Unsupported archive. Send a tar (optionally gzip, bzip2 or xz compressed) or zip file"
+        )
+
+    os.makedirs(inputs_dir, exist_ok=True)
+    entries: List[ArchiveEntry] = []
+    rejected: List[Dict[str, str]] = []
+    budget = [max_total_bytes]
+
+    def add(raw_name: str, declared_size: int, open_member):
+        name = safe_member_name(raw_name)
+        if name is None:
+            return
+        if declared_size > max_entry_bytes:
+            rejected.append({"name": name, "error": f"Entry larger than {max_entry_bytes} bytes"})
+            return
+        if len(entries) >= max_entries:
+            raise ArchiveError(f"Archive has more than {max_entries} images")
+
+        path = os.path.join(inputs_dir, f"{len(entries):06d}")
+        with open_member() as source, open(path, 'wb') as target:
+            written = _copy_capped(source, target, min(max_entry_bytes, budget[0]))
+        if written is None:
+            os.unlink(path)
+            if budget[0] < max_entry_bytes:
+                raise ArchiveError(f"Archive unpacks to more than {max_total_bytes} bytes")
+            rejected.append({"name": name, "error": f"Entry larger than {max_entry_bytes} bytes"})
+            return
+        budget[0] -= written
+        entries.append(ArchiveEntry(index=len(entries), name=name, path=path))
+
+    try:
+        if archive_format == 'zip':
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        add(info.filename, info.file_size, lambda info=info: archive.open(info))
+        else:
+            # Stream mode: members are read strictly in order, nothing is indexed
+            with tarfile.open(archive_path, mode='r|*') as archive:
+                for member in archive:
+                    if member.isreg():
+                        add(member.name, member.size,
+                            lambda member=member: archive.extractfile(member))
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError, RuntimeError,
+            NotImplementedError) as e:
+        raise ArchiveError(f"Corrupt archive: {e}")
+
+    assign_output_names(entries)
+    return entries, rejected
+
+
+def _copy_capped(source, target, limit: int) -> Optional[int]:
+    """Copy in chunks; None if the source holds more than limit bytes"""
+    written = 0
+    for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b''):
+        written += len(chunk)
+        if written > limit:
+            return None
+        target.write(chunk)
+    return written
+
+
+def manifest_entries(urls: List[Tuple[str, Optional[str]]], inputs_dir: str) -> List[ArchiveEntry]:
+    """Entries for a URL manifest; each is fetched into inputs_dir when processed"""
+    os.makedirs(inputs_dir, exist_ok=True)
+    entries = []
+    for index, (url, name) in enumerate(urls):
+        name = safe_member_name(name or PurePosixPath(httpx.URL(url).path).name) or f"item_{index}"
+        path = os.path.join(inputs_dir, f"{index:06d}")
+        entries.append(ArchiveEntry(index=index, name=name, path=path, url=url))
+    assign_output_names(entries)
+    return entries
+
+
+async def fetch_blob(client: httpx.AsyncClient, url: str, path: str, max_bytes: int) -> int:
+    """
+    Stream a referenced blob into the work directory
+
+    Raises:
+        UploadTooLargeError: The blob is larger than max_bytes
+        ValueError: The blob could not be fetched
+    """
+    total = 0
+    async with client.stream("GET", url) as response:
+        if response.status_code != 200:
+            raise ValueError(f"Fetching {url} returned HTTP {response.status_code}")
+        with open(path, 'wb') as handle:
+            async for chunk in response.aiter_bytes(COPY_CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadTooLargeError(
+                        f"Blob too large. Max size: {max_bytes // (1024 * 1024)}MB"
+                    )
+                handle.write(chunk)
+    return total
+
+
+def iter_result_tar(store: ResultStore, members: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Build a tar of stored results on the fly
+
+    Args:
+        store: Result store holding the blobs
+        members: (name in the archive, result key) pairs
+
+    Yields:
+        Tar bytes: one header per member followed by its content in chunks
+    """
+    mtime = int(time.time())
+    for name, key in members:
+        info = tarfile.TarInfo(name)
+        info.size = store.size(key)
+        info.mtime = mtime
+        info.mode = 0o644
+        yield info.tobuf(format=tarfile.PAX_FORMAT)
+        yield from store.iter_chunks(key)
+        remainder = info.size % TAR_BLOCK
+        if remainder:
+            yield b'\0' * (TAR_BLOCK - remainder)
+    yield b'\0' * (2 * TAR_BLOCK)  # end-of-archive marker
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that hands out what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> List[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_zip(members: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """
+    Build a zip on the fly, one member at a time
+
+    Members are stored without recompression (generated images are already
+    compressed) and the writer never seeks, so at most one member is
+    buffered at any time.
+
+    Args:
+        members: (name in the archive, content) pairs; may be a lazy iterable
+    """
+    sink = _ChunkSink()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in members:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, data)
+            yield from sink.drain()
+    yield from sink.drain()  # central directory
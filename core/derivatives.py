@@ -0,0 +1,209 @@
+"""
+On-demand variants of stored results: other formats, sizes and thumbnails
+
+A generated image is stored once, as the master, in a result store.
+Variants are produced lazily from it and cached in a bounded store under
+a key derived from the master key and the variant spec, so a repeat
+request is a single file read. All variants missing for one request come
+from a single decode, and resizing goes through Pillow's integer reduce()
+first.
+
+When every requested variant is small, that decode is reduced: JPEG
+masters use DCT scaling via draft(). draft() does nothing for PNG, which
+is what masters usually are, so the first small render of a PNG master
+also caches a proxy downscaled to proxy_dimension, and later small
+variants decode the proxy instead of the full master.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import hashlib
+import threading
+
+from PIL import Image
+
+from core.image_processor import get_encoding_profile
+from core.result_store import BoundedResultStore, ResultStore
+
+VARIANT_FORMATS = {'png': 'PNG', 'jpeg': 'JPEG', 'jpg': 'JPEG', 'webp': 'WEBP'}
+MIN_VARIANT_DIMENSION = 16
+PROXY_DIMENSION = 1024
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """One requested rendition of a stored result"""
+
+    format: str  # PNG, JPEG or WEBP
+    max_dim: Optional[int] = None  # longest side; None keeps the master's size
+    profile: str = 'balanced'
+
+    def key(self, master_key: str) -> str:
+        """Store key of this variant of a master"""
+        spec = f"{master_key}|{self.format}|{self.max_dim or 0}|{self.profile}"
+        return hashlib.sha256(spec.encode('ascii')).hexdigest()
+
+    @property
+    def label(self) -> str:
+        size = self.max_dim or 'full'
+        return f"{self.format.lower()}:{size}:{self.profile}"
+
+
+def make_variant_spec(image_format: str, max_dim: Optional[int] = None,
+                      profile: Optional[str] = None,
+                      default_profile: str = 'balanced') -> VariantSpec:
+    """
+    Validated VariantSpec
+
+    Raises:
+        ValueError: Unknown format or profile, or max_dim below MIN_VARIANT_DIMENSION
+    """
+    normalized = VARIANT_FORMATS.get(image_format.lower())
+    if normalized is None:
+        raise ValueError(f"Unsupported variant format: {image_format}. Use png, jpeg or webp")
+    if max_dim is not None and max_dim < MIN_VARIANT_DIMENSION:
+        raise ValueError(f"max_dim must be at least {MIN_VARIANT_DIMENSION}")
+    return VariantSpec(normalized, max_dim, get_encoding_profile(profile or default_profile).name)
+
+
+def parse_variant_spec(text: str, default_profile: str = 'balanced') -> VariantSpec:
+    """
+    Parse "format[:max_dim[:profile]]", e.g. "webp:512" or "jpeg:256:fast"
+
+    Raises:
+        ValueError: Malformed spec
+    """
+    parts = text.strip().split(':')
+    if not 1 <= len(parts) <= 3 or not parts[0]:
+        raise ValueError(f"Invalid variant spec: {text}. Use format[:max_dim[:profile]]")
+    max_dim = None
+    if len(parts) > 1 and parts[1] not in ('', 'full'):
+        if not parts[1].isdigit():
+            raise ValueError(f"Invalid max_dim in variant spec: {text}")
+        max_dim = int(parts[1])
+    profile = parts[2] if len(parts) > 2 else None
+    return make_variant_spec(parts[0], max_dim, profile, default_profile)
+
+
+class DerivativeCache:
+    """
+    Lazily rendered, cached variants of results held in master stores
+
+    Args:
+        masters: Stores searched in order for a master key
+        cache: Bounded store for rendered variants and proxies
+        proxy_dimension: Longest side of the cached decode proxy of
+            non-JPEG masters (0 disables proxies)
+    """
+
+    def __init__(self, masters: Sequence[ResultStore], cache: BoundedResultStore,
+                 proxy_dimension: int = PROXY_DIMENSION):
+        self.masters = list(masters)
+        self.cache = cache
+        self.proxy_dimension = proxy_dimension
+        self.stats = {"hits": 0, "misses": 0, "decodes": 0}
+        self._lock = threading.Lock()
+
+    def master_store(self, master_key: str) -> ResultStore:
+        """
+        The store holding a master
+
+        Raises:
+            KeyError: No master store has master_key
+        """
+        for store in self.masters:
+            if master_key in store:
+                return store
+        raise KeyError(master_key)
+
+    def master_format(self, master_key: str) -> str:
+        """Format of a stored master, from its header only"""
+        with self.master_store(master_key).open(master_key) as handle:
+            return Image.open(handle).format
+
+    def get(self, master_key: str, spec: VariantSpec) -> bytes:
+        """Variant bytes, rendering and caching them on a miss"""
+        return self.get_many(master_key, [spec])[spec]
+
+    def get_many(self, master_key: str, specs: Sequence[VariantSpec]) -> Dict[VariantSpec, bytes]:
+        """
+        Several variants of one master; all misses share one decode
+
+        Raises:
+            KeyError: master_key is not in the master store
+        """
+        self.master_store(master_key)
+
+        variants: Dict[VariantSpec, bytes] = {}
+        for spec in dict.fromkeys(specs):
+            try:
+                variants[spec] = self.cache.get(spec.key(master_key))
+            except (FileNotFoundError, KeyError):
+                pass
+        missing = [spec for spec in dict.fromkeys(specs) if spec not in variants]
+
+        with self._lock:
+            self.stats["hits"] += len(variants)
+            self.stats["misses"] += len(missing)
+            self.stats["decodes"] += 1 if missing else 0
+
+        if missing:
+            for spec, data in self._render(master_key, missing).items():
+                self.cache.put(data, key=spec.key(master_key))
+                variants[spec] = data
+        return variants
+
+    def _render(self, master_key: str, specs: List[VariantSpec]) -> Dict[VariantSpec, bytes]:
+        dims = [spec.max_dim for spec in specs]
+        largest = max(dims) if all(dims) else None
+        image = self._decode(master_key, largest)
+
+        rendered = {}
+        for spec in specs:
+            variant = image
+            if spec.max_dim and max(image.size) > spec.max_dim:
+                scale = spec.max_dim / max(image.size)
+                size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                variant = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            if spec.format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+                variant = variant.convert('RGB')
+
+            rendered[spec] = get_encoding_profile(spec.profile).encode(variant, spec.format)
+        return rendered
+
+    def _decode(self, master_key: str, largest: Optional[int]) -> Image.Image:
+        """Decoded master, or a reduced stand-in when no variant is larger than largest"""
+        use_proxy = largest is not None and largest <= self.proxy_dimension
+        proxy_key = self._proxy_key(master_key)
+        if use_proxy:
+            try:
+                with self.cache.open(proxy_key) as handle:
+                    image = Image.open(handle)
+                    image.load()
+                    return image
+            except (FileNotFoundError, KeyError):
+                pass
+
+        with self.master_store(master_key).open(master_key) as handle:
+            image = Image.open(handle)
+            if largest is not None:
+                # Decode no larger than the largest variant needs (JPEG masters only)
+                image.draft(None, (largest, largest))
+            image.load()
+
+        if use_proxy and image.format != 'JPEG' and max(image.size) > self.proxy_dimension:
+            scale = self.proxy_dimension / max(image.size)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            self.cache.put(get_encoding_profile('fast').encode(image, 'PNG'), key=proxy_key)
+        return image
+
+    def _proxy_key(self, master_key: str) -> str:
+        spec = f"{master_key}|proxy|{self.proxy_dimension}"
+        return hashlib.sha256(spec.encode('ascii')).hexdigest()
+
+
+def create_derivative_cache(masters: Sequence[ResultStore],
+                            cache: BoundedResultStore) -> DerivativeCache:
+    """Factory function for DerivativeCache"""
+    return DerivativeCache(masters, cache)
@@ -0,0 +1,308 @@
+"""
+Pluggable image generation backends for the Reactor Agent
+"""
+
+from google import genai
+from PIL import Image, ImageOps
+from typing import Callable, Optional, Protocol, runtime_checkable
+import hashlib
+import io
+import math
+import random
+import threading
+import time
+
+from config.settings import settings
+
+
+# ============================================================================
+# BACKEND ERRORS
+# ============================================================================
+
+
+class BackendError(Exception):
+    """Base error raised by generation backends"""
+
+    status_code = 500
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{self.status_code} {message}")
+        self.retry_after = retry_after
+
+
+class RateLimitError(BackendError):
+    """Backend rejected the call because of rate limiting (HTTP 429)"""
+
+    status_code = 429
+
+
+class ServiceUnavailableError(BackendError):
+    """Backend is temporarily unavailable (HTTP 503)"""
+
+    status_code = 503
+
+
+class BackendTimeoutError(BackendError):
+    """Backend did not answer in time (HTTP 504)"""
+
+    status_code = 504
+
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+
+@runtime_checkable
+class GenerationBackend(Protocol):
+    """Interface every generation backend implements"""
+
+    name: str
+    model: str
+
+    def generate(
+        self,
+        image_bytes: bytes,
+        style_prompt: str,
+        quality: str,
+        safety_level: str
+    ) -> bytes:
+        """Generate one image and return its encoded bytes"""
+        ...
+
+
+# ============================================================================
+# GEMINI BACKEND
+# ============================================================================
+
+
+class GeminiBackend:
+    """Generation backend calling the Google Gemini image API"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        self.api_key = api_key or settings.GEMINI_API_KEY
+        self.model = model or settings.MODEL_NAME
+
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY not configured")
+
+        self.client = genai.Client(api_key=self.api_key)
+
+    def generate(
+        self, image_bytes: bytes, style_prompt: str, quality: str, safety_level: str
+    ) -> bytes:
+        """
+        Make API call to Gemini
+        """
+        config = {
+            "number_of_images": 1,
+            "quality": quality,
+            "safety_filter_level": safety_level
+        }
+
+        result = self.client.models.generate_images(
+            model=self.model,
+            prompt=style_prompt,
+            image=image_bytes,
+            config=config
+        )
+
+        return self._process_api_result(result)
+
+    def close(self):
+        """
+        Close the underlying client where the SDK version supports it
+        """
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+    def _process_api_result(self, result) -> bytes:
+        """
+        Process and validate API result
+        """
+        if not result or not hasattr(result, 'generated_images'):
+            raise ValueError("Invalid API response: missing generated_images")
+
+        if not result.generated_images:
+            raise ValueError("No images generated by API")
+
+        try:
+            image_data = result.generated_images[0].image.image_bytes
+
+            if not image_data or len(image_data) < 100:
+                raise ValueError("Generated image data is invalid or corrupted")
+
+            return image_data
+
+        except AttributeError as e:
+            raise ValueError(f"Unable to extract image data: {str(e)}")
+
+
+# ============================================================================
+# SIMULATOR BACKEND
+# ============================================================================
+
+
+class SimulatorBackend:
+    """
+    Deterministic local backend for offline load tests and benchmarks
+
+    The output is a duotone colorization of the input whose palette is derived
+    from the prompt, so identical inputs always give identical bytes. Latency,
+    injected errors and the throughput cap are drawn from a seeded RNG.
+    """
+
+    name = "simulator"
+
+    LATENCY_DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(
+        self,
+        latency_distribution: Optional[str] = None,
+        latency_mean: Optional[float] = None,
+        latency_stddev: Optional[float] = None,
+        error_rate_429: Optional[float] = None,
+        error_rate_503: Optional[float] = None,
+        timeout_rate: Optional[float] = None,
+        timeout_seconds: Optional[float] = None,
+        max_rps: Optional[float] = None,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.model = f"simulator/{settings.MODEL_NAME}"
+        self.latency_distribution = (
+            latency_distribution or settings.SIMULATOR_LATENCY_DISTRIBUTION
+        ).lower()
+        self.latency_mean = _pick(latency_mean, settings.SIMULATOR_LATENCY_MEAN)
+        self.latency_stddev = _pick(latency_stddev, settings.SIMULATOR_LATENCY_STDDEV)
+        self.error_rate_429 = _pick(error_rate_429, settings.SIMULATOR_ERROR_RATE_429)
+        self.error_rate_503 = _pick(error_rate_503, settings.SIMULATOR_ERROR_RATE_503)
+        self.timeout_rate = _pick(timeout_rate, settings.SIMULATOR_TIMEOUT_RATE)
+        self.timeout_seconds = _pick(timeout_seconds, settings.SIMULATOR_TIMEOUT_SECONDS)
+        self.max_rps = _pick(max_rps, settings.SIMULATOR_MAX_RPS)
+        self.seed = _pick(seed, settings.SIMULATOR_SEED)
+
+        if self.latency_distribution not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+        if self.error_rate_429 + self.error_rate_503 + self.timeout_rate > 1.0:
+            raise ValueError("Simulator error rates must sum to at most 1.0")
+
+        self._sleep = sleep
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.call_count = 0
+
+    def generate(
+        self, image_bytes: bytes, style_prompt: str, quality: str, safety_level: str
+    ) -> bytes:
+        """
+        Simulate a generation call
+        """
+        self._wait_for_slot()
+
+        with self._lock:
+            self.call_count += 1
+            latency = self._draw_latency()
+            outcome = self._rng.random()
+
+        if outcome < self.timeout_rate:
+            self._sleep(self.timeout_seconds)
+            raise BackendTimeoutError("DEADLINE_EXCEEDED: simulated timeout")
+
+        self._sleep(latency)
+
+        if outcome < self.timeout_rate + self.error_rate_429:
+            raise RateLimitError("RESOURCE_EXHAUSTED: simulated rate limit", retry_after=1.0)
+        if outcome < self.timeout_rate + self.error_rate_429 + self.error_rate_503:
+            raise ServiceUnavailableError("UNAVAILABLE: simulated outage")
+
+        return self.transform(image_bytes, style_prompt)
+
+    def transform(self, image_bytes: bytes, style_prompt: str) -> bytes:
+        """
+        Deterministically colorize the input with a prompt-derived duotone
+        """
+        digest = hashlib.sha256(style_prompt.encode('utf-8')).digest()
+        dark = tuple(c // 3 for c in digest[0:3])
+        light = tuple(128 + c // 2 for c in digest[3:6])
+
+        image = Image.open(io.BytesIO(image_bytes))
+        colorized = ImageOps.colorize(image.convert('L'), black=dark, white=light)
+
+        output = io.BytesIO()
+        colorized.save(output, format='PNG')
+        return output.getvalue()
+
+    def _draw_latency(self) -> float:
+        """
+        Draw one latency sample in seconds (caller holds the lock)
+        """
+        mean, stddev = self.latency_mean, self.latency_stddev
+        distribution = self.latency_distribution
+
+        if mean <= 0 or distribution == 'constant':
+            return max(mean, 0.0)
+        if distribution == 'uniform':
+            half_width = stddev * math.sqrt(3)
+            return max(self._rng.uniform(mean - half_width, mean + half_width), 0.0)
+        if distribution == 'normal':
+            return max(self._rng.gauss(mean, stddev), 0.0)
+        if distribution == 'exponential':
+            return self._rng.expovariate(1.0 / mean)
+
+        # Lognormal parameterised by the mean and stddev of the samples
+        sigma_sq = math.log(1 + (stddev / mean) ** 2)
+        mu = math.log(mean) - sigma_sq / 2
+        return self._rng.lognormvariate(mu, math.sqrt(sigma_sq))
+
+    def _wait_for_slot(self):
+        """
+        Enforce the throughput cap by handing out evenly spaced start slots
+        """
+        if not self.max_rps or self.max_rps <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.max_rps
+
+        if slot > now:
+            self._sleep(slot - now)
+
+
+def _pick(value, default):
+    """Return value unless it is None"""
+    return default if value is None else value
+
+
+# ============================================================================
+# FACTORY
+# ============================================================================
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "simulator": SimulatorBackend,
+}
+
+
+def create_generation_backend(name: Optional[str] = None, **kwargs) -> GenerationBackend:
+    """
+    Create the generation backend selected by name or by settings
+
+    Args:
+        name: Backend name ('gemini' or 'simulator'), defaults to GENERATION_BACKEND
+        **kwargs: Backend specific options
+
+    Returns:
+        GenerationBackend instance
+    """
+    name = (name or settings.GENERATION_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown generation backend: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,137 @@
+"""
+Background generation for the Streamlit UI
+
+The script thread submits a generation and returns immediately; a small
+thread pool runs ReactorAgent.execute_colorization. Each task keeps the
+stage events the agent reports (rate-limit wait, API call, retry, done),
+plus the preprocess/queued/failed stages recorded here, so the UI can
+poll a task and render real progress instead of a timer.
+
+The input may still be preprocessing when the task is submitted (a
+Future of a PreparedImage); the worker then waits for it first.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+import threading
+import time
+import traceback
+import uuid
+
+from core.reactor_agent import ReactorAgent
+
+STAGES = ("preprocess", "queued", "rate_limit_wait", "api_call", "retry", "done", "failed")
+
+
+class GenerationTask:
+    """
+    One submitted generation and the stage events it has emitted so far
+
+    Events are appended by the worker thread and read by script threads.
+    """
+
+    def __init__(self):
+        self.id = f"gen_{uuid.uuid4().hex[:12]}"
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self.error_details: Optional[str] = None
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, data: Optional[Dict[str, Any]] = None):
+        """Append a stage event; also usable as an execute_colorization on_event callback"""
+        with self._lock:
+            self._events.append({"stage": stage, "at": time.time(), "data": dict(data or {})})
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    @property
+    def stage(self) -> str:
+        with self._lock:
+            return self._events[-1]["stage"] if self._events else "queued"
+
+    @property
+    def done(self) -> bool:
+        """Whether result or error is set (the agent's "done" event precedes the result)"""
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class GenerationExecutor:
+    """
+    Runs generations on a bounded thread pool with one shared agent
+    """
+
+    def __init__(self, agent: ReactorAgent, max_workers: int = 4):
+        self.agent = agent
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nanozilla-gen")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, image: Union[bytes, Future], style_prompt: str,
+               image_info: Optional[Dict[str, Any]] = None, **options) -> GenerationTask:
+        """
+        Queue a generation and return its task without waiting
+
+        Args:
+            image: Preprocessed input image, or a Future resolving to a PreparedImage
+            style_prompt: Style description for transformation
+            image_info: Preprocessing details, reported with the "preprocess" stage
+            **options: quality, safety_level, retry_attempts and chroma_transfer for
+                execute_colorization
+        """
+        task = GenerationTask()
+        if not isinstance(image, Future):
+            task.record("preprocess", image_info)
+        with self._lock:
+            ahead = max(0, self._pending - self.max_workers)
+            self._pending += 1
+        task.record("queued", {"ahead": ahead})
+
+        future: Future = self._pool.submit(self._run, task, image, style_prompt, options)
+        future.add_done_callback(lambda _: self._task_finished())
+        return task
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, task: GenerationTask, image: Union[bytes, Future], style_prompt: str,
+             options: Dict[str, Any]):
+        try:
+            image_bytes = image
+            if isinstance(image, Future):
+                prepared = image.result()
+                task.record("preprocess", {"width": prepared.image_info['width'],
+                                           "height": prepared.image_info['height']})
+                image_bytes = prepared.image_bytes
+
+            task.result = self.agent.execute_colorization(
+                image_bytes=image_bytes,
+                style_prompt=style_prompt,
+                on_event=task.record,
+                **options
+            )
+        except Exception as e:
+            task.error = str(e) or type(e).__name__
+            task.error_details = traceback.format_exc()
+            task.record("failed", {"error": task.error})
+        finally:
+            task.finished_at = time.time()
+
+    def _task_finished(self):
+        with self._lock:
+            self._pending -= 1
+
+
+def create_generation_executor(agent: ReactorAgent, max_workers: int = 4) -> GenerationExecutor:
+    """Factory function for GenerationExecutor"""
+    return GenerationExecutor(agent, max_workers=max_workers)
@@ -1,7 +1,163 @@
-from PIL import Image
+from concurrent.futures import CancelledError
+from dataclasses import dataclass
+from typing import Optional
+from PIL import Image, ImageChops
+import hashlib
 import io
+import threading
 import time
-import numpy as np
+
+
+# Longest side the colorization pipeline works at. Shared with the SDK,
+# which applies the same policy client-side before uploading.
+MAX_PROCESSING_DIMENSION = 2048
+
+# Longest side of the model input in chroma-transfer mode
+CHROMA_PROXY_DIMENSION = 640
+
+# Longest side of the preview the UI shows; full-size bytes are only downloaded
+DISPLAY_MAX_DIMENSION = 1280
+DISPLAY_JPEG_QUALITY = 90
+
+# Largest per-pixel channel difference still treated as grayscale (JPEG chroma noise)
+GRAYSCALE_TOLERANCE = 2
+
+# Quality of the lossy single-channel model input, when allowed
+LOSSY_INPUT_QUALITY = 92
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """Encoder settings trading encode time against output bytes"""
+
+    name: str
+    png_compress_level: int
+    jpeg_quality: int
+    jpeg_optimize: bool
+    jpeg_progressive: bool
+    webp_quality: int
+    webp_method: int  # 0 (fastest) to 6 (slowest, best compression at a given quality)
+    png_fallback_level: Optional[int] = None  # also tried; the smaller PNG is kept
+
+    def save_options(self, image_format: str) -> dict:
+        """Keyword arguments for Image.save in the given format"""
+        if image_format == 'PNG':
+            return {'compress_level': self.png_compress_level}
+        if image_format == 'JPEG':
+            return {'quality': self.jpeg_quality, 'optimize': self.jpeg_optimize,
+                    'progressive': self.jpeg_progressive}
+        if image_format == 'WEBP':
+            return {'quality': self.webp_quality, 'method': self.webp_method}
+        return {}
+
+    def encode(self, image: Image.Image, image_format: str) -> bytes:
+        """Encode an image in image_format with this profile"""
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **self.save_options(image_format))
+        if image_format == 'PNG' and self.png_fallback_level is not None:
+            fallback = io.BytesIO()
+            image.save(fallback, format='PNG', compress_level=self.png_fallback_level)
+            if fallback.tell() < buffer.tell():
+                return fallback.getvalue()
+        return buffer.getvalue()
+
+
+# "fast" suits internal hops, "balanced" (PNG at zlib's default level) delivery.
+# On grainy photos higher zlib levels only cost time (level 9 can come out
+# larger than level 1), so "smallest" keeps the smaller of the two, and
+# encodes WebP at a lower quality than "fast" rather than only more slowly.
+ENCODING_PROFILES = {
+    profile.name: profile for profile in (
+        EncodingProfile('fast', png_compress_level=1, jpeg_quality=85, jpeg_optimize=False,
+                        jpeg_progressive=False, webp_quality=80, webp_method=0),
+        EncodingProfile('balanced', png_compress_level=6, jpeg_quality=90, jpeg_optimize=True,
+                        jpeg_progressive=True, webp_quality=85, webp_method=4),
+        EncodingProfile('smallest', png_compress_level=9, jpeg_quality=85, jpeg_optimize=True,
+                        jpeg_progressive=True, webp_quality=75, webp_method=6,
+                        png_fallback_level=1),
+    )
+}
+
+
+def get_encoding_profile(name: str) -> EncodingProfile:
+    """
+    Look up an encoding profile by name
+
+    Raises:
+        ValueError: Unknown profile name
+    """
+    try:
+        return ENCODING_PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown encoding profile: {name}. Use one of {', '.join(ENCODING_PROFILES)}"
+        )
+
+
+def needs_resize(image: Image.Image, max_dim: int = MAX_PROCESSING_DIMENSION) -> bool:
+    """Whether either side of the image exceeds max_dim"""
+    return image.width > max_dim or image.height > max_dim
+
+
+def resize_to_fit(image: Image.Image, max_dim: int) -> Image.Image:
+    """
+    Resize image to fit within max_dim while maintaining aspect ratio
+    """
+    width, height = image.size
+    if width > max_dim or height > max_dim:
+        scaling_factor = max_dim / max(width, height)
+        new_width = int(width * scaling_factor)
+        new_height = int(height * scaling_factor)
+        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return image
+
+
+def normalize_image(image: Image.Image, auto_resize: bool = True) -> Image.Image:
+    """
+    Apply the pipeline's resize and color-mode policy
+
+    Downscales to MAX_PROCESSING_DIMENSION (when auto_resize) and converts
+    to RGB, in that order.
+    """
+    if auto_resize and needs_resize(image):
+        image = resize_to_fit(image, MAX_PROCESSING_DIMENSION)
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def merge_chroma(original: Image.Image, generated: Image.Image) -> Image.Image:
+    """
+    Full-resolution luminance of the original with the chroma of a generated image
+
+    The generated Cb/Cr planes are upsampled bilinearly to the original size
+    and merged with the original's Y plane; every step runs over whole
+    planes in Pillow's C code.
+    """
+    luma = original.convert('YCbCr').getchannel('Y')
+    _, cb, cr = generated.convert('YCbCr').split()
+    if cb.size != original.size:
+        cb = cb.resize(original.size, Image.Resampling.BILINEAR)
+        cr = cr.resize(original.size, Image.Resampling.BILINEAR)
+    return Image.merge('YCbCr', (luma, cb, cr)).convert('RGB')
+
+
+def content_digest(uploaded_file) -> str:
+    """
+    SHA-256 of an in-memory upload, read through a buffer view (no copy)
+    """
+    with uploaded_file.getbuffer() as view:
+        return hashlib.sha256(view).hexdigest()
+
+
+@dataclass
+class PreparedImage:
+    """An image with every derivative the UI needs, computed once"""
+
+    image_bytes: bytes  # model input for the backend (uploads) or the generated bytes as returned
+    image_info: dict
+    display_bytes: bytes  # downscaled JPEG preview
 
 
 class ImageProcessor:
@@ -9,32 +165,124 @@ class ImageProcessor:
 
     SUPPORTED_FORMATS = ['JPEG', 'JPG', 'PNG', 'WEBP', 'BMP']
 
-    def __init__(self):
+    def __init__(self, lossy_input: bool = False, input_profile: str = 'fast',
+                 output_profile: str = 'balanced'):
+        # Shared across Streamlit sessions and API worker threads
+        self._lock = threading.Lock()
+        self.lossy_input = lossy_input
+        self.input_profile = get_encoding_profile(input_profile)  # backend inputs
+        self.output_profile = get_encoding_profile(output_profile)  # results handed to users
         self.processed_count = 0
         self.last_image_info = None
 
-    def process_uploaded_image(self, uploaded_file, validate_colors=False, auto_resize=False):
+    def process_uploaded_image(self, uploaded_file, validate_colors=False, auto_resize=False,
+                               profile: Optional[str] = None):
         """
         Process uploaded image file
 
         Args:
             uploaded_file: Streamlit UploadedFile object
-            validate_colors: Whether to perform color analysis
+            validate_colors: Whether to perform color analysis; grayscale
+                inputs are then sent as a single channel
             auto_resize: Whether to automatically resize large images
+            profile: Encoding profile for the model input (default: input_profile)
 
         Returns:
             Tuple (image_bytes, image_info_dict)
         """
+        encoding = get_encoding_profile(profile) if profile else self.input_profile
+        image, image_info = self._load_upload(uploaded_file, validate_colors, auto_resize)
+        return self._encode_model_input(image, image_info, encoding), image_info
+
+    def prepare_upload(
+        self,
+        uploaded_file,
+        validate_colors=False,
+        auto_resize=False,
+        cancelled: Optional[threading.Event] = None
+    ) -> PreparedImage:
+        """
+        Process an upload and derive its preview from the same decoded image
+
+        Same processing as process_uploaded_image; callers cache the result
+        by content digest so reruns neither decode nor encode again.
+
+        Raises:
+            CancelledError: `cancelled` was set; checked between steps
+        """
+        def checkpoint():
+            if cancelled is not None and cancelled.is_set():
+                raise CancelledError()
+
+        checkpoint()
+        image, image_info = self._load_upload(uploaded_file, validate_colors, auto_resize)
+        checkpoint()
+        image_bytes = self._encode_model_input(image, image_info)
+        checkpoint()
+        return PreparedImage(image_bytes, image_info, self.make_display_bytes(image))
+
+    def prepare_generated(self, image_bytes: bytes) -> PreparedImage:
+        """
+        Describe a generated image and derive its preview; the bytes are kept as-is for download
+        """
+        image = Image.open(io.BytesIO(image_bytes))
+        image_info = {
+            'width': image.width,
+            'height': image.height,
+            'format': image.format or 'PNG',
+            'file_size': len(image_bytes)
+        }
+        return PreparedImage(image_bytes, image_info, self.make_display_bytes(image))
+
+    def make_display_bytes(self, image: Image.Image, max_dim: int = DISPLAY_MAX_DIMENSION) -> bytes:
+        """
+        Downscaled JPEG preview of an image
+        """
+        preview = image
+        if needs_resize(image, max_dim):
+            scale = max_dim / max(image.size)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            preview = image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        if preview.mode not in ('RGB', 'L'):
+            preview = preview.convert('RGB')
+        buffer = io.BytesIO()
+        preview.save(buffer, format='JPEG', quality=DISPLAY_JPEG_QUALITY)
+        return buffer.getvalue()
+
+    def make_chroma_proxy(self, image_bytes: bytes, max_dim: int = CHROMA_PROXY_DIMENSION) -> bytes:
+        """
+        Small PNG model input for chroma-transfer mode, encoded with input_profile
+
+        Colorization mostly changes chroma, so the model only needs a proxy;
+        recompose_chroma() restores full resolution from the original.
+        """
+        image = Image.open(io.BytesIO(image_bytes))
+        image = resize_to_fit(image.convert('RGB'), max_dim)
+        return self._encode(image, 'PNG', self.input_profile)
+
+    def recompose_chroma(self, original_bytes: bytes, generated_bytes: bytes) -> bytes:
+        """
+        Full-resolution PNG: original luminance merged with the generated proxy's chroma
+
+        Encoded with output_profile, since the result is what users receive.
+        """
+        original = Image.open(io.BytesIO(original_bytes))
+        generated = Image.open(io.BytesIO(generated_bytes))
+        return self._encode(merge_chroma(original, generated), 'PNG', self.output_profile)
+
+    def _load_upload(self, uploaded_file, validate_colors: bool, auto_resize: bool):
+        """
+        Decode and normalize an upload
+
+        Returns:
+            Tuple (RGB image, image_info_dict)
+        """
+        started = time.perf_counter()
         image = Image.open(uploaded_file)
         original_format = image.format
 
-        # Auto-resize if needed
-        if auto_resize and (image.width > 2048 or image.height > 2048):
-            image = self._resize_image(image, 2048)
-
-        # Convert to RGB if not already
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        # Auto-resize if needed and convert to RGB
+        image = normalize_image(image, auto_resize=auto_resize)
 
         # Get image info
         image_info = {
@@ -42,22 +290,61 @@ class ImageProcessor:
             'height': image.height,
             'format': original_format,
             'mode': image.mode,
-            'file_size_mb': len(uploaded_file.getvalue()) / (1024 * 1024)
+            'file_size_mb': self._upload_size(uploaded_file) / (1024 * 1024)
         }
 
         # Color analysis
         if validate_colors:
             image_info['color_analysis'] = self._analyze_colors(image)
+        image_info['load_seconds'] = round(time.perf_counter() - started, 4)
+
+        with self._lock:
+            self.processed_count += 1
+            self.last_image_info = image_info
+
+        return image, image_info
 
-        # Save to bytes
-        img_byte_arr = io.BytesIO()
-        image.save(img_byte_arr, format='PNG')
-        img_byte_arr = img_byte_arr.getvalue()
+    def _encode_model_input(self, image: Image.Image, image_info: dict,
+                            profile: Optional[EncodingProfile] = None) -> bytes:
+        """
+        Encode the backend input, as a single channel when color analysis found grayscale
+
+        A grayscale RGB image carries three identical channels; the L image
+        holds the same pixels in a third of the raw bytes. With lossy_input
+        it is sent as JPEG instead of PNG. Format, mode, profile, byte count
+        and encode time are recorded under image_info['model_input'].
+        """
+        profile = profile or self.input_profile
+        started = time.perf_counter()
+        grayscale = image_info.get('color_analysis', {}).get('is_grayscale', False)
+        if grayscale:
+            image = image.convert('L')
 
-        self.processed_count += 1
-        self.last_image_info = image_info
+        if grayscale and self.lossy_input:
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=LOSSY_INPUT_QUALITY)
+            image_format, data = 'JPEG', buffer.getvalue()
+        else:
+            image_format, data = 'PNG', self._encode(image, 'PNG', profile)
 
-        return img_byte_arr, image_info
+        image_info['model_input'] = {
+            'format': image_format,
+            'mode': image.mode,
+            'profile': profile.name,
+            'bytes': len(data),
+            'encode_seconds': round(time.perf_counter() - started, 4)
+        }
+        return data
+
+    def _encode(self, image: Image.Image, image_format: str, profile: EncodingProfile) -> bytes:
+        return profile.encode(image, image_format)
+
+    def _upload_size(self, uploaded_file) -> int:
+        """
+        Upload size in bytes without copying spooled uploads into memory
+        """
+        size = getattr(uploaded_file, 'size', None)
+        return size if size is not None else len(uploaded_file.getvalue())
 
     def prepare_for_display(self, image_bytes: bytes):
         """
@@ -65,9 +352,14 @@ class ImageProcessor:
         """
         return Image.open(io.BytesIO(image_bytes))
 
-    def convert_format(self, image_bytes: bytes, target_format: str):
+    def convert_format(self, image_bytes: bytes, target_format: str, profile: Optional[str] = None):
         """
         Convert image to target format
+
+        Args:
+            image_bytes: Encoded source image
+            target_format: One of SUPPORTED_FORMATS
+            profile: Encoding profile name (default: output_profile)
         """
         img = Image.open(io.BytesIO(image_bytes))
         target_format = target_format.upper()
@@ -75,31 +367,33 @@ class ImageProcessor:
         if target_format not in self.SUPPORTED_FORMATS:
             raise ValueError(f"Unsupported format: {target_format}")
 
-        output_buffer = io.BytesIO()
-        img.save(output_buffer, format=target_format)
-        return output_buffer.getvalue(), {'format': target_format, 'size': len(output_buffer.getvalue())}
+        encoding = get_encoding_profile(profile) if profile else self.output_profile
+        data = self._encode(img, 'JPEG' if target_format == 'JPG' else target_format, encoding)
+        return data, {'format': target_format, 'size': len(data), 'profile': encoding.name}
 
     def _resize_image(self, image: Image.Image, max_dim: int) -> Image.Image:
         """
         Resize image to fit within max_dim while maintaining aspect ratio
         """
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scaling_factor = max_dim / max(width, height)
-            new_width = int(width * scaling_factor)
-            new_height = int(height * scaling_factor)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        return image
+        return resize_to_fit(image, max_dim)
 
     def _analyze_colors(self, image: Image.Image):
         """
         Perform basic color analysis
+
+        An RGB image is grayscale when its channels are equal to within
+        GRAYSCALE_TOLERANCE at every pixel.
         """
-        is_grayscale = image.mode == 'L' or (
-            image.mode == 'RGB' and not np.array(image.getchannel(0)).any()
-            and not np.array(image.getchannel(1)).any()
-            and not np.array(image.getchannel(2)).any()
-        )
+        if image.mode in ('1', 'L', 'LA', 'I', 'I;16'):
+            is_grayscale = True
+        elif image.mode == 'RGB':
+            red, green, blue = image.split()
+            is_grayscale = all(
+                ImageChops.difference(a, b).getextrema()[1] <= GRAYSCALE_TOLERANCE
+                for a, b in ((red, green), (green, blue))
+            )
+        else:
+            is_grayscale = False
 
         color_mode = "Grayscale" if is_grayscale else "Color"
 
@@ -111,4 +405,10 @@ class ImageProcessor:
 
 def create_image_processor():
     """Factory function for ImageProcessor"""
-    return ImageProcessor()
+    from config.settings import settings
+
+    return ImageProcessor(
+        lossy_input=settings.LOSSY_MODEL_INPUT,
+        input_profile=settings.MODEL_INPUT_ENCODING,
+        output_profile=settings.OUTPUT_ENCODING
+    )
@@ -0,0 +1,73 @@
+"""
+Per-job change notification for long-polling and Server-Sent Events
+
+Every batch job gets a JobEventLog. The batch worker publishes one event
+per finished item and a final status event; waiters block on the log
+instead of re-reading the whole job in a loop. Events are small (no image
+data) and numbered, so an SSE client can resume with Last-Event-ID.
+
+All methods are called from the event loop thread.
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobEventLog:
+    """
+    Append-only, numbered event log of one job with wake-ups for waiters
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    @property
+    def version(self) -> int:
+        """Id of the last published event (0 before any)"""
+        return len(self.events)
+
+    def publish(self, event_type: str, data: Dict[str, Any], final: bool = False) -> Dict[str, Any]:
+        """Append an event and wake every waiter"""
+        event = {"id": self.version + 1, "event": event_type, "data": data}
+        self.events.append(event)
+        self.closed = self.closed or final
+
+        # Broadcast: release current waiters, later ones wait on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return event
+
+    def since(self, last_id: int) -> List[Dict[str, Any]]:
+        return self.events[max(0, last_id):]
+
+    async def wait(self, last_id: int, timeout: float) -> bool:
+        """
+        Wait until an event newer than last_id exists or the log is closed
+
+        Returns:
+            True if there is something new, False on timeout
+        """
+        changed = self._changed
+        if self.version > last_id or self.closed:
+            return True
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+def format_sse(event: Optional[Dict[str, Any]] = None, comment: Optional[str] = None) -> bytes:
+    """Encode an event (or a keep-alive comment) in text/event-stream framing"""
+    if event is None:
+        return f": {comment or 'keep-alive'}\n\n".encode("utf-8")
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event['data'], default=str)}\n\n"
+    ).encode("utf-8")
@@ -0,0 +1,426 @@
+"""
+On-demand profiling hooks for the NANozILLA Reactor API
+
+Installed only when PROFILING_ENABLED is set, so a disabled server carries no
+middleware, routes or sampler thread. Every endpoint requires the admin token.
+
+- Per-request cProfile: send `X-Nanozilla-Profile: store|return` (or
+  `?profile=store|return`) with `X-Admin-Token`.
+- tracemalloc: start, snapshot, diff and stop under /api/v1/admin/tracemalloc.
+- Statistical sampler: aggregates stacks of all threads over a time window and
+  serves them in collapsed-stack format for flamegraph tools.
+"""
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse, Response
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+from config.settings import settings
+
+PROFILE_HEADER = "X-Nanozilla-Profile"
+PROFILE_MODES = ("store", "return")
+
+
+def _envelope(data) -> Dict:
+    """Wrap admin responses like the rest of the API"""
+    return {
+        "success": True,
+        "data": data,
+        "metadata": {
+            "version": "2.0.0",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    }
+
+
+# ============================================================================
+# PER-REQUEST PROFILER
+# ============================================================================
+
+
+class RequestProfiler:
+    """Runs single requests under cProfile and keeps the resulting pstats files"""
+
+    def __init__(self, output_dir: str, max_stored: int = 50):
+        self.output_dir = output_dir
+        self.max_stored = max_stored
+        self._busy = threading.Lock()
+        self._stored: "OrderedDict[str, str]" = OrderedDict()
+
+    def requested_mode(self, request: Request) -> Optional[str]:
+        mode = request.headers.get(PROFILE_HEADER) or request.query_params.get("profile")
+        if not mode:
+            return None
+        mode = mode.lower()
+        return mode if mode in PROFILE_MODES else "store"
+
+    async def profile(self, request: Request, call_next, mode: str) -> Response:
+        # Only one cProfile may be active per interpreter
+        if not self._busy.acquire(blocking=False):
+            response = await call_next(request)
+            response.headers["X-Profile-Skipped"] = "busy"
+            return response
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+        finally:
+            self._busy.release()
+
+        profile_id = f"prof_{uuid.uuid4().hex[:12]}"
+        if mode == "return":
+            return Response(
+                content=self._dump(profiler),
+                media_type="application/octet-stream",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{profile_id}.pstats"',
+                    "X-Profile-Id": profile_id,
+                    "X-Profiled-Status": str(response.status_code),
+                }
+            )
+
+        self._store(profile_id, profiler)
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    def _dump(self, profiler: cProfile.Profile) -> bytes:
+        path = os.path.join(self.output_dir, f".tmp_{uuid.uuid4().hex}.pstats")
+        os.makedirs(self.output_dir, exist_ok=True)
+        try:
+            profiler.dump_stats(path)
+            with open(path, "rb") as stats_file:
+                return stats_file.read()
+        finally:
+            os.remove(path)
+
+    def _store(self, profile_id: str, profiler: cProfile.Profile):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{profile_id}.pstats")
+        profiler.dump_stats(path)
+        self._stored[profile_id] = path
+
+        while len(self._stored) > self.max_stored:
+            _, old_path = self._stored.popitem(last=False)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    def path(self, profile_id: str) -> Optional[str]:
+        return self._stored.get(profile_id)
+
+    def summary(self, profile_id: str, limit: int = 25) -> str:
+        """Top functions by cumulative time as text"""
+        output = io.StringIO()
+        stats = pstats.Stats(self._stored[profile_id], stream=output)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+    def profile_ids(self) -> List[str]:
+        return list(self._stored)
+
+
+# ============================================================================
+# TRACEMALLOC
+# ============================================================================
+
+
+class TracemallocManager:
+    """Takes and diffs tracemalloc snapshots, keeping the most recent ones"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traced_memory_bytes": current,
+            "peak_traced_memory_bytes": peak,
+            "snapshots": list(self._snapshots),
+        }
+
+    def snapshot(self, limit: int = 10) -> Dict:
+        if not tracemalloc.is_tracing():
+            raise HTTPException(409, "tracemalloc is not tracing; start it first")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        snapshot_id = f"snap_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+        top = snapshot.statistics("lineno")[:limit]
+        return {
+            "snapshot_id": snapshot_id,
+            "total_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+            "top": [self._stat(stat) for stat in top],
+        }
+
+    def diff(self, base_id: str, target_id: str, group_by: str = "lineno", limit: int = 25) -> Dict:
+        with self._lock:
+            base = self._snapshots.get(base_id)
+            target = self._snapshots.get(target_id)
+        if base is None or target is None:
+            raise HTTPException(404, "Snapshot not found")
+
+        diffs = target.compare_to(base, group_by)
+        return {
+            "base": base_id,
+            "target": target_id,
+            "size_diff_bytes": sum(stat.size_diff for stat in diffs),
+            "top": [
+                {
+                    "location": self._location(stat.traceback),
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in diffs[:limit]
+            ],
+        }
+
+    def _stat(self, stat) -> Dict:
+        return {
+            "location": self._location(stat.traceback),
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+
+    def _location(self, traceback) -> str:
+        frame = traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+
+# ============================================================================
+# STATISTICAL SAMPLER
+# ============================================================================
+
+
+class StackSampler:
+    """
+    Low-overhead sampler aggregating hot stacks across all threads
+
+    A daemon thread wakes every `interval` seconds, walks sys._current_frames()
+    and counts collapsed stacks (root first). It stops on its own after the
+    requested window so a forgotten session cannot keep costing CPU.
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.interval = 0.01
+        self.started_at = None
+        self.stopped_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, duration: float = 60.0):
+        if self.running:
+            raise HTTPException(409, "Sampler is already running")
+
+        with self._lock:
+            self.counts = Counter()
+            self.samples = 0
+        self.interval = interval
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval, duration), name="nanozilla-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self, interval: float, duration: float):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            stacks = [
+                self._collapse(frame) for thread_id, frame in frames.items() if thread_id != own_id
+            ]
+            with self._lock:
+                self.counts.update(stacks)
+                self.samples += 1
+        self.stopped_at = time.time()
+
+    def _collapse(self, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format: 'root;caller;leaf count' per line"""
+        with self._lock:
+            items = self.counts.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def status(self) -> Dict:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "unique_stacks": len(self.counts),
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+        }
+
+
+# ============================================================================
+# INSTALLATION
+# ============================================================================
+
+
+def install_profiling(
+    app: FastAPI,
+    admin_token: Optional[str] = None,
+    output_dir: Optional[str] = None
+) -> APIRouter:
+    """
+    Install the profiling middleware and admin routes on an app
+
+    Args:
+        app: FastAPI application
+        admin_token: Token required in X-Admin-Token (defaults to settings)
+        output_dir: Directory for stored pstats files (defaults to settings)
+
+    Returns:
+        The admin router that was included
+    """
+    admin_token = admin_token or settings.PROFILING_ADMIN_TOKEN
+    if not admin_token:
+        raise ValueError("PROFILING_ADMIN_TOKEN must be set to enable profiling")
+
+    profiler = RequestProfiler(output_dir or settings.PROFILING_OUTPUT_DIR)
+    memory = TracemallocManager()
+    sampler = StackSampler()
+
+    def is_admin(token: Optional[str]) -> bool:
+        return bool(token) and hmac.compare_digest(token, admin_token)
+
+    async def require_admin(x_admin_token: Optional[str] = Header(None)):
+        if not is_admin(x_admin_token):
+            raise HTTPException(403, "Admin token required")
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        mode = profiler.requested_mode(request)
+        if mode is None or not is_admin(request.headers.get("X-Admin-Token")):
+            return await call_next(request)
+        return await profiler.profile(request, call_next, mode)
+
+    router = APIRouter(prefix="/api/v1/admin", dependencies=[Depends(require_admin)])
+
+    @router.get("/profiles")
+    async def list_profiles():
+        return _envelope({"profiles": profiler.profile_ids()})
+
+    @router.get("/profiles/{profile_id}")
+    async def download_profile(
+        profile_id: str, format: str = Query("pstats", pattern="^(pstats|text)$")
+    ):
+        path = profiler.path(profile_id)
+        if not path:
+            raise HTTPException(404, "Profile not found")
+        if format == "text":
+            return PlainTextResponse(profiler.summary(profile_id))
+        return FileResponse(
+            path, media_type="application/octet-stream", filename=f"{profile_id}.pstats"
+        )
+
+    @router.post("/tracemalloc/start")
+    async def start_tracemalloc(frames: int = Query(1, ge=1, le=64)):
+        memory.start(frames)
+        return _envelope(memory.status())
+
+    @router.post("/tracemalloc/stop")
+    async def stop_tracemalloc():
+        memory.stop()
+        return _envelope(memory.status())
+
+    @router.get("/tracemalloc")
+    async def tracemalloc_status():
+        return _envelope(memory.status())
+
+    @router.post("/tracemalloc/snapshots")
+    async def take_snapshot(limit: int = Query(10, ge=1, le=200)):
+        return _envelope(memory.snapshot(limit))
+
+    @router.get("/tracemalloc/diff")
+    async def diff_snapshots(
+        base: str,
+        target: str,
+        group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+        limit: int = Query(25, ge=1, le=500)
+    ):
+        return _envelope(memory.diff(base, target, group_by, limit))
+
+    @router.post("/sampler/start")
+    async def start_sampler(
+        interval: float = Query(0.01, ge=0.001, le=1.0),
+        duration: float = Query(60.0, gt=0, le=3600)
+    ):
+        sampler.start(interval, duration)
+        return _envelope(sampler.status())
+
+    @router.post("/sampler/stop")
+    async def stop_sampler():
+        sampler.stop()
+        return _envelope(sampler.status())
+
+    @router.get("/sampler")
+    async def sampler_status():
+        return _envelope(sampler.status())
+
+    @router.get("/sampler/collapsed")
+    async def sampler_collapsed():
+        return PlainTextResponse(sampler.collapsed())
+
+    app.include_router(router)
+    app.state.profiler = profiler
+    app.state.tracemalloc = memory
+    app.state.sampler = sampler
+    return router
@@ -1,11 +1,17 @@
-from google import genai
 from google.genai.errors import APIError
 from config.settings import settings
+from core.generation_backend import BackendError, GenerationBackend, create_generation_backend
+from core.image_processor import create_image_processor
 import streamlit as st
+import random
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 import traceback
 
+MAX_RETRY_WAIT = 60.0  # seconds; caps a backend's Retry-After
+RETRY_JITTER = 0.1  # up to 10% added to Retry-After waits
+
 # ============================================================================
 # ASCII ART BANNERS
 # ============================================================================
@@ -37,17 +43,24 @@ ERROR_BANNER = """
 class ReactorAgent:
     """Enhanced Reactor Agent with 8-bit styling and comprehensive error handling"""
 
-    def __init__(self):
+    def __init__(self, backend: Optional[GenerationBackend] = None):
         try:
-            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            self.model = settings.MODEL_NAME
+            self.backend = backend or create_generation_backend()
+            self.model = self.backend.model
             self.generation_count = 0
             self.last_generation_time = None
             self.total_processing_time = 0
 
             # Rate limiting
             self.last_api_call_time = 0
-            self.min_call_interval = 1.0
+            self.min_call_interval = settings.MIN_CALL_INTERVAL
+            self._rate_lock = threading.Lock()
+            self._stats_lock = threading.Lock()
+
+            # Chroma transfer
+            self.chroma_transfer = settings.CHROMA_TRANSFER
+            self.chroma_proxy_dimension = settings.CHROMA_PROXY_DIMENSION
+            self.image_processor = create_image_processor()
 
             self._validate_initialization()
             self._log_initialization()
@@ -58,9 +71,9 @@ class ReactorAgent:
 
     def _validate_initialization(self):
         """Validate initialization parameters"""
-        if not settings.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not configured")
-        if not settings.MODEL_NAME:
+        if not self.backend:
+            raise ValueError("Generation backend not configured")
+        if not self.model:
             raise ValueError("MODEL_NAME not configured")
 
     def _log_initialization(self):
@@ -72,7 +85,7 @@ class ReactorAgent:
         ╠════════════════════════════════════════════════════════════════╣
         ║  Model: {self.model[:40]:<40} ║
         ║  Status: READY FOR GENERATION                                ║
-        ║  API: GOOGLE GEMINI                                          ║
+        ║  Backend: {self.backend.name.upper()[:38]:<38} ║
         ╚════════════════════════════════════════════════════════════════╝
         </div>
         """
@@ -94,16 +107,22 @@ class ReactorAgent:
         """
         st.error(error_msg)
 
-    def _enforce_rate_limit(self):
-        """Enforce minimum time between API calls"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call_time
+    def _enforce_rate_limit(self, on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """Enforce minimum time between API calls (safe across worker threads)"""
+        with self._rate_lock:
+            # Reserve the next call slot, then sleep outside the lock
+            current_time = time.time()
+            call_time = max(current_time, self.last_api_call_time + self.min_call_interval)
+            self.last_api_call_time = call_time
 
-        if time_since_last_call < self.min_call_interval:
-            sleep_time = self.min_call_interval - time_since_last_call
-            time.sleep(sleep_time)
+        if call_time > current_time:
+            self._emit(on_event, "rate_limit_wait", seconds=call_time - current_time)
+            time.sleep(call_time - current_time)
 
-        self.last_api_call_time = time.time()
+    def _emit(self, on_event: Optional[Callable[[str, Dict[str, Any]], None]], stage: str, **data):
+        """Report a generation stage to the caller's progress callback"""
+        if on_event:
+            on_event(stage, data)
 
     def execute_colorization(
         self,
@@ -111,7 +130,9 @@ class ReactorAgent:
         style_prompt: str,
         quality: str = "high",
         safety_level: str = "block_some",
-        retry_attempts: int = 3
+        retry_attempts: int = 3,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        chroma_transfer: Optional[bool] = None
     ) -> bytes:
         """
         Execute image colorization with enhanced error handling and ASCII UI
@@ -122,6 +143,10 @@ class ReactorAgent:
             quality: Image quality ('low', 'medium', 'high')
             safety_level: Safety filter level
             retry_attempts: Number of retry attempts
+            on_event: Optional callback(stage, data) invoked on "rate_limit_wait",
+                "api_call", "retry" and "done"
+            chroma_transfer: Send a proxy of at most chroma_proxy_dimension pixels and
+                merge the result's chroma with the input's luminance (default: CHROMA_TRANSFER)
 
         Returns:
             bytes: Generated image as bytes
@@ -130,6 +155,15 @@ class ReactorAgent:
         # Validate inputs
         self._validate_inputs(image_bytes, style_prompt)
 
+        if self.chroma_transfer if chroma_transfer is None else chroma_transfer:
+            proxy_bytes = self.image_processor.make_chroma_proxy(image_bytes,
+                                                                 self.chroma_proxy_dimension)
+            generated = self.execute_colorization(
+                proxy_bytes, style_prompt, quality, safety_level, retry_attempts, on_event,
+                chroma_transfer=False
+            )
+            return self.image_processor.recompose_chroma(image_bytes, generated)
+
         # Show processing banner
         st.markdown(f"<pre>{PROCESSING_BANNER}</pre>", unsafe_allow_html=True)
 
@@ -145,34 +179,34 @@ class ReactorAgent:
                     self._log_retry_attempt(attempt, retry_attempts)
 
                 # Enforce rate limiting
-                self._enforce_rate_limit()
+                self._enforce_rate_limit(on_event)
 
                 # Start timing
                 start_time = time.time()
+                self._emit(on_event, "api_call", attempt=attempt, max_attempts=retry_attempts)
 
-                # Prepare and execute API call
-                result = self._call_gemini_api(
+                # Prepare and execute backend call
+                image_data = self._call_backend(
                     image_bytes=image_bytes,
                     style_prompt=style_prompt,
                     quality=quality,
                     safety_level=safety_level
                 )
 
-                # Process result
-                image_data = self._process_api_result(result)
-
                 # Calculate timing
                 generation_time = time.time() - start_time
-                self.last_generation_time = generation_time
-                self.total_processing_time += generation_time
-                self.generation_count += 1
+                with self._stats_lock:
+                    self.last_generation_time = generation_time
+                    self.total_processing_time += generation_time
+                    self.generation_count += 1
 
                 # Log success
                 self._log_success(generation_time)
+                self._emit(on_event, "done", seconds=generation_time, attempts=attempt)
 
                 return image_data
 
-            except APIError as e:
+            except (APIError, BackendError) as e:
                 last_error = e
                 self._handle_api_error(e, attempt, retry_attempts)
 
@@ -180,14 +214,18 @@ class ReactorAgent:
                     break
 
                 if attempt < retry_attempts:
-                    self._wait_before_retry(attempt)
+                    wait_time = self._retry_delay(attempt, e)
+                    self._emit(on_event, "retry", attempt=attempt, wait=wait_time, error=str(e))
+                    self._wait_before_retry(wait_time)
 
             except Exception as e:
                 last_error = e
                 self._handle_unexpected_error(e, attempt, retry_attempts)
 
                 if attempt < retry_attempts:
-                    self._wait_before_retry(attempt)
+                    wait_time = self._retry_delay(attempt, e)
+                    self._emit(on_event, "retry", attempt=attempt, wait=wait_time, error=str(e))
+                    self._wait_before_retry(wait_time)
 
         # All retries exhausted
         self._handle_final_failure(last_error, retry_attempts)
@@ -206,45 +244,20 @@ class ReactorAgent:
                 f"Style prompt too long (max {settings.MAX_PROMPT_LENGTH} chars)"
             )
 
-    def _call_gemini_api(self, image_bytes: bytes, style_prompt: str, quality: str, safety_level: str):
+    def _call_backend(
+        self, image_bytes: bytes, style_prompt: str, quality: str, safety_level: str
+    ) -> bytes:
         """
-        Make API call to Gemini
+        Make generation call through the configured backend
         """
-        config = {
-            "number_of_images": 1,
-            "quality": quality,
-            "safety_filter_level": safety_level
-        }
-
-        return self.client.models.generate_images(
-            model=self.model,
-            prompt=style_prompt,
-            image=image_bytes,
-            config=config
+        return self.backend.generate(
+            image_bytes=image_bytes,
+            style_prompt=style_prompt,
+            quality=quality,
+            safety_level=safety_level
         )
 
-    def _process_api_result(self, result) -> bytes:
-        """
-        Process and validate API result
-        """
-        if not result or not hasattr(result, 'generated_images'):
-            raise ValueError("Invalid API response: missing generated_images")
-
-        if not result.generated_images:
-            raise ValueError("No images generated by API")
-
-        try:
-            image_data = result.generated_images[0].image.image_bytes
-
-            if not image_data or len(image_data) < 100:
-                raise ValueError("Generated image data is invalid or corrupted")
-
-            return image_data
-
-        except AttributeError as e:
-            raise ValueError(f"Unable to extract image data: {str(e)}")
-
-    def _is_fatal_error(self, error: APIError) -> bool:
+    def _is_fatal_error(self, error: Exception) -> bool:
         """
         Determine if error is fatal (no retry)
         """
@@ -259,12 +272,25 @@ class ReactorAgent:
         ]
         return any(fatal in error_msg for fatal in fatal_errors)
 
-    def _wait_before_retry(self, attempt: int):
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Seconds to wait before the next attempt
+
+        Honors the backend's Retry-After when it sent one (capped at
+        MAX_RETRY_WAIT, with jitter so throttled callers don't return in
+        lockstep); exponential backoff otherwise.
+        """
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None:
+            return float(2 ** attempt)
+        wait_time = min(max(retry_after, 0.0), MAX_RETRY_WAIT)
+        return round(wait_time * (1 + random.uniform(0, RETRY_JITTER)), 2)
+
+    def _wait_before_retry(self, wait_time: float):
         """
-        Wait before retry with exponential backoff
+        Wait before retry
         """
-        wait_time = 2 ** attempt
-        st.warning(f"⏳ Waiting {wait_time}s before retry...")
+        st.warning(f"⏳ Waiting {wait_time:g}s before retry...")
         time.sleep(wait_time)
 
     def _log_retry_attempt(self, attempt: int, max_attempts: int):
@@ -280,13 +306,13 @@ class ReactorAgent:
         """
         st.markdown(retry_msg, unsafe_allow_html=True)
 
-    def _handle_api_error(self, error: APIError, attempt: int, max_attempts: int):
+    def _handle_api_error(self, error: Exception, attempt: int, max_attempts: int):
         """
         Handle API errors with detailed ASCII messages
         """
         error_msg = f"""
 ╔════════════════════════════════════════════════════════════════╗
-║  ⚠️ GEMINI API ERROR (Attempt {attempt}/{max_attempts})                       ║
+║  ⚠️ BACKEND API ERROR (Attempt {attempt}/{max_attempts})                       ║
 ╠════════════════════════════════════════════════════════════════╣
 ║  Type: {type(error).__name__:<50} ║
 ║  Message: {str(error)[:50]:<50} ║
@@ -353,20 +379,31 @@ class ReactorAgent:
         """
         Get comprehensive agent statistics
         """
-        return {
-            "generation_count": self.generation_count,
-            "last_generation_time": self.last_generation_time,
-            "total_processing_time": self.total_processing_time,
-            "average_generation_time": self.total_processing_time / max(self.generation_count, 1),
-            "model": self.model,
-            "status": "operational"
-        }
+        with self._stats_lock:
+            return {
+                "generation_count": self.generation_count,
+                "last_generation_time": self.last_generation_time,
+                "total_processing_time": self.total_processing_time,
+                "average_generation_time":
+                    self.total_processing_time / max(self.generation_count, 1),
+                "model": self.model,
+                "backend": self.backend.name,
+                "status": "operational"
+            }
+
+    def close(self):
+        """
+        Release the backend's client (connections, sessions)
+        """
+        close = getattr(self.backend, "close", None)
+        if close:
+            close()
 
 
-def create_reactor_agent() -> Optional[ReactorAgent]:
+def create_reactor_agent(backend: Optional[GenerationBackend] = None) -> Optional[ReactorAgent]:
     """Create ReactorAgent with fallback error handling"""
     try:
-        return ReactorAgent()
+        return ReactorAgent(backend=backend)
     except Exception as e:
         st.error(f"❌ Failed to create ReactorAgent: {str(e)}")
         return None
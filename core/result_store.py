@@ -0,0 +1,242 @@
+"""
+Content-addressed disk store for generated images
+
+Results are written once under their SHA-256 (root/ab/abcdef...) and read
+back as files, so jobs keep only small keys in memory no matter how many
+images they produce, and identical outputs are stored once.
+
+BoundedResultStore adds a byte budget for the Streamlit app, whose
+sessions can sit idle indefinitely, for the masters of single-image API
+results and for their cached variants: the least recently used blobs are
+deleted once the budget is exceeded, and holders of evicted keys get a
+FileNotFoundError when reading.
+"""
+
+from collections import OrderedDict
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+import hashlib
+import os
+import tempfile
+import threading
+
+from config.settings import settings
+
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class ResultStore:
+    """
+    Immutable blobs addressed by the hex SHA-256 of their content
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, data: bytes, key: Optional[str] = None) -> str:
+        """
+        Store bytes and return their key; storing under an existing key is a no-op
+
+        Args:
+            data: Blob content
+            key: Store under this key instead of the content hash, for blobs
+                derived deterministically from another one (see core/derivatives.py)
+        """
+        key = key or hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        if os.path.exists(path):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(data)
+            os.replace(temp_path, path)  # readers never see a partial blob
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return key
+
+    def put_stream(self, chunks: Iterable[bytes]) -> str:
+        """Store streamed content, hashing while writing, so it is never held in memory"""
+        temp_path, key, _ = self._spool(chunks)
+        self._install(temp_path, key)
+        return key
+
+    def _spool(self, chunks: Iterable[bytes]) -> Tuple[str, str, int]:
+        """Write chunks to a temporary file; returns its path, the content key and the size"""
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    handle.write(chunk)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return temp_path, digest.hexdigest(), size
+
+    def _install(self, temp_path: str, key: str):
+        """Move a spooled file into place under key"""
+        try:
+            path = self.path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def path(self, key: str) -> str:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise KeyError(key)
+        return os.path.join(self.root, key[:2], key)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            return os.path.exists(self.path(key))
+        except KeyError:
+            return False
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), 'rb')
+
+    def get(self, key: str) -> bytes:
+        with self.open(key) as handle:
+            return handle.read()
+
+    def iter_chunks(self, key: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(key) as handle:
+            for chunk in iter(lambda: handle.read(chunk_size), b''):
+                yield chunk
+
+
+class BoundedResultStore(ResultStore):
+    """
+    Result store holding at most max_bytes, evicting least recently used blobs
+
+    Writes and reads (open/get/iter_chunks) count as use. Recency survives
+    restarts through the blobs' modification times.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        super().__init__(root)
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def put(self, data: bytes, key: Optional[str] = None) -> str:
+        key = super().put(data, key)
+        with self._lock:
+            if not os.path.exists(self.path(key)):
+                # Another writer evicted the blob since super().put() found or wrote it
+                super().put(data, key)
+            self._track(key, len(data))
+        return key
+
+    def put_stream(self, chunks: Iterable[bytes]) -> str:
+        temp_path, key, size = self._spool(chunks)
+        with self._lock:
+            self._install(temp_path, key)
+            self._track(key, size)
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        handle = super().open(key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        os.utime(handle.fileno())
+        return handle
+
+    def _track(self, key: str, size: int):
+        """Record a blob on disk as most recent, then evict to the budget; caller holds the lock"""
+        self._total += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        os.utime(self.path(key))
+        # Never evict the blob just written, even if it alone exceeds the budget
+        self._evict(keep=1)
+
+    def _evict(self, keep: int = 0):
+        """Delete the oldest blobs until within budget; caller holds the lock"""
+        while self._total > self.max_bytes and len(self._entries) > keep:
+            victim, victim_size = self._entries.popitem(last=False)
+            self._total -= victim_size
+            self.evictions += 1
+            try:
+                os.unlink(self.path(victim))
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self):
+        blobs = []
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for key in os.listdir(directory):
+                if key in self:
+                    stat = os.stat(os.path.join(directory, key))
+                    blobs.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(blobs):
+            self._entries[key] = size
+            self._total += size
+        with self._lock:
+            self._evict()
+
+
+_default_store: Optional[ResultStore] = None
+_session_store: Optional[BoundedResultStore] = None
+_master_store: Optional[BoundedResultStore] = None
+_derivative_store: Optional[BoundedResultStore] = None
+
+
+def get_result_store() -> ResultStore:
+    """Process-wide store under RESULT_STORE_DIR"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore(settings.RESULT_STORE_DIR)
+    return _default_store
+
+
+def get_session_result_store() -> BoundedResultStore:
+    """Process-wide store for Streamlit session results under SESSION_RESULT_STORE_DIR"""
+    global _session_store
+    if _session_store is None:
+        _session_store = BoundedResultStore(settings.SESSION_RESULT_STORE_DIR,
+                                            settings.SESSION_RESULT_STORE_MAX_BYTES)
+    return _session_store
+
+
+def get_master_store() -> BoundedResultStore:
+    """Process-wide store for /api/v1/colorize results under MASTER_STORE_DIR"""
+    global _master_store
+    if _master_store is None:
+        _master_store = BoundedResultStore(settings.MASTER_STORE_DIR,
+                                           settings.MASTER_STORE_MAX_BYTES)
+    return _master_store
+
+
+def get_derivative_store() -> BoundedResultStore:
+    """Process-wide store for result variants under DERIVATIVE_STORE_DIR"""
+    global _derivative_store
+    if _derivative_store is None:
+        _derivative_store = BoundedResultStore(settings.DERIVATIVE_STORE_DIR,
+                                               settings.DERIVATIVE_STORE_MAX_BYTES)
+    return _derivative_store
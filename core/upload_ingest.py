@@ -0,0 +1,227 @@
+"""
+Streaming, size-capped ingestion of uploaded images for the API
+"""
+
+from PIL import Image
+from typing import Optional
+import io
+import os
+import tempfile
+
+from config.settings import settings
+from utils.validators import (
+    ALLOWED_UPLOAD_FORMATS, FORMAT_MIME_TYPES, UnsupportedImageError,
+    UploadTooLargeError, sniff_image_format, validate_image_dimensions
+)
+
+SNIFF_BYTES = 16
+
+
+class IngestedUpload:
+    """
+    Upload that passed ingestion: size-capped, sniffed and header-probed
+
+    Small uploads stay in memory, larger ones are spooled to a temporary file.
+    Exposes the file-like and Streamlit UploadedFile attributes that
+    ImageProcessor.process_uploaded_image relies on.
+    """
+
+    def __init__(self, spool, filename: str, image_format: str, size: int, width: int, height: int):
+        self._spool = spool
+        self.name = filename
+        self.format = image_format
+        self.type = FORMAT_MIME_TYPES[image_format]
+        self.size = size
+        self.width = width
+        self.height = height
+        self._spool.seek(0)
+
+    @property
+    def spooled_to_disk(self) -> bool:
+        return bool(getattr(self._spool, '_rolled', False))
+
+    def read(self, size: int = -1) -> bytes:
+        return self._spool.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._spool.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._spool.tell()
+
+    def getvalue(self) -> bytes:
+        position = self._spool.tell()
+        self._spool.seek(0)
+        data = self._spool.read()
+        self._spool.seek(position)
+        return data
+
+    def close(self):
+        self._spool.close()
+
+    def __getattr__(self, name):
+        # Remaining file API (readline, fileno, ...) used by some Pillow plugins
+        if name == '_spool':
+            raise AttributeError(name)
+        return getattr(self._spool, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def probe_image_header(data, image_format: str):
+    """
+    Read dimensions from the image header without decoding pixels
+
+    Rejects images whose declared size is out of bounds or whose pixel
+    count could be a decompression bomb.
+
+    Returns:
+        Tuple (width, height)
+    """
+    try:
+        size, probed_format = _read_header(data)
+    except Image.DecompressionBombError:
+        raise UnsupportedImageError("Image pixel count exceeds the decompression limit")
+    except Exception:
+        raise UnsupportedImageError("Unable to read image header")
+
+    return _check_header(size, probed_format, image_format)
+
+
+def _read_header(data):
+    """Image.open only parses the header; pixels are decoded lazily"""
+    with Image.open(data) as image:
+        return image.size, image.format
+
+
+def _check_header(size, probed_format: str, image_format: str):
+    width, height = size
+    if probed_format != image_format:
+        raise UnsupportedImageError(
+            f"Image header says {probed_format} but content starts like {image_format}"
+        )
+
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise UnsupportedImageError(
+            f"Image has too many pixels ({width}x{height}). Max: {settings.MAX_IMAGE_PIXELS}"
+        )
+
+    validate_image_dimensions(width, height)
+    return width, height
+
+
+async def ingest_upload(
+    upload,
+    max_bytes: Optional[int] = None,
+    spool_threshold: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> IngestedUpload:
+    """
+    Read an upload in chunks, enforcing size, format and dimension limits
+
+    Args:
+        upload: FastAPI UploadFile (anything with async read(n) and filename)
+        max_bytes: Abort once more than this many bytes arrive
+        spool_threshold: Uploads larger than this are spooled to a temp file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        IngestedUpload positioned at the start of the image
+
+    Raises:
+        UploadTooLargeError: More than max_bytes were sent
+        UnsupportedImageError: Unknown magic bytes, bad header or bomb
+        ValueError: Dimensions outside MIN_DIMENSION..MAX_DIMENSION
+    """
+    max_bytes = max_bytes or settings.MAX_IMAGE_SIZE
+    spool_threshold = spool_threshold or settings.UPLOAD_SPOOL_THRESHOLD
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    total = 0
+    image_format = None
+    dimensions = None
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLargeError(
+                    f"File too large. Max size: {max_bytes // (1024 * 1024)}MB"
+                )
+            spool.write(chunk)
+
+            if image_format is None and spool.tell() >= SNIFF_BYTES:
+                image_format = _sniff(spool)
+                # Most headers fit in the first chunk: reject bombs before reading on
+                dimensions = _try_probe(spool, image_format)
+                spool.seek(0, io.SEEK_END)
+
+        if image_format is None:
+            image_format = _sniff(spool)
+        if dimensions is None:
+            spool.seek(0)
+            dimensions = probe_image_header(spool, image_format)
+
+        width, height = dimensions
+        filename = upload.filename or 'upload'
+        return IngestedUpload(spool, filename, image_format, total, width, height)
+
+    except Exception:
+        spool.close()
+        raise
+
+
+def ingest_file(path: str, filename: str, max_bytes: Optional[int] = None) -> IngestedUpload:
+    """
+    Apply the upload checks to an image already on disk
+
+    Used for archive entries and fetched blobs; the file is read in place
+    rather than copied into a spool.
+
+    Raises:
+        UploadTooLargeError, UnsupportedImageError, ValueError: As ingest_upload
+    """
+    max_bytes = max_bytes or settings.MAX_IMAGE_SIZE
+    size = os.path.getsize(path)
+    if size > max_bytes:
+        raise UploadTooLargeError(f"File too large. Max size: {max_bytes // (1024 * 1024)}MB")
+
+    handle = open(path, 'rb')
+    try:
+        image_format = _sniff(handle)
+        handle.seek(0)
+        width, height = probe_image_header(handle, image_format)
+        return IngestedUpload(handle, filename, image_format, size, width, height)
+    except Exception:
+        handle.close()
+        raise
+
+
+def _sniff(spool) -> str:
+    spool.seek(0)
+    image_format = sniff_image_format(spool.read(SNIFF_BYTES))
+    if image_format not in ALLOWED_UPLOAD_FORMATS:
+        raise UnsupportedImageError(
+            f"Unsupported image content. Allowed: {', '.join(ALLOWED_UPLOAD_FORMATS)}"
+        )
+    return image_format
+
+
+def _try_probe(spool, image_format: str):
+    """Probe the header from a partial upload; None if it is not complete yet"""
+    spool.seek(0)
+    try:
+        size, probed_format = _read_header(io.BytesIO(spool.read()))
+    except Image.DecompressionBombError:
+        raise UnsupportedImageError("Image pixel count exceeds the decompression limit")
+    except Exception:
+        return None
+    return _check_header(size, probed_format, image_format)
@@ -0,0 +1,130 @@
+"""
+Speculative upload preprocessing for the Streamlit UI
+
+An upload is handed to a small thread pool as soon as it arrives, so
+decoding, resizing, color analysis and the PNG encode for the model run
+while the user is still writing the prompt. Finished work is kept in an
+LRU keyed by content digest and shared across sessions. Replacing the
+upload cancels the old work: queued jobs never start, running ones stop
+at the next step boundary and are not cached.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+import hashlib
+import io
+import threading
+
+from core.image_processor import ImageProcessor, PreparedImage
+
+
+class PreprocessHandle:
+    """
+    Background preprocessing of one upload
+    """
+
+    def __init__(self, upload_id: Any):
+        self.upload_id = upload_id
+        self.digest: Optional[str] = None
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        if not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    def result(self, timeout: Optional[float] = None) -> PreparedImage:
+        return self.future.result(timeout)
+
+    def cancel(self):
+        """Stop the work; a job that has not started yet never runs"""
+        self.cancelled.set()
+        self.future.cancel()
+
+
+class SpeculativePreprocessor:
+    """
+    Preprocesses uploads in the background and caches results by content digest
+    """
+
+    def __init__(
+        self,
+        image_processor: ImageProcessor,
+        max_workers: int = 2,
+        max_entries: int = 16,
+        validate_colors: bool = True,
+        auto_resize: bool = True
+    ):
+        self.image_processor = image_processor
+        self.max_entries = max_entries
+        self.validate_colors = validate_colors
+        self.auto_resize = auto_resize
+        self.stats = {"submitted": 0, "cache_hits": 0, "completed": 0, "cancelled": 0}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="nanozilla-prep")
+        self._cache: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, upload_id: Any, data: bytes) -> PreprocessHandle:
+        """
+        Start preprocessing an upload without waiting
+
+        Args:
+            upload_id: Caller's identity for the upload (e.g. Streamlit's file_id)
+            data: Raw upload bytes
+        """
+        handle = PreprocessHandle(upload_id)
+        with self._lock:
+            self.stats["submitted"] += 1
+        handle.future = self._pool.submit(self._run, handle, data)
+        handle.future.add_done_callback(self._settle)
+        return handle
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, handle: PreprocessHandle, data: bytes) -> PreparedImage:
+        handle.digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            cached = self._cache.get(handle.digest)
+            if cached is not None:
+                self._cache.move_to_end(handle.digest)
+                self.stats["cache_hits"] += 1
+                return cached
+
+        prepared = self.image_processor.prepare_upload(
+            io.BytesIO(data),
+            validate_colors=self.validate_colors,
+            auto_resize=self.auto_resize,
+            cancelled=handle.cancelled
+        )
+
+        with self._lock:
+            self._cache[handle.digest] = prepared
+            self._cache.move_to_end(handle.digest)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self.stats["completed"] += 1
+        return prepared
+
+    def _settle(self, future: Future):
+        if future.cancelled() or isinstance(future.exception(), CancelledError):
+            with self._lock:
+                self.stats["cancelled"] += 1
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._cache), "max_entries": self.max_entries, **self.stats}
+
+
+def create_speculative_preprocessor(image_processor: ImageProcessor,
+                                    **kwargs) -> SpeculativePreprocessor:
+    """Factory function for SpeculativePreprocessor"""
+    return SpeculativePreprocessor(image_processor, **kwargs)
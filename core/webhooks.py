@@ -0,0 +1,338 @@
+"""
+Signed webhook delivery for batch job events
+
+enqueue() only appends to an in-memory queue and returns, so delivery
+never blocks the generation path. A single worker task drains the queue:
+
+- events for the same destination are coalesced into one POST of up to
+  max_batch events, with at most one request in flight per destination;
+- one pooled httpx.AsyncClient is shared by every delivery;
+- transport errors, 408, 429 and 5xx responses are retried with
+  exponential backoff and jitter, honoring Retry-After;
+- payloads that exhaust their attempts, are refused with any other
+  4xx, or hit an unexpected error, are written to a SQLite dead-letter
+  table;
+- the destination's resolved address is checked again before every
+  request, so a callback host cannot be re-pointed at an internal one
+  after the job was accepted.
+
+Every POST body is {"events": [...]} and is signed with
+
+    X-Nanozilla-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sqlite3
+import time
+import uuid
+
+import httpx
+
+from config.settings import settings
+from utils.validators import UnsafeURLError, outbound_request_guard, validate_callback_url
+
+SIGNATURE_HEADER = "X-Nanozilla-Signature"
+RETRYABLE_STATUS = (408, 429)
+
+
+def sign_payload(secret: str, body: bytes, timestamp: Optional[int] = None) -> str:
+    """Signature header value for a request body"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signed = f"{timestamp}.".encode("utf-8") + body
+    digest = hmac.new(secret.encode("utf-8"), signed, hashlib.sha256)
+    return f"t={timestamp},v1={digest.hexdigest()}"
+
+
+def verify_signature(secret: str, body: bytes, header: str, tolerance: float = 300) -> bool:
+    """
+    Check a received signature header (for receivers and tests)
+
+    Rejects signatures older than `tolerance` seconds to limit replays.
+    """
+    try:
+        fields = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(fields["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    expected = sign_payload(secret, body, timestamp).split("v1=", 1)[1]
+    return hmac.compare_digest(expected, fields.get("v1", ""))
+
+
+class WebhookDispatcher:
+    """
+    Background delivery of signed events to callback URLs
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        dead_letter_path: str,
+        max_connections: int = 20,
+        max_batch: int = 100,
+        max_attempts: int = 6,
+        max_pending: int = 10000,
+        timeout: float = 10.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 300.0,
+        linger: float = 0.05,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        if not secret:
+            raise ValueError("A webhook signing secret is required")
+
+        self.secret = secret
+        self.dead_letter_path = dead_letter_path
+        self.max_connections = max_connections
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.linger = linger
+        self.transport = transport
+
+        self.stats = {"enqueued": 0, "delivered": 0, "requests": 0, "retries": 0,
+                      "dead_lettered": 0}
+        self._pending: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._overflow: List[Tuple[str, Dict[str, Any]]] = []
+        self._inflight: Set[str] = set()
+        self._deliveries: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._init_dead_letters()
+
+    def enqueue(self, url: str, event_type: str, data: Dict[str, Any]) -> str:
+        """
+        Queue an event for delivery; never blocks and never raises on delivery problems
+
+        Must be called from the event loop thread.
+
+        Returns:
+            Event id, also sent in the payload for receiver-side deduplication
+        """
+        event = {
+            "id": f"evt_{uuid.uuid4().hex[:16]}",
+            "type": event_type,
+            "created_at": datetime.utcnow().isoformat(),
+            "data": data
+        }
+        queue = self._pending.setdefault(url, deque())
+        queue.append(event)
+        self._pending_count += 1
+        self.stats["enqueued"] += 1
+
+        if self._pending_count > self.max_pending:
+            # Shed the oldest event of this destination to the dead-letter table
+            self._overflow.append((url, queue.popleft()))
+            self._pending_count -= 1
+
+        self._ensure_worker()
+        self._wake.set()
+        return event["id"]
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until everything queued has been delivered or dead-lettered"""
+        deadline = time.monotonic() + timeout
+        while self._pending_count or self._inflight or self._overflow:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    async def aclose(self, drain_timeout: float = 5.0):
+        """Stop the worker; whatever is still undelivered is dead-lettered"""
+        if self._worker is not None:
+            await self.drain(drain_timeout)
+            tasks = [self._worker, *self._deliveries]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._worker = None
+
+        leftovers = [(url, event) for url, queue in self._pending.items() for event in queue]
+        leftovers += self._overflow
+        self._pending.clear()
+        self._overflow = []
+        self._pending_count = 0
+        for url, event in leftovers:
+            self._dead_letter(url, [event], 0, "Dispatcher shut down before delivery")
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead-lettered payloads"""
+        rows = self._execute(
+            "SELECT id, url, events, attempts, last_error, failed_at FROM webhook_dead_letters "
+            "ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        return [
+            {"id": row[0], "url": row[1], "events": json.loads(row[2]), "attempts": row[3],
+             "last_error": row[4], "failed_at": row[5]}
+            for row in rows
+        ]
+
+    # ========================================================================
+    # WORKER
+    # ========================================================================
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._wake = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(self.timeout),
+                transport=self.transport,
+                event_hooks={"request": [outbound_request_guard(validate_callback_url)]}
+            )
+
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if self.linger:
+                await asyncio.sleep(self.linger)  # let bursts coalesce
+
+            if self._overflow:
+                overflow, self._overflow = self._overflow, []
+                for url, event in overflow:
+                    await asyncio.to_thread(self._dead_letter, url, [event], 0,
+                                            "Webhook queue full")
+
+            for url in list(self._pending):
+                if url in self._inflight or len(self._inflight) >= self.max_connections:
+                    continue
+                queue = self._pending[url]
+                batch = [queue.popleft() for _ in range(min(self.max_batch, len(queue)))]
+                if not queue:
+                    del self._pending[url]
+                self._pending_count -= len(batch)
+
+                self._inflight.add(url)
+                task = asyncio.create_task(self._deliver(url, batch))
+                self._deliveries.add(task)
+                task.add_done_callback(lambda done, url=url: self._delivery_done(url, done))
+
+    def _delivery_done(self, url: str, task: asyncio.Task):
+        self._inflight.discard(url)
+        self._deliveries.discard(task)
+        if self._pending and self._wake is not None:
+            self._wake.set()  # events that arrived meanwhile
+
+    async def _deliver(self, url: str, events: List[Dict[str, Any]]):
+        body = json.dumps({"events": events}, default=str).encode("utf-8")
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                retryable, error, retry_after = await self._post(url, body)
+                if error is None:
+                    self.stats["delivered"] += len(events)
+                    return
+                if not retryable or attempt >= self.max_attempts:
+                    await asyncio.to_thread(self._dead_letter, url, events, attempt, error)
+                    return
+
+                self.stats["retries"] += 1
+                if retry_after is not None:
+                    delay = min(retry_after, self.backoff_max)
+                else:
+                    delay = self._backoff(attempt)
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._dead_letter(url, events, attempt, "Dispatcher shut down before delivery")
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self._dead_letter, url, events, attempt,
+                                    f"{type(e).__name__}: {e}")
+
+    async def _post(self, url: str, body: bytes) -> Tuple[bool, Optional[str], Optional[float]]:
+        """
+        Returns:
+            Tuple (retryable, error message or None on success, Retry-After seconds)
+        """
+        self.stats["requests"] += 1
+        headers = {"Content-Type": "application/json",
+                   SIGNATURE_HEADER: sign_payload(self.secret, body)}
+        try:
+            response = await self._client.post(url, content=body, headers=headers)
+        except UnsafeURLError as e:
+            return False, str(e), None
+        except httpx.HTTPError as e:
+            return True, f"{type(e).__name__}: {e}", None
+
+        if response.is_success:
+            return False, None, None
+
+        retry_after = None
+        try:
+            retry_after = max(0.0, float(response.headers.get("Retry-After", "")))
+        except ValueError:
+            pass
+        retryable = response.status_code in RETRYABLE_STATUS or response.status_code >= 500
+        return retryable, f"HTTP {response.status_code}", retry_after
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    # ========================================================================
+    # DEAD LETTERS
+    # ========================================================================
+
+    def _execute(self, sql: str, parameters: Tuple = ()) -> List[Tuple]:
+        """Run one statement in its own connection (callable from any thread)"""
+        connection = sqlite3.connect(self.dead_letter_path, timeout=30)
+        try:
+            with connection:
+                return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def _init_dead_letters(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_path)), exist_ok=True)
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS webhook_dead_letters ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, events TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL, last_error TEXT, failed_at TEXT NOT NULL)"
+        )
+
+    def _dead_letter(self, url: str, events: List[Dict[str, Any]], attempts: int, error: str):
+        self._execute(
+            "INSERT INTO webhook_dead_letters (url, events, attempts, last_error, failed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, json.dumps(events, default=str), attempts, error, datetime.utcnow().isoformat())
+        )
+        self.stats["dead_lettered"] += len(events)
+
+
+def create_webhook_dispatcher() -> Optional[WebhookDispatcher]:
+    """Dispatcher configured from settings; None when no signing secret is set"""
+    if not settings.WEBHOOK_SECRET:
+        return None
+    return WebhookDispatcher(
+        secret=settings.WEBHOOK_SECRET,
+        dead_letter_path=settings.WEBHOOK_DEAD_LETTER_PATH,
+        max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+        max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+        timeout=settings.WEBHOOK_TIMEOUT
+    )
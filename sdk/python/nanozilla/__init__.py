@@ -0,0 +1,236 @@
+"""
+NANozILLA Python SDK - Vintage 8-bit AI Image Colorization
+"""
+
+import requests
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+__version__ = "2.0.0"
+
+from nanozilla.async_client import (  # noqa: E402,F401
+    AsyncNanozillaClient, ColorizeResult, NanozillaAPIError
+)
+from nanozilla.events import JobEvent, SSEDecoder  # noqa: E402,F401
+from nanozilla.preprocess import PreparedUpload, prepare_upload  # noqa: E402,F401
+
+
+class NanozillaClient:
+    """
+    Python client for NANozILLA Reactor API
+
+    With preprocess=True, images are downscaled client-side with the
+    server's own policy before upload (see nanozilla.preprocess).
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://api.nanozilla.com/v1",
+                 preprocess: bool = False):
+        self.api_key = api_key
+        self.preprocess = preprocess
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "User-Agent": f"NANozILLA-Python-SDK/{__version__}"
+        })
+
+    def colorize(
+        self,
+        image_path: str,
+        style_prompt: str,
+        quality: str = "high",
+        safety_level: str = "block_some",
+        output_format: str = "png"
+    ) -> Dict[str, Any]:
+        """
+        Colorize a single image
+
+        Args:
+            image_path: Path to image file
+            style_prompt: Style description
+            quality: Image quality (high, medium, low)
+            safety_level: Content safety level
+            output_format: Output format (png, jpeg, webp)
+
+        Returns:
+            API response dictionary, plus an "upload" report of bytes sent and saved
+        """
+        prepared = prepare_upload(image_path, self.preprocess)
+        with prepared.open() as image_file:
+            files = {
+                'image': (prepared.filename, image_file, prepared.content_type)
+            }
+            data = {
+                'style_prompt': style_prompt,
+                'quality': quality,
+                'safety_level': safety_level,
+                'output_format': output_format
+            }
+
+            response = self.session.post(
+                f"{self.base_url}/colorize",
+                files=files,
+                data=data
+            )
+
+        return {**self._handle_response(response), "upload": prepared.report()}
+
+    def colorize_batch(
+        self,
+        image_paths: List[str],
+        style_prompt: str,
+        concurrent: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Process multiple images in batch
+
+        Args:
+            image_paths: List of image file paths
+            style_prompt: Style description for all images
+            concurrent: Maximum concurrent processing
+
+        Returns:
+            Batch job response, plus an "uploads" report per image
+        """
+        prepared = [prepare_upload(image_path, self.preprocess) for image_path in image_paths]
+        files = []
+        for upload in prepared:
+            files.append(
+                ('images', (upload.filename, upload.open(), upload.content_type))
+            )
+
+        data = {
+            'style_prompt': style_prompt,
+            'concurrent': concurrent
+        }
+
+        response = self.session.post(
+            f"{self.base_url}/colorize/batch",
+            files=files,
+            data=data
+        )
+
+        # Close all opened files
+        for _, file_tuple in files:
+            file_tuple[1].close()
+
+        return {**self._handle_response(response),
+                "uploads": [upload.report() for upload in prepared]}
+
+    def get_job_status(self, job_id: str, wait: float = 0, since: Optional[int] = None,
+                       include_results: bool = True) -> Dict[str, Any]:
+        """
+        Get status of a batch job
+
+        Args:
+            job_id: Job ID from batch processing
+            wait: Long-poll up to this many seconds for the job to change
+            since: Job version to wait past (default: the current one)
+            include_results: Set False to skip the hex-encoded results
+
+        Returns:
+            Job status response
+        """
+        params: Dict[str, Any] = {"include_results": str(include_results).lower()}
+        if wait:
+            params["wait"] = wait
+        if since is not None:
+            params["since"] = since
+        response = self.session.get(f"{self.base_url}/jobs/{job_id}", params=params)
+        return self._handle_response(response)
+
+    def wait_for_job(self, job_id: str, timeout: Optional[float] = None,
+                     poll_wait: float = 30) -> Dict[str, Any]:
+        """
+        Block until a batch job completes or fails, by long-polling
+
+        Args:
+            job_id: Job ID from batch processing
+            timeout: Give up after this many seconds (None waits forever)
+            poll_wait: Seconds the server may hold each poll
+
+        Returns:
+            Final job status response, including results
+
+        Raises:
+            TimeoutError: The job did not finish within timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        since = None
+        while True:
+            wait = poll_wait
+            if deadline is not None:
+                wait = max(0.0, min(poll_wait, deadline - time.monotonic()))
+            status = self.get_job_status(job_id, wait=wait, since=since, include_results=False)
+            if status["data"]["status"] in ("completed", "failed"):
+                return self.get_job_status(job_id)
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Job {job_id} still {status['data']['status']} after {timeout}s"
+                )
+            since = status["data"].get("version")
+
+    def iter_job_events(self, job_id: str, last_event_id: int = 0) -> Iterator[JobEvent]:
+        """
+        Follow a batch job's progress as Server-Sent Events
+
+        Yields one JobEvent per finished image and ends after the final
+        "completed" or "failed" event.
+        """
+        headers = {"Accept": "text/event-stream", "Last-Event-ID": str(last_event_id)}
+        url = f"{self.base_url}/jobs/{job_id}/events"
+        with self.session.get(url, headers=headers, stream=True) as response:
+            if response.status_code != 200:
+                self._handle_response(response)
+            decoder = SSEDecoder()
+            for line in response.iter_lines(decode_unicode=True):
+                event = decoder.feed(line)
+                if event is not None:
+                    yield event
+                    if event.final:
+                        return
+
+    def get_usage_analytics(self) -> Dict[str, Any]:
+        """
+        Get usage statistics and analytics
+
+        Returns:
+            Analytics response
+        """
+        response = self.session.get(f"{self.base_url}/analytics/usage")
+        return self._handle_response(response)
+
+    def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
+        """Handle API response"""
+        try:
+            data = response.json()
+        except json.JSONDecodeError:
+            raise NanozillaAPIError(f"Invalid JSON response: {response.text}", response.status_code)
+
+        if response.status_code != 200:
+            error_msg = data.get('error', {}).get('message', 'Unknown error')
+            raise NanozillaAPIError(f"API Error {response.status_code}: {error_msg}",
+                                    response.status_code)
+
+        if not data.get('success'):
+            error_msg = data.get('error', {}).get('message', 'Unknown error')
+            raise NanozillaAPIError(f"API Error: {error_msg}", response.status_code)
+
+        return data
+
+
+# Example usage
+if __name__ == "__main__":
+    # Initialize client
+    client = NanozillaClient(api_key="your_api_key")
+
+    # Colorize single image
+    result = client.colorize(
+        image_path="input.jpg",
+        style_prompt="vibrant anime style with bright colors",
+        quality="high"
+    )
+
+    print(f"Generation ID: {result['data']['generation_id']}")
+    print(f"Processing Time: {result['data']['processing_time']}s")
@@ -0,0 +1,501 @@
+"""
+Asynchronous NANozILLA client with a pooled keep-alive transport
+
+    async with AsyncNanozillaClient(api_key="...") as client:
+        async for result in client.colorize_many(paths, "warm vintage tones", concurrency=8):
+            print(result.path, result.success)
+"""
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from nanozilla import __version__
+from nanozilla.events import JobEvent, SSEDecoder
+from nanozilla.preprocess import prepare_upload
+
+RETRYABLE_STATUS = (429, 502, 503, 504)
+
+
+class NanozillaAPIError(Exception):
+    """API call failed; carries the HTTP status and any Retry-After hint"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.attempts = 0
+
+
+@dataclass
+class ColorizeResult:
+    """Outcome of one image in colorize_many"""
+
+    path: str
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+    upload: Optional[Dict[str, Any]] = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delta-seconds or HTTP date) in seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncNanozillaClient:
+    """
+    Async client for NANozILLA Reactor API
+
+    One httpx.AsyncClient is shared by every call, so connections are kept
+    alive and reused. Throttling (429/503) and transient failures are retried,
+    honoring the server's Retry-After and otherwise backing off
+    exponentially with jitter.
+
+    With preprocess=True, images are downscaled client-side with the
+    server's own policy before upload (see nanozilla.preprocess).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.nanozilla.com/v1",
+        max_connections: int = 10,
+        timeout: float = 120.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        preprocess: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key
+        self.preprocess = preprocess
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "User-Agent": f"NANozILLA-Python-SDK/{__version__}"
+            },
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout),
+            transport=transport
+        )
+
+    async def __aenter__(self) -> "AsyncNanozillaClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def colorize(
+        self,
+        image_path: str,
+        style_prompt: str,
+        quality: str = "high",
+        safety_level: str = "block_some",
+        output_format: str = "png"
+    ) -> Dict[str, Any]:
+        """
+        Colorize a single image, streaming it from disk
+
+        Returns:
+            API response dictionary, plus an "upload" report of bytes sent and saved
+        """
+        response, _, upload = await self._colorize(image_path, style_prompt, quality,
+                                                   safety_level, output_format)
+        return {**response, "upload": upload}
+
+    async def colorize_to_file(
+        self,
+        image_path: str,
+        output_path: str,
+        style_prompt: str,
+        quality: str = "high",
+        safety_level: str = "block_some",
+        output_format: str = "png"
+    ) -> Dict[str, Any]:
+        """
+        Colorize an image and stream the result straight to disk
+
+        The image is downloaded as raw bytes into a temporary file next to
+        output_path and renamed into place, so output_path is never partial.
+
+        Returns:
+            Dictionary with output_path, bytes, generation_id, processing_time,
+            attempts and the upload report
+        """
+        async def save(response):
+            return await self._save_response(response, output_path)
+
+        result, attempts, upload = await self._colorize(
+            image_path, style_prompt, quality, safety_level, output_format,
+            headers={"Accept": "image/*"}, on_success=save
+        )
+        return {**result, "attempts": attempts, "upload": upload}
+
+    async def colorize_many(
+        self,
+        image_paths: Iterable[str],
+        style_prompt: str,
+        concurrency: int = 4,
+        quality: str = "high",
+        safety_level: str = "block_some",
+        output_format: str = "png"
+    ) -> AsyncIterator[ColorizeResult]:
+        """
+        Colorize any number of images with at most `concurrency` in flight
+
+        image_paths is consumed lazily, so it can be a generator over a huge
+        directory. Results are yielded as they complete, not in input order;
+        failures are yielded as results with success=False. Memory stays
+        bounded by `concurrency` regardless of the number of inputs.
+        """
+        paths = iter(image_paths)
+        results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        finished = object()
+
+        async def worker():
+            try:
+                # Workers share the iterator; next() never yields to the loop
+                for path in paths:
+                    await results.put(await self._colorize_result(
+                        str(path), style_prompt, quality, safety_level, output_format
+                    ))
+            finally:
+                await results.put(finished)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                item = await results.get()
+                if item is finished:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def colorize_batch(self, image_paths: Iterable[str], style_prompt: str,
+                             concurrent: int = 3) -> Dict[str, Any]:
+        """
+        Submit a batch job; follow it with wait_for_job or iter_job_events
+
+        Returns:
+            Batch job response, plus an "uploads" report per image
+        """
+        prepared = await asyncio.gather(*(
+            asyncio.to_thread(prepare_upload, str(path), self.preprocess) for path in image_paths
+        ))
+
+        def files():
+            return [('images', (upload.filename, upload.open(), upload.content_type))
+                    for upload in prepared]
+
+        response, _ = await self._request("POST", "/colorize/batch", files_factory=files,
+                                          data={'style_prompt': style_prompt,
+                                                'concurrent': concurrent})
+        return {**response, "uploads": [upload.report() for upload in prepared]}
+
+    async def colorize_archive(self, archive_path: str, style_prompt: str, concurrent: int = 3,
+                               callback_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Submit a tar or zip archive of images as one job, streamed from disk
+
+        Returns:
+            Job response with job_id, total_images, rejected_entries and result_url
+        """
+        params: Dict[str, Any] = {"style_prompt": style_prompt, "concurrent": concurrent}
+        if callback_url:
+            params["callback_url"] = callback_url
+
+        async def body():
+            with open(archive_path, 'rb') as handle:
+                for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                    yield chunk
+
+        response, _ = await self._request(
+            "POST", "/colorize/archive", params=params, content_factory=body,
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        return response
+
+    async def download_job_results(self, job_id: str, output_path: str) -> int:
+        """
+        Stream a finished archive job's outputs to a tar file
+
+        Returns:
+            Bytes written
+        """
+        async def save(response):
+            directory, name = os.path.split(os.path.abspath(output_path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+            try:
+                with os.fdopen(fd, 'wb') as handle:
+                    async for chunk in response.aiter_bytes():
+                        handle.write(chunk)
+                    size = handle.tell()
+                os.replace(temp_path, output_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+            return size
+
+        size, _ = await self._request("GET", f"/jobs/{job_id}/results.tar", on_success=save)
+        return size
+
+    async def get_job_status(self, job_id: str, wait: float = 0, since: Optional[int] = None,
+                             include_results: bool = True) -> Dict[str, Any]:
+        """
+        Get status of a batch job
+
+        With wait > 0 the server holds the request until the job changes
+        after version `since` or finishes (long-poll).
+        """
+        params: Dict[str, Any] = {"include_results": str(include_results).lower()}
+        if since is not None:
+            params["since"] = since
+        kwargs = {}
+        if wait:
+            params["wait"] = wait
+            # The server may legitimately hold the request for `wait` seconds
+            kwargs["timeout"] = httpx.Timeout(self._client.timeout.connect,
+                                              read=(self._client.timeout.read or 0) + wait)
+        response, _ = await self._request("GET", f"/jobs/{job_id}", params=params, **kwargs)
+        return response
+
+    async def wait_for_job(self, job_id: str, timeout: Optional[float] = None,
+                           poll_wait: float = 30) -> Dict[str, Any]:
+        """
+        Block until a batch job completes or fails, by long-polling
+
+        Intermediate polls skip the results; they are fetched once at the end.
+
+        Raises:
+            asyncio.TimeoutError: The job did not finish within timeout seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        since = None
+        while True:
+            wait = poll_wait
+            if deadline is not None:
+                wait = max(0.0, min(poll_wait, deadline - time.monotonic()))
+            status = await self.get_job_status(job_id, wait=wait, since=since,
+                                               include_results=False)
+            if status["data"]["status"] in ("completed", "failed"):
+                return await self.get_job_status(job_id)
+            if deadline is not None and time.monotonic() >= deadline:
+                raise asyncio.TimeoutError(
+                    f"Job {job_id} still {status['data']['status']} after {timeout}s"
+                )
+            since = status["data"].get("version")
+
+    async def iter_job_events(self, job_id: str, last_event_id: int = 0) -> AsyncIterator[JobEvent]:
+        """
+        Follow a batch job's progress as Server-Sent Events
+
+        Yields one JobEvent per finished image and ends after the final
+        `completed` or `failed` event. Dropped connections are resumed from
+        the last event received.
+        """
+        failures = 0
+        timeout = httpx.Timeout(self._client.timeout.connect, read=None)
+        while True:
+            headers = {"Accept": "text/event-stream", "Last-Event-ID": str(last_event_id)}
+            try:
+                async with self._client.stream("GET", f"/jobs/{job_id}/events", headers=headers,
+                                               timeout=timeout) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        self._handle_response(response)
+                    decoder = SSEDecoder()
+                    async for line in response.aiter_lines():
+                        event = decoder.feed(line)
+                        if event is None:
+                            continue
+                        failures = 0
+                        last_event_id = event.id
+                        yield event
+                        if event.final:
+                            return
+            except httpx.TransportError:
+                failures += 1
+                if failures > self.max_retries:
+                    raise
+            await asyncio.sleep(self._backoff(max(failures, 1)))
+
+    async def get_usage_analytics(self) -> Dict[str, Any]:
+        """Get usage statistics and analytics"""
+        response, _ = await self._request("GET", "/analytics/usage")
+        return response
+
+    async def _colorize_result(self, path: str, style_prompt: str, *options) -> ColorizeResult:
+        started = time.perf_counter()
+        try:
+            data, attempts, upload = await self._colorize(path, style_prompt, *options)
+            return ColorizeResult(path, True, data=data, status_code=200, attempts=attempts,
+                                  elapsed=time.perf_counter() - started, upload=upload)
+        except NanozillaAPIError as e:
+            return ColorizeResult(path, False, error=str(e), status_code=e.status_code,
+                                  attempts=e.attempts, elapsed=time.perf_counter() - started)
+        except OSError as e:
+            return ColorizeResult(path, False, error=str(e), elapsed=time.perf_counter() - started)
+        except Exception as e:
+            # Anything else (malformed response, undecodable image) still yields a result
+            return ColorizeResult(path, False, error=f"{type(e).__name__}: {e}",
+                                  elapsed=time.perf_counter() - started)
+
+    async def _colorize(self, image_path: str, style_prompt: str, quality: str, safety_level: str,
+                        output_format: str, headers: Optional[Dict[str, str]] = None,
+                        on_success=None):
+        # Decoding and resizing are CPU-bound: keep them off the event loop
+        prepared = await asyncio.to_thread(prepare_upload, str(image_path), self.preprocess)
+        data = {
+            'style_prompt': style_prompt,
+            'quality': quality,
+            'safety_level': safety_level,
+            'output_format': output_format
+        }
+
+        def files():
+            # Reopened per attempt; httpx streams the multipart body in chunks
+            return {'image': (prepared.filename, prepared.open(), prepared.content_type)}
+
+        response, attempts = await self._request("POST", "/colorize", data=data, headers=headers,
+                                                 files_factory=files, on_success=on_success)
+        return response, attempts, prepared.report()
+
+    async def _request(self, method: str, url: str, files_factory=None, on_success=None,
+                       content_factory=None, **kwargs):
+        """
+        Send a request with retries
+
+        files_factory and content_factory build a fresh request body per
+        attempt. on_success, if given, consumes the streamed 200 response
+        instead of parsing it as JSON.
+
+        Returns:
+            Tuple (response data, attempts)
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            files = files_factory() if files_factory else None
+            if content_factory:
+                kwargs["content"] = content_factory()
+            try:
+                async with self._client.stream(method, url, files=files, **kwargs) as response:
+                    if response.status_code in RETRYABLE_STATUS and attempt <= self.max_retries:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        delay = (min(retry_after, self.backoff_max) if retry_after is not None
+                                 else self._backoff(attempt))
+                    else:
+                        try:
+                            if response.status_code == 200 and on_success:
+                                return await on_success(response), attempt
+                            await response.aread()
+                            return self._handle_response(response), attempt
+                        except NanozillaAPIError as e:
+                            e.attempts = attempt
+                            raise
+            except httpx.TransportError as e:
+                if attempt > self.max_retries:
+                    error = NanozillaAPIError(f"Transport error: {e}")
+                    error.attempts = attempt
+                    raise error
+                delay = self._backoff(attempt)
+            finally:
+                parts = files.items() if isinstance(files, dict) else files or ()
+                for _, file_tuple in parts:
+                    file_tuple[1].close()
+
+            await asyncio.sleep(delay)
+
+    async def _save_response(self, response: httpx.Response, output_path: str) -> Dict[str, Any]:
+        """Stream an image response to a temp file, then rename it into place"""
+        directory, name = os.path.split(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                if response.headers.get("content-type", "").startswith("image/"):
+                    metadata = {
+                        "generation_id": response.headers.get("X-Generation-Id"),
+                        "processing_time": float(response.headers.get("X-Processing-Time", 0) or 0),
+                    }
+                    async for chunk in response.aiter_bytes():
+                        handle.write(chunk)
+                else:
+                    # Server without raw image responses: fall back to the JSON envelope
+                    await response.aread()
+                    data = self._handle_response(response)['data']
+                    metadata = {
+                        "generation_id": data.get("generation_id"),
+                        "processing_time": data.get("processing_time"),
+                    }
+                    handle.write(bytes.fromhex(data["image_data"]))
+                size = handle.tell()
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        return {"output_path": output_path, "bytes": size, **metadata}
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _handle_response(self, response: httpx.Response) -> Dict[str, Any]:
+        """Handle API response"""
+        try:
+            data = response.json()
+        except ValueError:
+            raise NanozillaAPIError(f"Invalid JSON response: {response.text[:200]}",
+                                    response.status_code)
+
+        if response.status_code != 200:
+            error_msg = data.get('error', {}).get('message', 'Unknown error')
+            raise NanozillaAPIError(
+                f"API Error {response.status_code}: {error_msg}",
+                response.status_code,
+                parse_retry_after(response.headers.get("Retry-After"))
+            )
+
+        if not data.get('success'):
+            error_msg = data.get('error', {}).get('message', 'Unknown error')
+            raise NanozillaAPIError(f"API Error: {error_msg}", response.status_code)
+
+        return data
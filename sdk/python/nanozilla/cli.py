@@ -0,0 +1,366 @@
+"""
+Resumable bulk colorization from the command line
+
+    nanozilla colorize scans/ -o colorized/ --prompt "warm vintage tones" --concurrency 8
+
+Inputs are directories (walked recursively), image files, or a file list
+(--from-list, one path per line). Every completed image is appended to a
+JSONL manifest keyed by the SHA-256 of its content and the request
+parameters, so an interrupted run picks up where it stopped. Outputs are
+streamed to a temporary file and renamed into place before the manifest
+entry is written, so the manifest never points at a partial file.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+
+from nanozilla.async_client import AsyncNanozillaClient
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+OUTPUT_EXTENSIONS = {'png': '.png', 'jpeg': '.jpg', 'webp': '.webp'}
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class WorkItem:
+    """One input image and where its output goes"""
+
+    source: Path
+    output: Path
+
+
+def iter_work_items(inputs: List[str], from_list: Optional[str], output_dir: Path,
+                    output_format: str) -> Iterator[WorkItem]:
+    """
+    Expand the command line inputs into work items
+
+    Files under an input directory keep their relative path below
+    output_dir; individual files and list entries are written flat.
+    """
+    extension = OUTPUT_EXTENSIONS[output_format]
+
+    def flat(path: Path) -> WorkItem:
+        return WorkItem(path, output_dir / path.with_suffix(extension).name)
+
+    for raw in inputs:
+        root = Path(raw)
+        if root.is_dir():
+            for directory, _, names in os.walk(root):
+                for name in sorted(names):
+                    path = Path(directory) / name
+                    if path.suffix.lower() in IMAGE_EXTENSIONS:
+                        relative = path.relative_to(root).with_suffix(extension)
+                        yield WorkItem(path, output_dir / relative)
+        else:
+            yield flat(root)
+
+    if from_list:
+        with open(from_list, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield flat(Path(line))
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Append-only JSONL record of completed items
+
+    Lookups are by (content hash, params fingerprint). Source path, size
+    and mtime are remembered too, so unchanged files are skipped without
+    re-hashing them.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.completed = set()
+        self.sources: Dict[str, Tuple[int, int, str, str]] = {}
+        self._pending_sync = 0
+
+        if path.exists():
+            with open(path, encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    self._remember(entry)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(path, 'a', encoding='utf-8')
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    def is_done(self, sha256: str, params: str) -> bool:
+        return (sha256, params) in self.completed
+
+    def known_hash(self, source: Path, stat: os.stat_result) -> Optional[str]:
+        """Content hash recorded for this exact source file, if unchanged"""
+        known = self.sources.get(str(source))
+        if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return known[2]
+        return None
+
+    def record(self, entry: Dict):
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+        self._pending_sync += 1
+        if self._pending_sync >= self.fsync_every:
+            self.sync()
+        self._remember(entry)
+
+    def sync(self):
+        os.fsync(self._handle.fileno())
+        self._pending_sync = 0
+
+    def close(self):
+        self.sync()
+        self._handle.close()
+
+    def _remember(self, entry: Dict):
+        self.completed.add((entry['sha256'], entry['params']))
+        self.sources[entry['source']] = (entry['size'], entry['mtime_ns'], entry['sha256'],
+                                         entry['params'])
+
+
+class Progress:
+    """Live counters with throughput and ETA (total is None until known)"""
+
+    def __init__(self, total: Optional[int] = None, stream=sys.stderr, interval: float = 1.0):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.started = time.monotonic()
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_saved = 0
+        self.bytes_out = 0
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.skipped + self.failed
+
+    def snapshot(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = (self.completed + self.failed) / elapsed
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = round(max(self.total - self.processed, 0) / rate, 1)
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 1),
+            "images_per_s": round(rate, 2),
+            "upload_mb_per_s": round(self.bytes_in / elapsed / 1e6, 2),
+            "upload_mb_saved": round(self.bytes_saved / 1e6, 2),
+            "eta_s": eta,
+        }
+
+    def render(self) -> str:
+        snap = self.snapshot()
+        eta = ("--:--:--" if snap["eta_s"] is None
+               else time.strftime("%H:%M:%S", time.gmtime(snap["eta_s"])))
+        total = "?" if self.total is None else self.total
+        return (f"{self.processed}/{total} done ({self.skipped} skipped, {self.failed} failed) | "
+                f"{snap['images_per_s']:.2f} img/s | {snap['upload_mb_per_s']:.2f} MB/s up | "
+                f"ETA {eta}")
+
+    async def report_until(self, done: asyncio.Event):
+        end = "\r" if self.stream.isatty() else "\n"
+        while not done.is_set():
+            try:
+                await asyncio.wait_for(done.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.stream.write(self.render() + end)
+            self.stream.flush()
+        if end == "\r":
+            self.stream.write("\n")
+
+
+async def run_colorize(args: argparse.Namespace,
+                       client: Optional[AsyncNanozillaClient] = None) -> Dict:
+    """
+    Colorize every input not yet recorded in the manifest
+
+    Returns:
+        Final progress snapshot
+    """
+    output_dir = Path(args.output_dir)
+    manifest = Manifest(Path(args.manifest) if args.manifest else output_dir / "manifest.jsonl")
+    params = json.dumps({"prompt": args.prompt, "quality": args.quality,
+                         "safety_level": args.safety_level, "format": args.format}, sort_keys=True)
+    params_id = hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]
+
+    def walk() -> Iterator[WorkItem]:
+        return iter_work_items(args.inputs, args.from_list, output_dir, args.format)
+
+    def count() -> int:
+        return sum(1 for _ in walk())
+
+    # Items stream from the walk into a bounded queue; a separate counting
+    # pass fills in the total for the ETA without holding the items
+    progress = Progress(interval=args.progress_interval)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    client = client or AsyncNanozillaClient(api_key=args.api_key, base_url=args.base_url,
+                                            max_connections=args.concurrency,
+                                            max_retries=args.retries,
+                                            preprocess=args.preprocess)
+
+    async def count_items():
+        try:
+            total = await asyncio.to_thread(count)
+        except OSError:
+            return  # produce() reports the unreadable input
+        if progress.total is None:
+            progress.total = total
+
+    async def produce():
+        seen = 0
+        try:
+            for item in walk():
+                seen += 1
+                await enqueue(item)
+        except Exception:
+            await release_workers()  # e.g. an unreadable --from-list
+            raise
+        progress.total = seen
+        await release_workers()
+
+    async def release_workers():
+        for _ in range(args.concurrency):
+            await queue.put(None)
+
+    async def enqueue(item: WorkItem):
+        try:
+            stat = item.source.stat()
+            sha256 = manifest.known_hash(item.source, stat)
+            if sha256 is None:
+                sha256 = await asyncio.to_thread(file_sha256, item.source)
+        except OSError as e:
+            progress.failed += 1
+            print(f"error: {item.source}: {e}", file=sys.stderr)
+            return
+
+        if manifest.is_done(sha256, params_id) and item.output.exists():
+            progress.skipped += 1
+            return
+        await queue.put((item, stat, sha256))
+
+    async def work():
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            item, stat, sha256 = job
+            try:
+                result = await client.colorize_to_file(
+                    str(item.source), str(item.output), args.prompt,
+                    quality=args.quality, safety_level=args.safety_level, output_format=args.format
+                )
+            except Exception as e:
+                # Any per-item failure is reported; a dead worker would stall the queue
+                progress.failed += 1
+                print(f"error: {item.source}: {e}", file=sys.stderr)
+                continue
+
+            manifest.record({
+                "sha256": sha256,
+                "params": params_id,
+                "source": str(item.source),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "output": str(item.output),
+                "output_bytes": result["bytes"],
+                "upload_bytes": result["upload"]["upload_bytes"],
+                "generation_id": result.get("generation_id"),
+                "completed_at": datetime.utcnow().isoformat(),
+            })
+            progress.completed += 1
+            progress.bytes_in += result["upload"]["upload_bytes"]
+            progress.bytes_saved += result["upload"]["bytes_saved"]
+            progress.bytes_out += result["bytes"]
+
+    done = asyncio.Event()
+    reporter = asyncio.create_task(progress.report_until(done)) if not args.quiet else None
+    counter = asyncio.create_task(count_items())
+    try:
+        async with client:
+            await asyncio.gather(produce(), *(work() for _ in range(args.concurrency)))
+    finally:
+        done.set()
+        counter.cancel()
+        if reporter:
+            await reporter
+        manifest.close()
+
+    return progress.snapshot()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="nanozilla", description="NANozILLA command line client")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    colorize = commands.add_parser("colorize", help="Colorize files and directories, resumably")
+    colorize.add_argument("inputs", nargs="*", help="Image files or directories")
+    colorize.add_argument("--from-list", help="File with one input path per line")
+    colorize.add_argument("-o", "--output-dir", required=True)
+    colorize.add_argument("--prompt", required=True, help="Style prompt for every image")
+    colorize.add_argument("--quality", default="high", choices=["high", "medium", "low"])
+    colorize.add_argument("--safety-level", default="block_some",
+                          choices=["block_some", "block_most", "block_none"])
+    colorize.add_argument("--format", default="png", choices=sorted(OUTPUT_EXTENSIONS))
+    colorize.add_argument("--concurrency", type=int, default=4)
+    colorize.add_argument("--retries", type=int, default=5)
+    colorize.add_argument("--preprocess", action="store_true",
+                          help="Downscale large images client-side before upload")
+    colorize.add_argument("--manifest", help="Manifest path (default: OUTPUT_DIR/manifest.jsonl)")
+    colorize.add_argument("--api-key", default=os.getenv("NANOZILLA_API_KEY", ""))
+    colorize.add_argument("--base-url",
+                          default=os.getenv("NANOZILLA_BASE_URL", "https://api.nanozilla.com/v1"))
+    colorize.add_argument("--progress-interval", type=float, default=1.0)
+    colorize.add_argument("--quiet", action="store_true", help="No live progress output")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.from_list:
+        parser.error("give at least one input or --from-list")
+
+    try:
+        summary = asyncio.run(run_colorize(args))
+    except KeyboardInterrupt:
+        print("interrupted; re-run the same command to resume", file=sys.stderr)
+        return 130
+
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
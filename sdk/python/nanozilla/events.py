@@ -0,0 +1,66 @@
+"""
+Server-Sent Events decoding for job progress streams
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import json
+
+TERMINAL_EVENTS = ("completed", "failed")
+
+
+@dataclass
+class JobEvent:
+    """One event from GET /jobs/{job_id}/events"""
+
+    id: int
+    event: str
+    data: Dict[str, Any]
+
+    @property
+    def final(self) -> bool:
+        return self.event in TERMINAL_EVENTS
+
+
+class SSEDecoder:
+    """
+    Incremental text/event-stream decoder
+
+    Feed it one line at a time (without the line terminator); it returns a
+    JobEvent whenever a blank line completes one. Comments and retry hints
+    are ignored.
+    """
+
+    def __init__(self):
+        self._id: Optional[str] = None
+        self._event = "message"
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[JobEvent]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(':'):
+            return None
+
+        field, _, value = line.partition(':')
+        value = value[1:] if value.startswith(' ') else value
+        if field == 'id':
+            self._id = value
+        elif field == 'event':
+            self._event = value
+        elif field == 'data':
+            self._data.append(value)
+        return None
+
+    def _dispatch(self) -> Optional[JobEvent]:
+        if not self._data:
+            self._event = "message"
+            return None
+        event = JobEvent(
+            id=int(self._id) if self._id and self._id.isdigit() else 0,
+            event=self._event,
+            data=json.loads("\n".join(self._data))
+        )
+        self._event = "message"
+        self._data = []
+        return event
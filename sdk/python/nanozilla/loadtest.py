@@ -0,0 +1,602 @@
+"""
+NANozILLA Load Tester - open-model async load generator for the Reactor API
+
+Drives /api/v1/colorize and /api/v1/colorize/batch with Poisson arrivals and
+reports throughput, latency percentiles, error rates and RSS as JSON:
+server_rss for spawned or external servers, process_rss for in-process
+runs, where the server shares this process with the load generator.
+
+Usage:
+    python -m nanozilla.loadtest --rate 5 --duration 30
+    python -m nanozilla.loadtest --target spawn --endpoint batch --batch-sizes 2,4
+    python -m nanozilla.loadtest --url http://localhost:8000 --server-pid 4242
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from PIL import Image
+
+DEFAULT_PROMPT = "vintage 1950s colors with warm cinematic tones"
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+
+@dataclass
+class LoadTestConfig:
+    """Load test parameters"""
+
+    rate: float = 2.0                 # mean arrivals per second (open model)
+    duration: float = 10.0            # seconds of arrivals
+    arrival: str = "poisson"          # poisson or constant inter-arrival times
+    endpoint: str = "colorize"        # colorize, batch or mixed
+    image_sizes: List[int] = field(default_factory=lambda: [512])
+    batch_sizes: List[int] = field(default_factory=lambda: [4])
+    output_formats: List[str] = field(default_factory=lambda: ["png"])
+    input_format: str = "JPEG"
+    style_prompt: str = DEFAULT_PROMPT
+    request_timeout: float = 120.0
+    drain_timeout: float = 60.0
+    job_poll_interval: float = 0.25
+    seed: int = 0
+    target: str = "inprocess"         # inprocess, spawn or url
+    url: Optional[str] = None
+    server_pid: Optional[int] = None
+    min_call_interval: Optional[float] = None
+    simulator: Dict[str, Any] = field(default_factory=dict)
+
+
+# ============================================================================
+# SYNTHETIC INPUTS
+# ============================================================================
+
+
+def make_test_image(size: int, image_format: str = "JPEG", seed: int = 0) -> bytes:
+    """
+    Build a deterministic grayscale photo-like test image
+
+    Args:
+        size: Length of the longest side in pixels (4:3 aspect ratio)
+        image_format: Pillow format name used for encoding
+        seed: RNG seed for the noise texture
+
+    Returns:
+        Encoded image bytes
+    """
+    width, height = size, max(int(size * 3 / 4), 1)
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    noise = rng.normal(0, 24, size=(height, width)).astype(np.float32)
+    pixels = np.clip(gradient * 0.8 + noise + 24, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode="L").convert("RGB").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """Summarize latencies (seconds) in milliseconds"""
+    values = sorted(latencies)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "p50": ms(_percentile(values, 50)),
+        "p95": ms(_percentile(values, 95)),
+        "p99": ms(_percentile(values, 99)),
+        "mean": ms(sum(values) / len(values)) if values else None,
+        "max": ms(values[-1]) if values else None,
+    }
+
+
+# ============================================================================
+# RSS
+# ============================================================================
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Read resident set size of a process in MB (Linux /proc only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+class RSSSampler:
+    """Samples a process RSS periodically while the load test runs"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.pid:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> Dict[str, Optional[float]]:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        final = read_rss_mb(self.pid) if self.pid else None
+        if final is not None:
+            self.samples.append(final)
+        return {
+            "pid": self.pid,
+            "start_mb": round(self.samples[0], 1) if self.samples else None,
+            "peak_mb": round(max(self.samples), 1) if self.samples else None,
+            "end_mb": round(self.samples[-1], 1) if self.samples else None,
+        }
+
+
+# ============================================================================
+# TARGET SERVERS
+# ============================================================================
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class InProcessServer:
+    """Runs the API with a simulator backend on a localhost port in this process"""
+
+    rss_key = "process_rss"  # server and load generator together
+
+    def __init__(self, config: LoadTestConfig):
+        self.config = config
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.pid = os.getpid()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        import uvicorn
+
+        # The API modules read settings at import time
+        os.environ.setdefault("GENERATION_BACKEND", "simulator")
+        from core.api_server import NANozILLAAPI
+        from core.generation_backend import SimulatorBackend
+        from core.reactor_agent import ReactorAgent
+
+        api = NANozILLAAPI()
+        api.reactor_agent = ReactorAgent(backend=SimulatorBackend(**self.config.simulator))
+        if self.config.min_call_interval is not None:
+            api.reactor_agent.min_call_interval = self.config.min_call_interval
+
+        self._server = uvicorn.Server(uvicorn.Config(
+            api.app, host="127.0.0.1", port=self.port, log_level="warning"
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        _wait_until(lambda: self._server.started, timeout=30)
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+
+
+class SpawnedServer:
+    """Runs uvicorn with the simulator backend in a child process"""
+
+    rss_key = "server_rss"
+
+    def __init__(self, config: LoadTestConfig):
+        self.config = config
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.pid = None
+        self._process = None
+
+    def start(self):
+        env = dict(os.environ, GENERATION_BACKEND="simulator")
+        for key, value in self.config.simulator.items():
+            env[f"SIMULATOR_{key.upper()}"] = str(value)
+        if self.config.min_call_interval is not None:
+            env["MIN_CALL_INTERVAL"] = str(self.config.min_call_interval)
+
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "core.api_server:app",
+             "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+            env=env
+        )
+        self.pid = self._process.pid
+        _wait_until(lambda: _is_healthy(self.url), timeout=60)
+
+    def stop(self):
+        if self._process:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+class ExternalServer:
+    """An already running server addressed by URL"""
+
+    rss_key = "server_rss"
+
+    def __init__(self, config: LoadTestConfig):
+        self.url = config.url.rstrip("/")
+        self.pid = config.server_pid
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def _is_healthy(url: str) -> bool:
+    try:
+        return httpx.get(f"{url}/api/health", timeout=1.0).status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+def _wait_until(predicate, timeout: float):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise RuntimeError("Load test target did not start in time")
+        time.sleep(0.05)
+
+
+def create_target(config: LoadTestConfig):
+    """Create the server the load test drives"""
+    if config.url:
+        return ExternalServer(config)
+    if config.target == "spawn":
+        return SpawnedServer(config)
+    return InProcessServer(config)
+
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+
+class LoadGenerator:
+    """
+    Open-model load generator: arrivals follow the configured rate no matter
+    how many requests are still in flight
+    """
+
+    def __init__(self, config: LoadTestConfig, base_url: str):
+        self.config = config
+        self.base_url = base_url
+        self.rng = random.Random(config.seed)
+        self.results: List[Dict[str, Any]] = []
+        self.images: Dict[Tuple[int, str], bytes] = {}
+
+    def _image(self, size: int) -> bytes:
+        key = (size, self.config.input_format)
+        if key not in self.images:
+            self.images[key] = make_test_image(size, self.config.input_format, self.config.seed)
+        return self.images[key]
+
+    def _next_interarrival(self) -> float:
+        if self.config.arrival == "constant":
+            return 1.0 / self.config.rate
+        return self.rng.expovariate(self.config.rate)
+
+    def _plan_request(self) -> Dict[str, Any]:
+        endpoint = self.config.endpoint
+        if endpoint == "mixed":
+            endpoint = self.rng.choice(["colorize", "batch"])
+        return {
+            "endpoint": endpoint,
+            "image_size": self.rng.choice(self.config.image_sizes),
+            "output_format": self.rng.choice(self.config.output_formats),
+            "batch_size": self.rng.choice(self.config.batch_sizes) if endpoint == "batch" else 1,
+        }
+
+    async def run(self) -> float:
+        """Issue arrivals for the configured duration; returns elapsed seconds"""
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+        timeout = httpx.Timeout(self.config.request_timeout)
+        input_format = self.config.input_format
+        extension = "jpg" if input_format.upper() == "JPEG" else input_format.lower()
+        self._filename = f"loadtest.{extension}"
+
+        client = httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=timeout)
+        async with client:
+            for size in self.config.image_sizes:
+                self._image(size)
+
+            tasks = []
+            start = time.monotonic()
+            next_arrival = start
+            while True:
+                next_arrival += self._next_interarrival()
+                if next_arrival - start >= self.config.duration:
+                    break
+                await asyncio.sleep(max(next_arrival - time.monotonic(), 0))
+                tasks.append(asyncio.ensure_future(self._issue(client, self._plan_request())))
+
+            if tasks:
+                done, pending = await asyncio.wait(tasks, timeout=self.config.drain_timeout)
+                for task in pending:
+                    task.cancel()
+                for _ in pending:
+                    self.results.append(
+                        {"endpoint": "unknown", "ok": False, "error": "drain_timeout"}
+                    )
+
+            return time.monotonic() - start
+
+    async def _issue(self, client: httpx.AsyncClient, plan: Dict[str, Any]):
+        started = time.monotonic()
+        result = dict(plan)
+        try:
+            if plan["endpoint"] == "batch":
+                images_ok, images_failed = await self._batch(client, plan)
+                result["images_ok"] = images_ok
+                result["images_failed"] = images_failed
+                result["ok"] = images_failed == 0
+                if images_failed:
+                    result["error"] = "item_failed"
+            else:
+                await self._colorize(client, plan)
+                result["images_ok"] = 1
+                result["ok"] = True
+        except httpx.HTTPStatusError as e:
+            result["ok"] = False
+            result["error"] = f"http_{e.response.status_code}"
+        except httpx.TimeoutException:
+            result["ok"] = False
+            result["error"] = "timeout"
+        except (httpx.HTTPError, RuntimeError) as e:
+            result["ok"] = False
+            result["error"] = type(e).__name__
+        result["latency"] = time.monotonic() - started
+        self.results.append(result)
+
+    async def _colorize(self, client: httpx.AsyncClient, plan: Dict[str, Any]):
+        files = {"image": (self._filename, self._image(plan["image_size"]), self._content_type())}
+        data = {"style_prompt": self.config.style_prompt, "output_format": plan["output_format"]}
+        response = await client.post("/api/v1/colorize", files=files, data=data)
+        response.raise_for_status()
+
+    async def _batch(self, client: httpx.AsyncClient, plan: Dict[str, Any]) -> Tuple[int, int]:
+        image = self._image(plan["image_size"])
+        files = [("images", (self._filename, image, self._content_type()))
+                 for _ in range(plan["batch_size"])]
+        response = await client.post(
+            "/api/v1/colorize/batch", files=files, data={"style_prompt": self.config.style_prompt}
+        )
+        response.raise_for_status()
+        job_id = response.json()["data"]["job_id"]
+
+        while True:
+            response = await client.get(f"/api/v1/jobs/{job_id}")
+            response.raise_for_status()
+            job = response.json()["data"]
+            if job["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(self.config.job_poll_interval)
+
+        if job["status"] == "failed":
+            raise RuntimeError(job.get("error_message") or "batch job failed")
+        results = job.get("results", [])
+        succeeded = sum(1 for item in results if item.get("success"))
+        return succeeded, len(results) - succeeded
+
+    def _content_type(self) -> str:
+        return f"image/{self.config.input_format.lower()}"
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Aggregate per-request results into the JSON report"""
+        completed = [r for r in self.results if "latency" in r]
+        succeeded = [r for r in completed if r["ok"]]
+        errors: Dict[str, int] = {}
+        for r in self.results:
+            if not r["ok"]:
+                errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+        per_endpoint = {}
+        for endpoint in sorted({r["endpoint"] for r in completed}):
+            rows = [r for r in completed if r["endpoint"] == endpoint]
+            ok_rows = [r for r in rows if r["ok"]]
+            per_endpoint[endpoint] = {
+                "requests": len(rows),
+                "succeeded": len(ok_rows),
+                "error_rate": round(1 - len(ok_rows) / len(rows), 4),
+                "latency_ms": _latency_summary([r["latency"] for r in ok_rows]),
+            }
+
+        total = len(self.results)
+        images_ok = sum(r.get("images_ok", 0) for r in completed)
+        return {
+            "requests": {
+                "offered": total,
+                "completed": len(completed),
+                "succeeded": len(succeeded),
+                "failed": total - len(succeeded),
+            },
+            "offered_rate_rps": round(total / self.config.duration, 3),
+            "throughput_rps": round(len(completed) / elapsed, 3) if elapsed else None,
+            "goodput_rps": round(len(succeeded) / elapsed, 3) if elapsed else None,
+            "images_per_second": round(images_ok / elapsed, 3) if elapsed else None,
+            "latency_ms": _latency_summary([r["latency"] for r in succeeded]),
+            "error_rate": round((total - len(succeeded)) / total, 4) if total else 0.0,
+            "errors": errors,
+            "per_endpoint": per_endpoint,
+        }
+
+
+async def _run_async(config: LoadTestConfig, target) -> Dict[str, Any]:
+    sampler = RSSSampler(target.pid)
+    sampler.start()
+    generator = LoadGenerator(config, target.url)
+    elapsed = await generator.run()
+    report = generator.report(elapsed)
+    report["elapsed_s"] = round(elapsed, 3)
+    report[target.rss_key] = await sampler.stop()
+    return report
+
+
+def run_load_test(config: LoadTestConfig) -> Dict[str, Any]:
+    """
+    Run a load test end to end and return the JSON-serializable report
+
+    Args:
+        config: Load test parameters
+
+    Returns:
+        Report dictionary
+    """
+    from nanozilla import __version__
+
+    target = create_target(config)
+    target.start()
+    try:
+        started_at = datetime.utcnow().isoformat()
+        report = asyncio.run(_run_async(config, target))
+    finally:
+        target.stop()
+
+    return {
+        "version": __version__,
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "target": {"kind": type(target).__name__, "url": target.url},
+        "config": asdict(config),
+        **report,
+    }
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+
+def _csv(cast):
+    def parse(value):
+        return [cast(item) for item in value.split(",") if item.strip()]
+    return parse
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m nanozilla.loadtest",
+        description="Open-model load test for the NANozILLA Reactor API"
+    )
+    parser.add_argument("--rate", type=float, default=2.0, help="Mean arrivals per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--endpoint", choices=["colorize", "batch", "mixed"], default="colorize")
+    parser.add_argument("--image-sizes", type=_csv(int), default=[512], help="e.g. 256,1024,2048")
+    parser.add_argument("--batch-sizes", type=_csv(int), default=[4], help="e.g. 1,4,10")
+    parser.add_argument("--output-formats", type=_csv(str), default=["png"],
+                        help="e.g. png,jpeg,webp")
+    parser.add_argument("--input-format", default="JPEG", help="Encoding of uploaded images")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target", choices=["inprocess", "spawn"], default="inprocess",
+                        help="Run the simulated server in this process or in a child process")
+    parser.add_argument("--url", help="Drive an already running server instead")
+    parser.add_argument("--server-pid", type=int, help="PID of --url server for RSS sampling")
+    parser.add_argument("--min-call-interval", type=float,
+                        help="Override the agent rate limit interval (seconds)")
+    parser.add_argument("--sim-latency-distribution")
+    parser.add_argument("--sim-latency-mean", type=float)
+    parser.add_argument("--sim-latency-stddev", type=float)
+    parser.add_argument("--sim-error-rate-429", type=float)
+    parser.add_argument("--sim-error-rate-503", type=float)
+    parser.add_argument("--sim-timeout-rate", type=float)
+    parser.add_argument("--sim-max-rps", type=float)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser
+
+
+def config_from_args(args: argparse.Namespace) -> LoadTestConfig:
+    simulator = {
+        key[len("sim_"):]: value for key, value in vars(args).items()
+        if key.startswith("sim_") and value is not None
+    }
+    return LoadTestConfig(
+        rate=args.rate,
+        duration=args.duration,
+        arrival=args.arrival,
+        endpoint=args.endpoint,
+        image_sizes=args.image_sizes,
+        batch_sizes=args.batch_sizes,
+        output_formats=args.output_formats,
+        input_format=args.input_format.upper(),
+        style_prompt=args.prompt,
+        request_timeout=args.request_timeout,
+        drain_timeout=args.drain_timeout,
+        seed=args.seed,
+        target=args.target,
+        url=args.url,
+        server_pid=args.server_pid,
+        min_call_interval=args.min_call_interval,
+        simulator=simulator,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run_load_test(config_from_args(args))
+    output = json.dumps(report, indent=2, default=str)
+
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Client-side preprocessing that cuts upload bytes
+
+Applies the server's own resize and color-mode policy (imported from
+core.image_processor) before upload. The server repeats the same steps on
+what it receives; those steps are no-ops on an already-normalized image,
+so the colorized result is identical to uploading the original.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+import io
+import mimetypes
+import os
+
+from PIL import Image
+
+from core.image_processor import needs_resize, normalize_image
+
+
+@dataclass
+class PreparedUpload:
+    """What to send for one image, and how much smaller it is"""
+
+    path: str
+    filename: str
+    content_type: str
+    original_bytes: int
+    upload_bytes: int
+    resized: bool = False
+    data: Optional[bytes] = None  # None: stream the original file from disk
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.upload_bytes
+
+    def open(self) -> BinaryIO:
+        return io.BytesIO(self.data) if self.data is not None else open(self.path, 'rb')
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "content_type": self.content_type,
+            "original_bytes": self.original_bytes,
+            "upload_bytes": self.upload_bytes,
+            "bytes_saved": self.bytes_saved,
+            "resized": self.resized,
+        }
+
+
+def detect_mime_type(path: str) -> str:
+    """
+    MIME type from the file content, not its extension
+
+    Falls back to the extension only when Pillow cannot identify the file.
+    """
+    try:
+        with Image.open(path) as image:
+            return Image.MIME.get(image.format, "application/octet-stream")
+    except (OSError, ValueError):
+        return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def prepare_upload(image_path: str, preprocess: bool = True) -> PreparedUpload:
+    """
+    Decide what to upload for an image
+
+    With preprocess, images larger than the server's processing size are
+    downscaled and normalized exactly as the server would, then encoded
+    losslessly as PNG. The original is sent instead whenever it needs no
+    processing or is smaller than the processed encoding.
+    """
+    path = str(image_path)
+    original_bytes = os.path.getsize(path)
+    passthrough = PreparedUpload(path, Path(path).name, detect_mime_type(path),
+                                 original_bytes, original_bytes)
+    if not preprocess:
+        return passthrough
+
+    try:
+        with Image.open(path) as image:
+            if not needs_resize(image):
+                return passthrough
+            normalized = normalize_image(image, auto_resize=True)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return passthrough  # not an image Pillow can read; let the server reject it
+
+    buffer = io.BytesIO()
+    normalized.save(buffer, format='PNG')
+    data = buffer.getvalue()
+    if len(data) >= original_bytes:
+        return passthrough
+
+    return PreparedUpload(
+        path=path,
+        filename=Path(path).with_suffix('.png').name,
+        content_type='image/png',
+        original_bytes=original_bytes,
+        upload_bytes=len(data),
+        resized=True,
+        data=data,
+    )
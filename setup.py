@@ -9,7 +9,11 @@ setup(
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
     url="https://github.com/your-username/NanozillA",
-    packages=find_packages(),
+    packages=find_packages() + ["nanozilla"],
+    package_dir={"nanozilla": "sdk/python/nanozilla"},
+    entry_points={
+        "console_scripts": ["nanozilla=nanozilla.cli:main"],
+    },
     install_requires=[
         "streamlit==1.37.0",
         "google-genai==0.3.0",
@@ -20,6 +24,7 @@ setup(
         "fastapi==0.104.1",
         "uvicorn==0.24.0",
         "pydantic==2.5.0",
+        "httpx==0.25.2",
     ],
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -28,5 +33,5 @@ setup(
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.9",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
 )
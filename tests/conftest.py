@@ -2,8 +2,10 @@ import pytest
 import sys
 import os
 
-# Add project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add project root and the Python SDK to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "sdk", "python"))
 
 
 @pytest.fixture(autouse=True)
@@ -12,3 +14,16 @@ def setup_test_environment():
     # Add any global test setup here
     yield
     # Add any global test teardown here
+
+
+@pytest.fixture(autouse=True)
+def isolated_result_stores(tmp_path, monkeypatch):
+    """Keep the disk stores the code under test creates out of the working tree"""
+    from config.settings import settings
+    import core.result_store as result_store
+
+    for name in ("RESULT_STORE_DIR", "SESSION_RESULT_STORE_DIR", "MASTER_STORE_DIR",
+                 "DERIVATIVE_STORE_DIR"):
+        monkeypatch.setattr(settings, name, str(tmp_path / "stores" / name.lower()))
+    for name in ("_default_store", "_session_store", "_master_store", "_derivative_store"):
+        monkeypatch.setattr(result_store, name, None)
@@ -0,0 +1,197 @@
+import sys
+import os
+import json
+
+from fastapi.testclient import TestClient
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _client():
+    from core.api_server import NANozILLAAPI
+    return TestClient(NANozILLAAPI().app)
+
+
+def test_analyze_prompts_streams_ndjson():
+    """Test bulk prompt analysis returns one line per prompt plus a summary"""
+    prompts = ["vibrent aestetic tones", "", "warm vintage tones", "x" * 3000]
+    response = _client().post("/api/v1/prompts/analyze", json={"prompts": prompts * 50})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 201
+    assert [line["index"] for line in lines[:-1]] == list(range(200))
+
+    assert lines[0]["corrected_prompt"] == "vibrent aesthetic tones"
+    assert lines[0]["changed"] and len(lines[0]["issues"]) == 2
+    assert lines[1]["valid"] is False and "empty" in lines[1]["error"]
+    assert lines[2] == {"index": 2, "valid": True, "error": None,
+                        "corrected_prompt": "warm vintage tones", "changed": False, "issues": []}
+    assert lines[3]["valid"] is False
+    assert lines[-1]["summary"] == {"total": 200, "valid": 100, "invalid": 100, "with_issues": 50}
+
+
+def test_analyze_prompts_limits():
+    """Test empty and oversized requests and bad tenants are rejected"""
+    from config.settings import settings
+    client = _client()
+    too_many = ["warm tones"] * (settings.MAX_ANALYZE_PROMPTS + 1)
+    assert client.post("/api/v1/prompts/analyze", json={"prompts": []}).status_code == 422
+    assert client.post("/api/v1/prompts/analyze", json={"prompts": too_many}).status_code == 422
+    response = client.post("/api/v1/prompts/analyze",
+                           json={"prompts": ["warm tones"], "tenant": "../x"})
+    assert response.status_code == 400
+
+
+def test_backend_throttling_passes_retry_after():
+    """Test backend 429/503 errors keep their status and Retry-After"""
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import RateLimitError, ServiceUnavailableError
+
+    api = NANozILLAAPI()
+    error = api._to_http_exception(RateLimitError("slow down", retry_after=1.2), "Processing error")
+    assert error.status_code == 429
+    assert error.headers == {"Retry-After": "2"}
+
+    error = api._to_http_exception(ServiceUnavailableError("busy"), "Processing error")
+    assert (error.status_code, error.headers) == (503, None)
+
+
+def test_colorize_returns_raw_image_when_accepted():
+    """Test Accept: image/* returns the image bytes with metadata headers"""
+    import io
+    from PIL import Image
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+    from core.api_server import NANozILLAAPI
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    upload = io.BytesIO()
+    Image.effect_noise((64, 48), 40).convert('RGB').save(upload, format='PNG')
+
+    response = TestClient(api.app).post(
+        "/api/v1/colorize",
+        data={"style_prompt": "warm vintage tones", "output_format": "webp"},
+        files={"image": ("scan.png", upload.getvalue(), "image/png")},
+        headers={"Accept": "image/*"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["x-generation-id"].startswith("gen_")
+    assert Image.open(io.BytesIO(response.content)).size == (64, 48)
+
+
+def test_colorize_encoding_profiles():
+    """Test per-request encoding profiles reach model input and output; unknown ones fail"""
+    import io
+    from PIL import Image
+
+    from benchmarks.fixtures import make_upload
+
+    api = _simulated_api()
+    client = TestClient(api.app)
+    upload = make_upload(64, "PNG")
+
+    response = client.post(
+        "/api/v1/colorize",
+        data={"style_prompt": "warm vintage tones", "output_format": "jpeg",
+              "input_profile": "smallest", "output_profile": "balanced"},
+        files={"image": ("scan.png", upload, "image/png")}
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["image_info"]["model_input"]["profile"] == "smallest"
+    assert Image.open(io.BytesIO(bytes.fromhex(data["image_data"]))).info.get("progressive")
+
+    # The converted output is the cached variant the result URL serves
+    variant = client.get(data["result_url"], params={"format": "jpeg", "profile": "balanced"})
+    assert variant.content == bytes.fromhex(data["image_data"])
+    assert api.derivatives.stats == {"hits": 1, "misses": 1, "decodes": 1}
+
+    response = client.post(
+        "/api/v1/colorize",
+        data={"style_prompt": "warm vintage tones", "output_profile": "tiny"},
+        files={"image": ("scan.png", upload, "image/png")}
+    )
+    assert response.status_code == 400
+    assert "Unknown encoding profile" in response.text
+
+
+def _simulated_api():
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    return api
+
+
+def test_job_events_stream_per_item_progress():
+    """Test a batch job's SSE stream has one event per image and a final event"""
+    from benchmarks.fixtures import make_upload
+
+    api = _simulated_api()
+    client = TestClient(api.app)
+    response = client.post(
+        "/api/v1/colorize/batch",
+        data={"style_prompt": "warm vintage tones", "concurrent": "2"},
+        files=[("images", (f"scan_{i}.png", make_upload(64, "PNG"), "image/png")) for i in range(3)]
+    )
+    job_id = response.json()["data"]["job_id"]
+
+    with client.stream("GET", f"/api/v1/jobs/{job_id}/events") as stream:
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        body = "".join(stream.iter_text())
+    names = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+    assert names == ["item", "item", "item", "completed"]
+    assert '"image_data"' not in body
+
+    # Resuming after event 3 only replays the final event
+    resumed = client.get(f"/api/v1/jobs/{job_id}/events", headers={"Last-Event-ID": "3"}).text
+    assert "event: completed" in resumed and "event: item" not in resumed
+
+    status = client.get(f"/api/v1/jobs/{job_id}",
+                        params={"wait": 5, "include_results": "false"}).json()
+    assert status["data"]["status"] == "completed" and status["data"]["version"] == 4
+    assert "results" not in status["data"]
+    assert client.get("/api/v1/jobs/nope/events").status_code == 404
+
+
+def test_job_long_poll_returns_on_change():
+    """Test GET /jobs/{id}?wait= returns when the job changes, not at the timeout"""
+    import asyncio
+    import time
+    import httpx
+    from datetime import datetime
+    from core.api_server import NANozILLAAPI
+    from core.job_events import JobEventLog
+
+    api = NANozILLAAPI()
+    api.jobs["batch_x"] = {"job_id": "batch_x", "status": "processing", "progress": 0,
+                           "total_images": 2, "processed_images": 0, "results": [],
+                           "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+    api.job_events["batch_x"] = JobEventLog()
+
+    async def scenario():
+        async def finish_one():
+            await asyncio.sleep(0.05)
+            api.jobs["batch_x"]["processed_images"] = 1
+            api.job_events["batch_x"].publish("item", {"index": 0})
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            started = time.perf_counter()
+            response, _ = await asyncio.gather(
+                client.get("/api/v1/jobs/batch_x", params={"wait": 10}), finish_one()
+            )
+            return response.json(), time.perf_counter() - started
+
+    body, elapsed = asyncio.run(scenario())
+    assert elapsed < 5
+    assert body["data"]["processed_images"] == 1 and body["data"]["version"] == 1
@@ -0,0 +1,201 @@
+import sys
+import os
+import io
+import tarfile
+import threading
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_upload  # noqa: E402
+from core.archives import (  # noqa: E402
+    ArchiveError, iter_result_tar, iter_zip, safe_member_name, unpack_archive
+)
+from core.result_store import ResultStore  # noqa: E402
+
+
+def _tar(members, mode='w:gz'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def test_safe_member_name():
+    """Test traversal components are stripped and junk members skipped"""
+    assert safe_member_name("scans/1950/a.jpg") == "scans/1950/a.jpg"
+    assert safe_member_name("../../etc/passwd") == "etc/passwd"
+    assert safe_member_name("/abs\\win.png") == "abs/win.png"
+    assert safe_member_name("__MACOSX/._a.jpg") is None
+    assert safe_member_name("scans/.DS_Store") is None
+
+
+def test_unpack_tar_and_zip(tmp_path):
+    """Test both formats unpack to numbered files with clash-free output names"""
+    image = make_upload(64, "PNG")
+    members = [("a/scan.jpg", image), ("b/scan.jpg", image), ("a/scan.png", image),
+               (".hidden", b"x")]
+    zipped = io.BytesIO()
+    with zipfile.ZipFile(zipped, 'w') as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+
+    for name, data in (("upload.tgz", _tar(members)), ("upload.zip", zipped.getvalue())):
+        path = tmp_path / name
+        path.write_bytes(data)
+        entries, rejected = unpack_archive(str(path), str(tmp_path / f"in_{name}"), 10,
+                                           1 << 20, 1 << 30)
+        output_names = [entry.output_name for entry in entries]
+        assert output_names == ["a/scan.png", "b/scan.png", "a/scan_2.png"]
+        assert rejected == []
+        assert open(entries[0].path, 'rb').read() == image
+
+
+def test_unpack_enforces_limits(tmp_path):
+    """Test oversized entries are rejected and count and total caps abort"""
+    path = tmp_path / "upload.tar"
+    path.write_bytes(_tar([("big.png", b"x" * 5000), ("ok.png", b"y" * 100)], mode='w'))
+    entries, rejected = unpack_archive(str(path), str(tmp_path / "in1"), 10, 1000, 1 << 20)
+    assert [entry.name for entry in entries] == ["ok.png"]
+    assert rejected[0]["name"] == "big.png"
+
+    with pytest.raises(ArchiveError, match="more than 1 images"):
+        unpack_archive(str(path), str(tmp_path / "in2"), 1, 10000, 1 << 20)
+    with pytest.raises(ArchiveError, match="unpacks to more than"):
+        unpack_archive(str(path), str(tmp_path / "in3"), 10, 10000, 4000)
+
+    path.write_bytes(b"not an archive at all" * 40)
+    with pytest.raises(ArchiveError, match="Unsupported archive"):
+        unpack_archive(str(path), str(tmp_path / "in4"), 10, 1000, 1 << 20)
+
+
+def test_result_tar_streams_stored_blobs(tmp_path):
+    """Test the on-the-fly tar is a valid archive of the stored results"""
+    store = ResultStore(str(tmp_path / "store"))
+    keys = [store.put(b"first" * 300), store.put(b"second")]
+    assert store.put(b"second") == keys[1]
+
+    data = b"".join(iter_result_tar(store, [("x/one.png", keys[0]), ("two.png", keys[1])]))
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        assert archive.getnames() == ["x/one.png", "two.png"]
+        assert archive.extractfile("two.png").read() == b"second"
+
+
+def test_zip_is_streamed_member_by_member():
+    """Test the streamed zip is valid and yields output before the last member is consumed"""
+    consumed = []
+
+    def members():
+        for name in ("roll/a.png", "b.png"):
+            consumed.append(name)
+            yield name, name.encode() * 500
+
+    chunks = iter_zip(members())
+    first = next(chunks)
+    assert consumed == ["roll/a.png"]
+
+    with zipfile.ZipFile(io.BytesIO(first + b"".join(chunks))) as archive:
+        assert archive.namelist() == ["roll/a.png", "b.png"]
+        assert archive.read("b.png") == b"b.png" * 500
+        assert archive.testzip() is None
+
+
+def _archive_api(tmp_path, monkeypatch):
+    from config.settings import settings
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    monkeypatch.setattr(settings, "WORK_DIR", str(tmp_path / "work"))
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    api.result_store = ResultStore(str(tmp_path / "results"))
+    return api
+
+
+def test_archive_batch_round_trip(tmp_path, monkeypatch):
+    """Test a streamed tar upload is colorized and downloadable as a tar"""
+    from fastapi.testclient import TestClient
+
+    api = _archive_api(tmp_path, monkeypatch)
+    client = TestClient(api.app)
+    body = _tar([(f"roll/{i:02d}.jpg", make_upload(64, "PNG")) for i in range(12)]
+                + [("notes.txt", b"hello")])
+
+    response = client.post("/api/v1/colorize/archive", params={"style_prompt": "warm vintage tones",
+                                                               "concurrent": 4}, content=body)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["total_images"] == 13
+
+    job = client.get(f"/api/v1/jobs/{data['job_id']}").json()["data"]
+    assert job["status"] == "completed" and job["processed_images"] == 13
+    assert [result["index"] for result in job["results"]] == list(range(13))
+    assert sum(result["success"] for result in job["results"]) == 12
+    assert "image_data" not in job["results"][0]
+    assert not os.path.exists(tmp_path / "work" / data["job_id"])
+
+    download = client.get(data["result_url"])
+    assert download.headers["content-type"] == "application/x-tar"
+    with tarfile.open(fileobj=io.BytesIO(download.content)) as archive:
+        names = archive.getnames()
+        assert names == [f"roll/{i:02d}.png" for i in range(12)]
+        assert Image.open(archive.extractfile(names[0])).size == (64, 48)
+
+    assert client.post("/api/v1/colorize/archive", params={"style_prompt": "warm tones"},
+                       content=b"garbage" * 100).status_code == 400
+
+
+def test_manifest_batch_fetches_blobs(tmp_path, monkeypatch):
+    """Test manifest entries are fetched from their URLs and processed"""
+    from fastapi.testclient import TestClient
+    from config.settings import settings
+
+    monkeypatch.setattr(settings, "ALLOW_PRIVATE_URLS", True)
+
+    blobs = tmp_path / "blobs"
+    blobs.mkdir()
+    (blobs / "a.png").write_bytes(make_upload(64, "PNG"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                 partial(SimpleHTTPRequestHandler, directory=str(blobs)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        client = TestClient(_archive_api(tmp_path, monkeypatch).app)
+        response = client.post("/api/v1/colorize/manifest", json={
+            "style_prompt": "warm vintage tones",
+            "items": [{"url": f"{base}/a.png"}, {"url": f"{base}/missing.png", "name": "gone.png"}]
+        })
+        job_id = response.json()["data"]["job_id"]
+        results = client.get(f"/api/v1/jobs/{job_id}").json()["data"]["results"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    outcomes = [(result["output_name"], result["success"]) for result in results]
+    assert outcomes == [("a.png", True), ("gone.png", False)]
+    assert "HTTP 404" in results[1]["error"]
+
+
+def test_manifest_rejects_private_blob_urls(tmp_path, monkeypatch):
+    """Test manifest URLs on loopback or private addresses are refused up front"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(_archive_api(tmp_path, monkeypatch).app)
+    response = client.post("/api/v1/colorize/manifest", json={
+        "style_prompt": "warm vintage tones",
+        "items": [{"url": "http://169.254.169.254/latest/meta-data"}]
+    })
+    assert response.status_code == 400
+    assert "non-public address" in response.json()["error"]["message"]
@@ -0,0 +1,168 @@
+import sys
+import os
+import asyncio
+import io
+
+import httpx
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+OK_BODY = {"success": True, "data": {"generation_id": "gen_test"}, "metadata": {}}
+
+
+def _write_images(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"scan_{i}.png"
+        Image.effect_noise((64, 48), 40).convert('RGB').save(path, format='PNG')
+        paths.append(str(path))
+    return paths
+
+
+async def _collect(client, paths, **kwargs):
+    results = []
+    async with client:
+        async for result in client.colorize_many(paths, "warm vintage tones", **kwargs):
+            results.append(result)
+    return results
+
+
+def test_retry_after_is_honored(tmp_path):
+    """Test throttled requests are retried after the server's delay"""
+    from nanozilla import AsyncNanozillaClient
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"}, json={"success": False})
+        return httpx.Response(200, json=OK_BODY)
+
+    client = AsyncNanozillaClient("key", base_url="http://api.test/v1",
+                                  transport=httpx.MockTransport(handler))
+    results = asyncio.run(_collect(client, _write_images(tmp_path, 1)))
+
+    assert calls == ["/v1/colorize", "/v1/colorize"]
+    assert results[0].success and results[0].attempts == 2
+
+
+def test_colorize_many_bounds_concurrency(tmp_path):
+    """Test at most `concurrency` uploads are in flight and failures are yielded"""
+    from nanozilla import AsyncNanozillaClient
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json=OK_BODY)
+
+    client = AsyncNanozillaClient("key", base_url="http://api.test/v1",
+                                  transport=httpx.MockTransport(handler))
+    paths = _write_images(tmp_path, 12) + [str(tmp_path / "missing.png")]
+    results = asyncio.run(_collect(client, (path for path in paths), concurrency=3))
+
+    assert len(results) == 13
+    assert in_flight["max"] == 3
+    failed = [result for result in results if not result.success]
+    assert [result.path for result in failed] == [paths[-1]]
+
+
+def test_colorize_many_yields_one_result_per_input_on_unexpected_errors(tmp_path):
+    """Test an error outside the API/OS error types fails its item instead of killing a worker"""
+    from nanozilla import AsyncNanozillaClient
+
+    def handler(request):
+        raise RuntimeError("transport bug")
+
+    client = AsyncNanozillaClient("key", base_url="http://api.test/v1",
+                                  transport=httpx.MockTransport(handler))
+    paths = _write_images(tmp_path, 5)
+    results = asyncio.run(_collect(client, paths, concurrency=2))
+
+    assert sorted(result.path for result in results) == sorted(paths)
+    assert {result.error for result in results} == {"RuntimeError: transport bug"}
+
+
+def test_colorize_many_against_api(tmp_path):
+    """Test uploads stream through the real API with the simulator backend"""
+    from nanozilla import AsyncNanozillaClient
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    client = AsyncNanozillaClient("key", base_url="http://testserver/api/v1",
+                                  transport=httpx.ASGITransport(app=api.app))
+
+    results = asyncio.run(_collect(client, _write_images(tmp_path, 3), concurrency=2))
+    assert all(result.success for result in results)
+    generated = bytes.fromhex(results[0].data["data"]["image_data"])
+    assert Image.open(io.BytesIO(generated)).size == (64, 48)
+
+
+def test_job_events_and_wait_for_job_against_api(tmp_path):
+    """Test the SDK follows a batch job over SSE and long-poll"""
+    from nanozilla import AsyncNanozillaClient
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    paths = _write_images(tmp_path, 2)
+
+    async def scenario():
+        async with AsyncNanozillaClient("key", base_url="http://testserver/api/v1",
+                                        transport=httpx.ASGITransport(app=api.app)) as client:
+            submitted = await client.colorize_batch(paths, "warm vintage tones")
+            job_id = submitted["data"]["job_id"]
+            events = [event async for event in client.iter_job_events(job_id)]
+            final = await client.wait_for_job(job_id, timeout=5)
+            return events, final
+
+    events, final = asyncio.run(scenario())
+    assert [event.event for event in events] == ["item", "item", "completed"]
+    assert events[-1].data["succeeded"] == 2
+    assert final["data"]["status"] == "completed" and len(final["data"]["results"]) == 2
+
+
+def test_archive_upload_and_download(tmp_path, monkeypatch):
+    """Test an archive job is streamed up and its results tar streamed down"""
+    import tarfile
+    from nanozilla import AsyncNanozillaClient
+    from config.settings import settings
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+    from core.result_store import ResultStore
+
+    monkeypatch.setattr(settings, "WORK_DIR", str(tmp_path / "work"))
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    api.result_store = ResultStore(str(tmp_path / "results"))
+
+    archive_path = tmp_path / "scans.tar"
+    with tarfile.open(archive_path, "w") as archive:
+        for path in _write_images(tmp_path, 3):
+            archive.add(path, arcname=os.path.basename(path))
+
+    async def scenario():
+        async with AsyncNanozillaClient("key", base_url="http://testserver/api/v1",
+                                        transport=httpx.ASGITransport(app=api.app)) as client:
+            job = await client.colorize_archive(str(archive_path), "warm vintage tones")
+            await client.wait_for_job(job["data"]["job_id"], timeout=5)
+            return await client.download_job_results(job["data"]["job_id"],
+                                                     str(tmp_path / "out.tar"))
+
+    size = asyncio.run(scenario())
+    assert size == os.path.getsize(tmp_path / "out.tar")
+    with tarfile.open(tmp_path / "out.tar") as archive:
+        assert archive.getnames() == ["scan_0.png", "scan_1.png", "scan_2.png"]
@@ -0,0 +1,66 @@
+import sys
+import os
+import io
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_fixtures_are_deterministic():
+    """Test synthetic fixtures do not change between runs"""
+    from benchmarks.fixtures import make_prompt_corpus, make_upload
+    assert make_upload(96, "PNG") == make_upload(96, "PNG")
+    assert Image.open(io.BytesIO(make_upload(96, "WEBP"))).size == (96, 72)
+    assert make_prompt_corpus(20, seed=1) == make_prompt_corpus(20, seed=1)
+
+
+def test_suite_runs_offline(tmp_path):
+    """Test every benchmark in a downsized suite runs and is written as JSON"""
+    from benchmarks.runner import load_baseline, run_suite, write_baseline
+    from benchmarks.suite import build_suite
+
+    suite = build_suite(image_sizes=(64,), prompt_count=5, vocabulary_size=500, prompt_chars=200)
+    document = run_suite(suite, rounds=2, min_time=0)
+    assert set(document["results"]) == set(suite)
+
+    path = str(tmp_path / "baseline.json")
+    write_baseline(document, path)
+    assert load_baseline(path)["results"] == document["results"]
+
+
+def test_compare_flags_regressions():
+    """Test compare mode flags slowdowns beyond the threshold"""
+    from benchmarks.runner import compare_results, format_comparison
+
+    def doc(**timings):
+        return {"schema": 1, "results": {k: {"median_s": v} for k, v in timings.items()}}
+
+    comparison = compare_results(
+        doc(fast=1.0, steady=1.0, gone=1.0),
+        doc(fast=0.5, steady=1.4, added=1.0),
+        threshold=0.25
+    )
+    statuses = {row["name"]: row["status"] for row in comparison["rows"]}
+    assert statuses == {"fast": "improvement", "steady": "regression", "added": "new"}
+    assert comparison["regressions"] == ["steady"]
+    assert comparison["missing"] == ["gone"]
+    assert "1 regression(s)" in format_comparison(comparison)
+
+
+def test_quality_metrics():
+    """Test PSNR/SSIM are perfect for identical planes and drop with noise"""
+    import numpy as np
+    from benchmarks.quality import psnr, run_quality, ssim
+
+    rng = np.random.default_rng(0)
+    plane = rng.integers(0, 256, size=(40, 50)).astype(np.uint8)
+    noisy = np.clip(plane + rng.normal(0, 20, plane.shape), 0, 255).astype(np.uint8)
+    assert psnr(plane, plane) == float("inf")
+    assert abs(ssim(plane, plane) - 1.0) < 1e-9
+    assert 15 < psnr(plane, noisy) < 30 and ssim(plane, noisy) < 0.99
+
+    results = run_quality(sizes=(128,), proxy_dimensions=(32, 128))
+    smallest = results["128-chroma-32"]
+    assert smallest["upload_bytes"] < smallest["direct_upload_bytes"]
+    assert results["128-chroma-128"]["chroma_psnr"] > results["128-chroma-32"]["chroma_psnr"]
@@ -0,0 +1,98 @@
+import sys
+import os
+import asyncio
+import json
+
+import httpx
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_api_client():
+    from nanozilla import AsyncNanozillaClient
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    return AsyncNanozillaClient("key", base_url="http://testserver/api/v1",
+                                transport=httpx.ASGITransport(app=api.app))
+
+
+def _run(argv):
+    from nanozilla.cli import build_parser, run_colorize
+    args = build_parser().parse_args(argv)
+    return asyncio.run(run_colorize(args, client=_make_api_client()))
+
+
+def test_cli_resumes_from_manifest(tmp_path):
+    """Test a re-run skips completed items and redoes changed ones"""
+    scans = tmp_path / "scans"
+    (scans / "box1").mkdir(parents=True)
+    for i, name in enumerate(["a.png", "b.jpg", "box1/c.png"]):
+        Image.effect_noise((64, 48), 30 + i).convert('RGB').save(scans / name)
+    (scans / "notes.txt").write_text("not an image")
+
+    output = tmp_path / "out"
+
+    def argv(prompt="warm vintage tones"):
+        return ["colorize", str(scans), "-o", str(output), "--prompt", prompt,
+                "--format", "webp", "--quiet", "--concurrency", "2"]
+
+    first = _run(argv())
+    assert (first["completed"], first["skipped"], first["failed"]) == (3, 0, 0)
+    assert Image.open(output / "box1" / "c.webp").format == "WEBP"
+    entries = [json.loads(line) for line in (output / "manifest.jsonl").read_text().splitlines()]
+    assert len(entries) == 3 and all(len(entry["sha256"]) == 64 for entry in entries)
+    assert not list(output.rglob("*.part"))
+
+    # Torn line from a crash, one changed input
+    with open(output / "manifest.jsonl", "a") as manifest:
+        manifest.write('{"sha256": "trunc')
+    Image.effect_noise((64, 48), 90).convert('RGB').save(scans / "a.png")
+
+    second = _run(argv())
+    assert (second["completed"], second["skipped"], second["failed"]) == (1, 2, 0)
+
+    # New parameters are new work
+    third = _run(argv("cold blue tones"))
+    assert third["completed"] == 3
+
+
+def test_cli_reports_missing_inputs(tmp_path):
+    """Test unreadable list entries count as failures"""
+    listing = tmp_path / "list.txt"
+    listing.write_text(f"# scans\n{tmp_path / 'missing.png'}\n")
+    summary = _run(["colorize", "--from-list", str(listing), "-o", str(tmp_path / "out"),
+                    "--prompt", "warm vintage tones", "--quiet"])
+    assert (summary["total"], summary["failed"]) == (1, 1)
+
+
+def test_progress_eta():
+    """Test throughput and ETA are derived from processed items"""
+    import io
+    from nanozilla.cli import Progress
+    progress = Progress(10, stream=io.StringIO())
+    progress.started -= 2.0
+    progress.completed, progress.skipped = 4, 2
+    snap = progress.snapshot()
+    assert snap["images_per_s"] == 2.0
+    assert snap["eta_s"] == 2.0
+    assert "6/10 done" in progress.render()
+
+
+def test_progress_total_unknown_until_counted():
+    """Test progress renders without a total while the inputs are still being counted"""
+    import io
+    from nanozilla.cli import Progress
+    progress = Progress(stream=io.StringIO())
+    progress.started -= 2.0
+    progress.completed = 4
+    assert progress.snapshot()["eta_s"] is None
+    assert "4/? done" in progress.render()
+    progress.total = 8
+    assert progress.snapshot()["eta_s"] == 2.0
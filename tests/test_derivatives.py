@@ -0,0 +1,117 @@
+import sys
+import os
+import io
+
+import pytest
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import encode_image, make_image  # noqa: E402
+from core.derivatives import DerivativeCache, VariantSpec, parse_variant_spec  # noqa: E402
+from core.result_store import BoundedResultStore, ResultStore  # noqa: E402
+
+
+def _cache(tmp_path, max_bytes=1 << 30):
+    masters = ResultStore(str(tmp_path / "masters"))
+    variants = BoundedResultStore(str(tmp_path / "variants"), max_bytes)
+    return masters, DerivativeCache([masters], variants)
+
+
+def test_parse_variant_spec():
+    """Test specs normalize format and profile and reject junk"""
+    assert parse_variant_spec("webp:512") == VariantSpec("WEBP", 512, "balanced")
+    assert parse_variant_spec("JPG:full:fast") == VariantSpec("JPEG", None, "fast")
+    assert parse_variant_spec("png", default_profile="smallest").profile == "smallest"
+    for text in ("gif:100", "webp:big", "webp:8", "png:64:tiny", "a:b:c:d", ""):
+        with pytest.raises(ValueError):
+            parse_variant_spec(text)
+
+
+def test_variants_share_one_decode_and_are_cached(tmp_path):
+    """Test missing variants share one decode, repeats hit the cache, JPEG masters decode reduced"""
+    masters, derivatives = _cache(tmp_path)
+    key = masters.put(encode_image(make_image(800, 600, grayscale=False), "JPEG"))
+    specs = [parse_variant_spec(text) for text in ("webp:256", "jpeg:64:fast", "png:400")]
+
+    variants = derivatives.get_many(key, specs)
+    sizes = [Image.open(io.BytesIO(variants[spec])).size for spec in specs]
+    assert sizes == [(256, 192), (64, 48), (400, 300)]
+    assert Image.open(io.BytesIO(variants[specs[0]])).format == "WEBP"
+    assert derivatives.stats == {"hits": 0, "misses": 3, "decodes": 1}
+
+    assert derivatives.get(key, specs[1]) == variants[specs[1]]
+    assert derivatives.stats == {"hits": 1, "misses": 3, "decodes": 1}
+
+    with pytest.raises(KeyError):
+        derivatives.get("0" * 64, specs[0])
+
+
+def test_evicted_variants_are_rendered_again(tmp_path):
+    """Test the variant store's byte budget evicts old variants without losing them"""
+    masters, derivatives = _cache(tmp_path, max_bytes=1)
+    key = masters.put(encode_image(make_image(300, 200, grayscale=False), "PNG"))
+    first, second = parse_variant_spec("png:100"), parse_variant_spec("png:50")
+
+    data = derivatives.get(key, first)
+    derivatives.get(key, second)
+    assert derivatives.cache.evictions == 1
+    assert derivatives.get(key, first) == data
+    assert derivatives.stats["decodes"] == 3
+
+
+def test_small_variants_of_png_masters_decode_a_cached_proxy(tmp_path, monkeypatch):
+    """Test PNG masters, which draft() cannot reduce, decode in full only once for small variants"""
+    masters, derivatives = _cache(tmp_path)
+    key = masters.put(encode_image(make_image(2048, 1536, grayscale=False), "PNG"))
+    derivatives.get(key, parse_variant_spec("webp:256"))
+
+    def refuse(key):
+        raise AssertionError("master decoded again")
+
+    monkeypatch.setattr(masters, "open", refuse)
+    variant = derivatives.get(key, parse_variant_spec("png:512"))
+    assert Image.open(io.BytesIO(variant)).size == (512, 384)
+    with pytest.raises(AssertionError):
+        derivatives.get(key, parse_variant_spec("png:2000"))
+
+
+def test_results_endpoint_serves_cached_variants(tmp_path):
+    """Test a colorized result is served as stored and as lazily rendered variants"""
+    from fastapi.testclient import TestClient
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    client = TestClient(api.app)
+
+    response = client.post(
+        "/api/v1/colorize",
+        data={"style_prompt": "warm vintage tones"},
+        files={"image": ("scan.png", encode_image(make_image(640, 480), "PNG"), "image/png")}
+    )
+    data = response.json()["data"]
+    master = client.get(data["result_url"])
+    assert master.content == bytes.fromhex(data["image_data"])
+
+    thumbnail = client.get(data["result_url"], params={"format": "webp", "max_dim": 128})
+    assert thumbnail.headers["content-type"] == "image/webp"
+    assert thumbnail.headers["cache-control"].endswith("immutable")
+    assert Image.open(io.BytesIO(thumbnail.content)).size == (128, 96)
+    assert client.get(data["result_url"], params={"format": "webp", "max_dim": 128},
+                      headers={"If-None-Match": thumbnail.headers["etag"]}).status_code == 304
+
+    prepared = client.get(f"{data['result_url']}/variants",
+                          params={"spec": ["jpeg:256", "webp:128"]}).json()
+    urls = [variant["url"] for variant in prepared["data"]["variants"]]
+    assert api.derivatives.stats == {"hits": 1, "misses": 2, "decodes": 2}
+    assert Image.open(io.BytesIO(client.get(urls[0]).content)).size == (256, 192)
+    assert client.get(urls[1]).content == thumbnail.content
+
+    assert client.get(data["result_url"], params={"format": "gif"}).status_code == 400
+    assert client.get(f"/api/v1/results/{'0' * 64}").status_code == 404
+    assert client.get("/api/v1/results/not-a-key", params={"max_dim": 64}).status_code == 404
@@ -0,0 +1,91 @@
+import pytest
+import sys
+import os
+import io
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_upload  # noqa: E402
+
+
+def test_create_simulator_backend():
+    """Test factory selects the simulator backend by name"""
+    from core.generation_backend import (
+        GenerationBackend, SimulatorBackend, create_generation_backend
+    )
+    backend = create_generation_backend("simulator", latency_mean=0)
+    assert isinstance(backend, SimulatorBackend)
+    assert isinstance(backend, GenerationBackend)
+
+
+def test_create_unknown_backend():
+    """Test factory rejects unknown backends"""
+    from core.generation_backend import create_generation_backend
+    with pytest.raises(ValueError, match="Unknown generation backend"):
+        create_generation_backend("nope")
+
+
+def test_simulator_is_deterministic():
+    """Test simulator output only depends on image and prompt"""
+    from core.generation_backend import SimulatorBackend
+    backend = SimulatorBackend(latency_mean=0)
+    image_bytes = make_upload(64, "PNG")
+
+    first = backend.generate(image_bytes, "vintage sepia tones", "high", "block_some")
+    second = backend.generate(image_bytes, "vintage sepia tones", "high", "block_some")
+    other = backend.generate(image_bytes, "cyberpunk neon aesthetic", "high", "block_some")
+
+    assert first == second
+    assert first != other
+    assert Image.open(io.BytesIO(first)).size == (64, 48)
+
+
+def test_simulator_error_injection():
+    """Test injected errors carry HTTP status codes"""
+    from core.generation_backend import (
+        BackendTimeoutError, RateLimitError, ServiceUnavailableError, SimulatorBackend
+    )
+    image_bytes = make_upload(64, "PNG")
+
+    with pytest.raises(RateLimitError) as exc_info:
+        SimulatorBackend(latency_mean=0, error_rate_429=1.0).generate(
+            image_bytes, "prompt", "high", "block_some")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.retry_after == 1.0
+
+    with pytest.raises(ServiceUnavailableError):
+        SimulatorBackend(latency_mean=0, error_rate_503=1.0).generate(
+            image_bytes, "prompt", "high", "block_some")
+
+    with pytest.raises(BackendTimeoutError):
+        SimulatorBackend(latency_mean=0, timeout_rate=1.0, timeout_seconds=0).generate(
+            image_bytes, "prompt", "high", "block_some")
+
+
+def test_simulator_latency_and_throughput_cap():
+    """Test latency samples and throughput cap go through the sleep hook"""
+    from core.generation_backend import SimulatorBackend
+    sleeps = []
+    backend = SimulatorBackend(
+        latency_distribution="constant", latency_mean=0.25, max_rps=1000,
+        sleep=sleeps.append
+    )
+    backend.generate(make_upload(64, "PNG"), "prompt", "high", "block_some")
+    assert 0.25 in sleeps
+    assert backend.call_count == 1
+
+
+def test_reactor_agent_with_simulator_backend():
+    """Test ReactorAgent runs end to end on the simulator backend"""
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    agent.min_call_interval = 0
+    result = agent.execute_colorization(make_upload(64, "PNG"), "warm vintage colors",
+                                        retry_attempts=1)
+
+    assert Image.open(io.BytesIO(result)).mode == 'RGB'
+    assert agent.get_stats()["backend"] == "simulator"
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_upload  # noqa: E402
+from core.generation_backend import SimulatorBackend  # noqa: E402
+from core.generation_tasks import GenerationExecutor  # noqa: E402
+from core.reactor_agent import ReactorAgent  # noqa: E402
+
+
+def _wait(task, timeout=10):
+    deadline = time.time() + timeout
+    while not task.done and time.time() < deadline:
+        time.sleep(0.01)
+    assert task.done
+
+
+def test_generation_reports_real_stages():
+    """Test a background generation records its stages and result"""
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    agent.min_call_interval = 0.2
+    executor = GenerationExecutor(agent, max_workers=2)
+
+    try:
+        image_bytes = make_upload(64, "PNG")
+        tasks = [executor.submit(image_bytes, "warm vintage tones", {"width": 64, "height": 48})
+                 for _ in range(2)]
+        for task in tasks:
+            _wait(task)
+    finally:
+        executor.shutdown(wait=True)
+
+    assert all(task.result and task.error is None for task in tasks)
+    stages = [[event["stage"] for event in task.events] for task in tasks]
+    assert ["preprocess", "queued", "api_call", "done"] in stages
+    # The second call had to wait for the shared rate limit
+    assert ["preprocess", "queued", "rate_limit_wait", "api_call", "done"] in stages
+
+
+def test_generation_failure_reports_retry_and_error():
+    """Test retries and the final failure are reported, with the traceback kept"""
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0, error_rate_503=1.0))
+    agent.min_call_interval = 0
+    agent._wait_before_retry = lambda attempt: None
+    executor = GenerationExecutor(agent, max_workers=1)
+
+    try:
+        task = executor.submit(make_upload(64, "PNG"), "warm vintage tones", retry_attempts=2)
+        _wait(task)
+    finally:
+        executor.shutdown(wait=True)
+
+    assert [event["stage"] for event in task.events] == [
+        "preprocess", "queued", "api_call", "retry", "api_call", "failed"
+    ]
+    assert task.result is None and task.error
+    assert "Traceback" in task.error_details
@@ -35,3 +35,122 @@ def test_supported_formats():
     processor = ImageProcessor()
     expected_formats = ['JPEG', 'JPG', 'PNG', 'WEBP', 'BMP']
     assert processor.SUPPORTED_FORMATS == expected_formats
+
+
+def test_prepare_upload_derives_preview_once():
+    """Test prepared uploads match process_uploaded_image and carry a downscaled preview"""
+    import io
+    from PIL import Image
+    from benchmarks.fixtures import FixtureUpload, make_upload
+    from core.image_processor import DISPLAY_MAX_DIMENSION, ImageProcessor, content_digest
+
+    processor = ImageProcessor()
+    data = make_upload(2000, "JPEG")
+    upload = FixtureUpload(data, "scan.jpg", "image/jpeg")
+
+    prepared = processor.prepare_upload(upload)
+    upload.seek(0)
+    image_bytes, image_info = processor.process_uploaded_image(upload)
+    assert prepared.image_bytes == image_bytes
+    assert prepared.image_info.keys() == image_info.keys()
+    assert max(Image.open(io.BytesIO(prepared.display_bytes)).size) == DISPLAY_MAX_DIMENSION
+    assert content_digest(upload) == content_digest(FixtureUpload(data, "copy.jpg", "image/jpeg"))
+
+    generated = processor.prepare_generated(prepared.image_bytes)
+    assert generated.image_bytes is prepared.image_bytes
+    assert generated.image_info["format"] == "PNG"
+
+
+def test_chroma_proxy_recomposes_at_full_resolution():
+    """Test the proxy is downscaled and the recomposed image keeps the original's size and luma"""
+    import io
+    import numpy as np
+    from PIL import Image
+    from benchmarks.fixtures import encode_image, make_image
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    original = encode_image(make_image(800, 600), "PNG")
+    proxy = Image.open(io.BytesIO(processor.make_chroma_proxy(original, 200)))
+    assert proxy.size == (200, 150)
+
+    tinted = Image.new('RGB', proxy.size, (160, 128, 100))
+    recomposed_bytes = processor.recompose_chroma(original, encode_image(tinted, "PNG"))
+    recomposed = Image.open(io.BytesIO(recomposed_bytes))
+    assert recomposed.size == (800, 600)
+
+    luma = np.asarray(Image.open(io.BytesIO(original)).convert('L'), dtype=np.int16)
+    assert np.abs(np.asarray(recomposed.convert('L'), dtype=np.int16) - luma).mean() < 1
+    cb, cr = np.asarray(recomposed.convert('YCbCr'))[..., 1:].reshape(-1, 2).mean(axis=0)
+    assert cb < 120 and cr > 136
+
+
+def test_grayscale_inputs_are_sent_as_one_channel():
+    """Test grayscale detection and the single-channel model input for both encodings"""
+    import io
+    from PIL import Image
+    from benchmarks.fixtures import FixtureUpload, make_image, make_upload
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    assert processor._analyze_colors(make_image(64, 48))['is_grayscale']
+    assert not processor._analyze_colors(make_image(64, 48, grayscale=False))['is_grayscale']
+    assert not processor._analyze_colors(Image.new('RGB', (8, 8), (90, 90, 120)))['is_grayscale']
+
+    gray_jpeg = FixtureUpload(make_upload(256, "JPEG"), "scan.jpg", "image/jpeg")
+    image_bytes, image_info = processor.process_uploaded_image(gray_jpeg, validate_colors=True)
+    assert image_info['color_analysis']['is_grayscale']
+    assert Image.open(io.BytesIO(image_bytes)).mode == 'L'
+    assert image_info['model_input']['mode'] == 'L'
+    assert image_info['model_input']['bytes'] == len(image_bytes)
+    assert image_info['model_input']['encode_seconds'] >= 0 and image_info['load_seconds'] >= 0
+
+    gray_jpeg.seek(0)
+    lossy = ImageProcessor(lossy_input=True)
+    lossy_bytes, lossy_info = lossy.process_uploaded_image(gray_jpeg, validate_colors=True)
+    assert lossy_info['model_input']['format'] == 'JPEG' and len(lossy_bytes) < len(image_bytes)
+
+    color = FixtureUpload(make_upload(256, "PNG", grayscale=False), "color.png", "image/png")
+    color_bytes, color_info = lossy.process_uploaded_image(color, validate_colors=True)
+    assert Image.open(io.BytesIO(color_bytes)).mode == 'RGB'
+    assert color_info['model_input']['format'] == 'PNG'
+
+
+def test_encoding_profiles_trade_time_for_bytes():
+    """Test profiles map to encoder options and convert_format applies them"""
+    import io
+    import pytest
+    from PIL import Image
+    from benchmarks.fixtures import encode_image, make_image
+    from core.image_processor import ImageProcessor, get_encoding_profile
+
+    assert get_encoding_profile("FAST").save_options('PNG') == {'compress_level': 1}
+    assert get_encoding_profile("balanced").save_options('JPEG')['progressive']
+    assert get_encoding_profile("smallest").save_options('WEBP')['method'] == 6
+    assert get_encoding_profile("balanced").save_options('BMP') == {}
+    with pytest.raises(ValueError, match="Unknown encoding profile"):
+        get_encoding_profile("tiny")
+    with pytest.raises(ValueError):
+        ImageProcessor(output_profile="tiny")
+
+    processor = ImageProcessor()
+    master = encode_image(make_image(256, 192, grayscale=False), "PNG")
+    fast, fast_info = processor.convert_format(master, "PNG", profile="fast")
+    smallest, _ = processor.convert_format(master, "PNG", profile="smallest")
+    assert fast_info['profile'] == "fast"
+    assert Image.open(io.BytesIO(fast)).tobytes() == Image.open(io.BytesIO(smallest)).tobytes()
+    assert processor.convert_format(master, "JPG")[1]['profile'] == "balanced"
+
+
+def test_smallest_profile_is_smallest_on_benchmark_fixture():
+    """Test "smallest" never produces more bytes than "fast" or "balanced", per format"""
+    from benchmarks.fixtures import make_image
+    from core.image_processor import ENCODING_PROFILES
+
+    color = make_image(512, 384, grayscale=False)
+    for image in (color, make_image(512, 384).convert("L")):
+        for image_format in ("PNG", "JPEG", "WEBP"):
+            sizes = {name: len(profile.encode(image, image_format))
+                     for name, profile in ENCODING_PROFILES.items()}
+            assert sizes["smallest"] <= sizes["balanced"], (image.mode, image_format, sizes)
+            assert sizes["smallest"] <= sizes["fast"], (image.mode, image_format, sizes)
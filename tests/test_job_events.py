@@ -0,0 +1,54 @@
+import sys
+import os
+import asyncio
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.job_events import JobEventLog, format_sse  # noqa: E402
+
+
+def test_wait_wakes_every_waiter_on_publish():
+    """Test waiters return as soon as an event is published, not at the timeout"""
+    async def scenario():
+        log = JobEventLog()
+        waiters = [asyncio.create_task(log.wait(0, timeout=5)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        log.publish("item", {"index": 0})
+        woke = await asyncio.gather(*waiters)
+        return woke, time.perf_counter() - started, await log.wait(1, timeout=0.01)
+
+    woke, elapsed, timed_out = asyncio.run(scenario())
+    assert woke == [True, True, True]
+    assert elapsed < 1
+    assert timed_out is False
+
+
+def test_closed_log_never_blocks():
+    """Test waiting on a finished job returns immediately"""
+    async def scenario():
+        log = JobEventLog()
+        log.publish("item", {"index": 0})
+        log.publish("completed", {"status": "completed"}, final=True)
+        return await log.wait(2, timeout=5), [event["id"] for event in log.since(1)]
+
+    assert asyncio.run(scenario()) == (True, [2])
+
+
+def test_sse_framing_round_trips_through_sdk_decoder():
+    """Test the server's SSE framing decodes back into SDK events"""
+    from nanozilla.events import SSEDecoder
+
+    log = JobEventLog()
+    stream = b"retry: 3000\n\n" + format_sse(log.publish("item", {"index": 4, "success": True})) \
+        + format_sse(comment="keep-alive") \
+        + format_sse(log.publish("completed", {"status": "completed"}, final=True))
+
+    decoder = SSEDecoder()
+    events = [event for line in stream.decode().split("\n") if (event := decoder.feed(line))]
+    assert [(event.id, event.event, event.final) for event in events] == [
+        (1, "item", False), (2, "completed", True)
+    ]
+    assert events[0].data == {"index": 4, "success": True}
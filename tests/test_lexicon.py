@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _build(tmp_path, vocabulary, name="test.nzlx"):
+    from utils.lexicon import Lexicon, build_lexicon
+    path = str(tmp_path / name)
+    build_lexicon(vocabulary, path)
+    return Lexicon(path)
+
+
+def test_lexicon_matches_in_memory_index(tmp_path):
+    """Test the mapped lexicon gives the same lookups as SymSpellIndex"""
+    from benchmarks.fixtures import make_long_prompt, make_vocabulary
+    from utils.spell_checker import SymSpellIndex
+
+    vocabulary = make_vocabulary(3000)
+    lexicon = _build(tmp_path, vocabulary)
+    index = SymSpellIndex(vocabulary)
+
+    assert len(lexicon) == len(index)
+    for word in make_long_prompt(vocabulary, 800, typo_rate=0.7).split():
+        assert (word in lexicon) == (word in index)
+        assert lexicon.lookup(word) == index.lookup(word)
+    lexicon.close()
+
+
+def test_read_word_list_and_cli(tmp_path):
+    """Test word lists are parsed and compiled by the CLI"""
+    from utils.lexicon import Lexicon, main, read_word_list
+
+    word_list = tmp_path / "terms.txt"
+    word_list.write_text("# comment\nSepia 10\nsepia 5\n\number\n", encoding="utf-8")
+    assert read_word_list(str(word_list)) == {"sepia": 15, "umber": 1}
+
+    output = tmp_path / "out.nzlx"
+    assert main(["build", str(output), str(word_list)]) == 0
+    lexicon = Lexicon(str(output))
+    assert lexicon.frequency("SEPIA") == 15
+    assert "ochre" not in lexicon
+    with pytest.raises(TypeError):
+        lexicon.add("ochre")
+    lexicon.close()
+
+
+def test_tenant_lexicon_chained_over_base(tmp_path, monkeypatch):
+    """Test tenant terms are suggested alongside the base lexicon"""
+    from config.settings import settings
+    from utils.lexicon import build_lexicon, create_lexicon_index, tenant_lexicon_path
+    from utils.spell_checker import SpellChecker
+
+    monkeypatch.setattr(settings, "LEXICON_PATH", str(tmp_path / "base.nzlx"))
+    monkeypatch.setattr(settings, "TENANT_LEXICON_DIR", str(tmp_path / "tenants"))
+    build_lexicon({"watercolor": 10, "vintage": 10}, settings.LEXICON_PATH)
+    build_lexicon({"zillatone": 5}, tenant_lexicon_path("acme"))
+
+    checker = SpellChecker(index=create_lexicon_index("acme"))
+    _, issues = checker.check_prompt("zillatome watercolr vintage")
+    assert [issue["suggestions"] for issue in issues] == [["zillatone"], ["watercolor"]]
+
+    with pytest.raises(ValueError):
+        tenant_lexicon_path("../etc")
+
+
+def test_chain_merges_frequencies_before_truncating():
+    """Test a term below the limit in each index still wins once its frequencies are summed"""
+    from utils.lexicon import LexiconChain
+    from utils.spell_checker import SymSpellIndex
+
+    chain = LexiconChain([
+        SymSpellIndex({"tona": 5, "tonc": 4}), SymSpellIndex({"tonb": 5, "tonc": 4})
+    ])
+    assert [(s.term, s.frequency) for s in chain.lookup("tonx", limit=1)] == [("tonc", 8)]
+
+
+def test_base_lexicon_is_built_from_sources_when_missing(tmp_path, monkeypatch, caplog):
+    """Test a missing base lexicon is compiled from LEXICON_SOURCES, or a warning logged"""
+    from config.settings import settings
+    from utils.lexicon import Lexicon, create_lexicon_index
+
+    monkeypatch.setattr(settings, "LEXICON_PATH", str(tmp_path / "base.nzlx"))
+    monkeypatch.setattr(settings, "LEXICON_SOURCES", str(tmp_path / "*.txt"))
+    assert create_lexicon_index() is None
+    assert "falls back to the built-in artistic terms" in caplog.text
+
+    (tmp_path / "terms.txt").write_text("sepia 10\number\n", encoding="utf-8")
+    index = create_lexicon_index()
+    assert isinstance(index, Lexicon) and index.frequency("sepia") == 10
+    assert os.path.exists(settings.LEXICON_PATH)
@@ -0,0 +1,58 @@
+import sys
+import os
+import io
+from PIL import Image
+
+# Add project root and SDK to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "sdk", "python"))
+
+
+def test_make_test_image_is_deterministic():
+    """Test synthetic inputs are reproducible"""
+    from nanozilla.loadtest import make_test_image
+    first = make_test_image(128, "PNG", seed=3)
+    assert first == make_test_image(128, "PNG", seed=3)
+    assert Image.open(io.BytesIO(first)).size == (128, 96)
+
+
+def test_percentile():
+    """Test linear-interpolated percentiles"""
+    from nanozilla.loadtest import _percentile
+    values = [float(v) for v in range(1, 101)]
+    assert _percentile(values, 50) == 50.5
+    assert _percentile(values, 99) == 99.01
+    assert _percentile([], 95) is None
+
+
+def test_config_from_args():
+    """Test CLI arguments map onto the load test config"""
+    from nanozilla.loadtest import build_parser, config_from_args
+    args = build_parser().parse_args([
+        "--rate", "7", "--image-sizes", "256,1024", "--output-formats", "png,webp",
+        "--sim-latency-mean", "0.2", "--sim-error-rate-503", "0.1"
+    ])
+    config = config_from_args(args)
+    assert config.rate == 7
+    assert config.image_sizes == [256, 1024]
+    assert config.output_formats == ["png", "webp"]
+    assert config.simulator == {"latency_mean": 0.2, "error_rate_503": 0.1}
+
+
+def test_inprocess_load_test_report():
+    """Test a short in-process run against the simulator backend"""
+    from nanozilla.loadtest import LoadTestConfig, run_load_test
+    config = LoadTestConfig(
+        rate=20, duration=0.5, arrival="constant", endpoint="mixed",
+        image_sizes=[64], batch_sizes=[2], output_formats=["png", "jpeg"],
+        min_call_interval=0, simulator={"latency_mean": 0}
+    )
+    report = run_load_test(config)
+
+    assert report["requests"]["offered"] > 0
+    assert report["requests"]["failed"] == 0
+    assert report["latency_ms"]["p99"] >= report["latency_ms"]["p50"]
+    assert set(report["per_endpoint"]) <= {"colorize", "batch"}
+    # The in-process server shares the load generator's process
+    assert "peak_mb" in report["process_rss"] and "server_rss" not in report
@@ -0,0 +1,79 @@
+import sys
+import os
+import asyncio
+
+import httpx
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _server_pixels(data, name, content_type):
+    from benchmarks.fixtures import FixtureUpload
+    from core.image_processor import ImageProcessor
+    processed, info = ImageProcessor().process_uploaded_image(
+        FixtureUpload(data, name, content_type), auto_resize=True
+    )
+    return processed, (info['width'], info['height'])
+
+
+def test_preprocessed_upload_matches_server_result(tmp_path):
+    """Test downscaling client-side gives the server the same pixels"""
+    from benchmarks.fixtures import make_image
+    from nanozilla.preprocess import prepare_upload
+
+    path = tmp_path / "camera.png"
+    make_image(2400, 1800).save(path, format="PNG")
+
+    prepared = prepare_upload(str(path))
+    assert prepared.resized and prepared.content_type == "image/png"
+    assert prepared.bytes_saved > 0
+    assert prepared.upload_bytes == len(prepared.data)
+
+    original = _server_pixels(path.read_bytes(), "camera.png", "image/png")
+    preprocessed = _server_pixels(prepared.data, prepared.filename, prepared.content_type)
+    assert preprocessed == original
+    assert original[1] == (2048, 1536)
+
+
+def test_small_or_disabled_uploads_pass_through(tmp_path):
+    """Test originals are streamed untouched with their sniffed MIME type"""
+    from benchmarks.fixtures import make_image
+    from nanozilla.preprocess import prepare_upload
+
+    path = tmp_path / "mislabeled.jpg"
+    make_image(640, 480).save(path, format="WEBP")
+
+    for preprocess in (True, False):
+        prepared = prepare_upload(str(path), preprocess=preprocess)
+        assert prepared.data is None and not prepared.resized
+        assert prepared.content_type == "image/webp"
+        assert prepared.bytes_saved == 0
+        with prepared.open() as handle:
+            assert handle.read() == path.read_bytes()
+
+
+def test_async_client_reports_bytes_saved(tmp_path):
+    """Test the client uploads the prepared bytes and reports the savings"""
+    from benchmarks.fixtures import make_image
+    from nanozilla import AsyncNanozillaClient
+
+    path = tmp_path / "large.bmp"
+    make_image(2600, 1950).save(path, format="BMP")
+    sent = {}
+
+    def handler(request):
+        sent["body"] = request.read()
+        return httpx.Response(200, json={"success": True, "data": {}, "metadata": {}})
+
+    async def run():
+        async with AsyncNanozillaClient("key", base_url="http://api.test/v1", preprocess=True,
+                                        transport=httpx.MockTransport(handler)) as client:
+            return await client.colorize(str(path), "warm vintage tones")
+
+    response = asyncio.run(run())
+    upload = response["upload"]
+    assert upload["resized"] and upload["content_type"] == "image/png"
+    assert upload["bytes_saved"] == os.path.getsize(path) - upload["upload_bytes"]
+    assert b'filename="large.png"' in sent["body"]
+    assert len(sent["body"]) < os.path.getsize(path) // 2
@@ -0,0 +1,109 @@
+import sys
+import os
+import pstats
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def _make_client(tmp_path):
+    from core.profiling import install_profiling
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(i * i for i in range(20000))}
+
+    install_profiling(app, admin_token="secret", output_dir=str(tmp_path))
+    return TestClient(app)
+
+
+def test_profiling_disabled_by_default():
+    """Test the API server has no admin routes unless profiling is enabled"""
+    from core.api_server import NANozILLAAPI
+    paths = {route.path for route in NANozILLAAPI().app.routes}
+    assert not any(path.startswith("/api/v1/admin") for path in paths)
+
+
+def test_admin_token_required(tmp_path):
+    """Test admin routes and profiling flags require the token"""
+    client = _make_client(tmp_path)
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+
+    response = client.get("/work", headers={"X-Nanozilla-Profile": "store"})
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_request_profile_store_and_return(tmp_path):
+    """Test a single request runs under cProfile"""
+    client = _make_client(tmp_path)
+
+    response = client.get("/work?profile=store", headers=ADMIN)
+    assert response.json()["total"] > 0
+    profile_id = response.headers["X-Profile-Id"]
+
+    stored = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=ADMIN)
+    assert stored.status_code == 200
+    path = tmp_path / "downloaded.pstats"
+    path.write_bytes(stored.content)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+    returned = client.get("/work", headers={**ADMIN, "X-Nanozilla-Profile": "return"})
+    assert returned.headers["X-Profiled-Status"] == "200"
+    assert returned.headers["content-type"] == "application/octet-stream"
+
+
+def test_tracemalloc_snapshot_diff(tmp_path):
+    """Test tracemalloc snapshots can be taken and diffed"""
+    client = _make_client(tmp_path)
+    try:
+        assert client.post("/api/v1/admin/tracemalloc/snapshots", headers=ADMIN).status_code == 409
+        client.post("/api/v1/admin/tracemalloc/start", headers=ADMIN)
+
+        base = client.post("/api/v1/admin/tracemalloc/snapshots", headers=ADMIN).json()["data"]
+        ballast = [bytearray(1024) for _ in range(2000)]
+        target = client.post("/api/v1/admin/tracemalloc/snapshots", headers=ADMIN).json()["data"]
+
+        diff = client.get(
+            "/api/v1/admin/tracemalloc/diff",
+            params={"base": base["snapshot_id"], "target": target["snapshot_id"]},
+            headers=ADMIN
+        ).json()["data"]
+        assert diff["size_diff_bytes"] > 1024 * 1024
+        assert len(ballast) == 2000
+    finally:
+        client.post("/api/v1/admin/tracemalloc/stop", headers=ADMIN)
+
+
+def test_sampler_collapsed_output(tmp_path):
+    """Test the sampler aggregates stacks in collapsed format"""
+    client = _make_client(tmp_path)
+    stop = threading.Event()
+
+    def busy_worker():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_worker)
+    worker.start()
+    try:
+        client.post("/api/v1/admin/sampler/start",
+                    params={"interval": 0.005, "duration": 5}, headers=ADMIN)
+        time.sleep(0.2)
+        status = client.post("/api/v1/admin/sampler/stop", headers=ADMIN).json()["data"]
+    finally:
+        stop.set()
+        worker.join()
+
+    assert status["samples"] > 0
+    collapsed = client.get("/api/v1/admin/sampler/collapsed", headers=ADMIN).text
+    assert "busy_worker (test_profiling.py" in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
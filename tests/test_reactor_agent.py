@@ -44,3 +44,87 @@ def test_reactor_agent_initialization(mock_client):
         agent = ReactorAgent()
         assert agent.model == "test_model"
         assert agent.generation_count == 0
+
+
+def test_shared_agent_counts_concurrent_generations():
+    """Test one agent shared across threads keeps consistent statistics"""
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+    from PIL import Image
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    agent.min_call_interval = 0
+    buffer = io.BytesIO()
+    Image.effect_noise((32, 32), 40).convert('RGB').save(buffer, format='PNG')
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda _: agent.execute_colorization(buffer.getvalue(), "warm vintage tones"), range(40)
+        ))
+
+    assert all(results)
+    assert agent.get_stats()["generation_count"] == 40
+    agent.close()
+
+
+def test_chroma_transfer_sends_proxy_to_backend():
+    """Test chroma-transfer mode sends a downscaled proxy and returns a full-size result"""
+    import io
+    from PIL import Image
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    backend = SimulatorBackend(latency_mean=0)
+    sizes = []
+    generate = backend.generate
+    backend.generate = lambda image_bytes, *args, **kwargs: (
+        sizes.append(Image.open(io.BytesIO(image_bytes)).size)
+        or generate(image_bytes, *args, **kwargs)
+    )
+    agent = ReactorAgent(backend=backend)
+    agent.min_call_interval = 0
+    agent.chroma_proxy_dimension = 64
+    buffer = io.BytesIO()
+    Image.effect_noise((256, 192), 40).convert('RGB').save(buffer, format='PNG')
+
+    prompt = "warm vintage tones"
+    direct = agent.execute_colorization(buffer.getvalue(), prompt, chroma_transfer=False)
+    recomposed = agent.execute_colorization(buffer.getvalue(), prompt, chroma_transfer=True)
+
+    assert sizes == [(256, 192), (64, 48)]
+    assert Image.open(io.BytesIO(direct)).size == (256, 192)
+    assert Image.open(io.BytesIO(recomposed)).size == (256, 192)
+    assert agent.get_stats()["generation_count"] == 2
+
+
+def test_retry_honors_backend_retry_after(monkeypatch):
+    """Test a throttled call waits the backend's Retry-After (capped, jittered), not 2**attempt"""
+    import io
+    from PIL import Image
+    import core.reactor_agent as reactor_agent
+    from core.generation_backend import RateLimitError, SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    backend = SimulatorBackend(latency_mean=0)
+    retry_afters = [0.5, 600.0]
+    generate = backend.generate
+
+    def throttled(*args, **kwargs):
+        if retry_afters:
+            raise RateLimitError("RESOURCE_EXHAUSTED", retry_after=retry_afters.pop(0))
+        return generate(*args, **kwargs)
+
+    backend.generate = throttled
+    waits = []
+    monkeypatch.setattr(reactor_agent.time, "sleep", waits.append)
+    agent = ReactorAgent(backend=backend)
+    agent.min_call_interval = 0
+    buffer = io.BytesIO()
+    Image.effect_noise((64, 48), 40).convert('RGB').save(buffer, format='PNG')
+
+    agent.execute_colorization(buffer.getvalue(), "warm vintage tones", retry_attempts=3)
+    assert 0.5 <= waits[0] <= 0.55
+    assert reactor_agent.MAX_RETRY_WAIT <= waits[1] <= reactor_agent.MAX_RETRY_WAIT * 1.1
+    assert agent._retry_delay(2, RuntimeError("boom")) == 4
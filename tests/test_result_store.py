@@ -0,0 +1,71 @@
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.result_store import BoundedResultStore  # noqa: E402
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path):
+    """Test the byte budget holds and reads keep a blob alive"""
+    store = BoundedResultStore(str(tmp_path), max_bytes=250)
+    first = store.put(b"a" * 100)
+    second = store.put(b"b" * 100)
+    assert store.get(first) == b"a" * 100  # first is now the most recent
+
+    third = store.put(b"c" * 100)
+    assert first in store and third in store and second not in store
+    assert store.total_bytes == 200 and store.evictions == 1
+    with pytest.raises(FileNotFoundError):
+        store.get(second)
+
+    # A single blob over budget is kept; everything older goes
+    huge = store.put(b"d" * 1000)
+    assert huge in store and first not in store and third not in store
+
+
+def test_streamed_puts_and_recency_survive_restart(tmp_path):
+    """Test put_stream hashes like put and a reopened store evicts oldest first"""
+    store = BoundedResultStore(str(tmp_path), max_bytes=10_000)
+    streamed = store.put_stream(iter([b"x" * 50, b"y" * 50]))
+    assert streamed == store.put(b"x" * 50 + b"y" * 50)
+
+    old = store.put(b"old" * 30)
+    os.utime(store.path(old), (time.time() - 3600, time.time() - 3600))
+
+    reopened = BoundedResultStore(str(tmp_path), max_bytes=150)
+    assert reopened.total_bytes == 100
+    assert old not in reopened and streamed in reopened
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_concurrent_puts_of_one_blob_survive_eviction(tmp_path):
+    """Test storing an existing key while other threads evict it never fails or loses the blob"""
+    store = BoundedResultStore(str(tmp_path), max_bytes=300)
+    shared = b"s" * 100
+    errors = []
+
+    def writer(index):
+        try:
+            for round_ in range(300):
+                store.put(shared)
+                store.put_stream(iter([shared]))
+                store.put(f"{index}-{round_}".encode() * 20)  # forces evictions
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert store.total_bytes <= store.max_bytes
+    assert store.total_bytes == sum(os.path.getsize(os.path.join(root, name))
+                                    for root, _, names in os.walk(tmp_path) for name in names)
@@ -28,3 +28,102 @@ def test_check_style_prompt_basic():
     corrected, issues = check_style_prompt(prompt)
     assert corrected == prompt
     assert issues == []
+
+
+def test_edit_distance_counts_transpositions():
+    """Test Damerau-Levenshtein distance with early exit"""
+    from utils.spell_checker import edit_distance
+    assert edit_distance("vibrant", "vibrant", 2) == 0
+    assert edit_distance("vibrnat", "vibrant", 2) == 1
+    assert edit_distance("cinematc", "cinematic", 2) == 1
+    assert edit_distance("gothic", "baroque", 2) == 3
+
+
+def test_index_matches_brute_force():
+    """Test index lookups agree with a full vocabulary scan"""
+    from benchmarks.fixtures import make_long_prompt, make_vocabulary
+    from utils.spell_checker import SymSpellIndex, edit_distance
+
+    vocabulary = make_vocabulary(2000)
+    index = SymSpellIndex(vocabulary)
+    for word in make_long_prompt(vocabulary, 600, typo_rate=0.8).split():
+        expected = sorted(
+            (edit_distance(word, term, 2), -frequency, term)
+            for term, frequency in vocabulary.items()
+            if edit_distance(word, term, 2) <= 2
+        )[:3]
+        found = [(s.distance, -s.frequency, s.term) for s in index.lookup(word, limit=3)]
+        assert found == expected
+
+
+def test_suggestions_ranked_by_distance_then_frequency():
+    """Test closer and more frequent terms come first"""
+    from utils.spell_checker import SpellChecker
+    checker = SpellChecker({"painting": 5, "paintings": 50, "panting": 1})
+    _, issues = checker.check_prompt("paintng")
+    assert issues[0]["suggestions"] == ["painting", "paintings", "panting"]
+
+
+def test_corrections_only_touch_whole_tokens():
+    """Test corrections are applied per token, not as substrings"""
+    from utils.spell_checker import SpellChecker
+    corrected, issues = SpellChecker().check_prompt("Retroo retrooo, retroo-ish realist")
+    assert corrected == "Retro retrooo, retro-ish realistic"
+    assert [issue["original"] for issue in issues if issue["type"] == "spelling"] == [
+        "Retroo", "retroo", "realist"
+    ]
+
+
+def test_normalize_prompt():
+    """Test NFC, whitespace and all-caps normalization"""
+    from utils.spell_checker import normalize_prompt
+    assert normalize_prompt("  warm\t\tvintage \n tones ") == "warm vintage tones"
+    assert normalize_prompt("café noir") == "café noir"
+    assert normalize_prompt("WARM VINTAGE") == "warm vintage"
+    assert normalize_prompt("Warm NEON glow") == "Warm NEON glow"
+
+
+def test_check_prompt_memoized_on_normalized_prompt():
+    """Test equivalent prompts hit the LRU and counters are exposed"""
+    from utils.spell_checker import SpellChecker
+    checker = SpellChecker(cache_size=2)
+
+    first = checker.check_prompt("vibrent  aestetic colors")
+    first[1][0]["original"] = "mutated by caller"
+    second = checker.check_prompt(" vibrent aestetic\ncolors ")
+    assert second == ("vibrent aesthetic colors", [
+        {'type': 'suggestion', 'original': 'vibrent', 'suggestions': ['vibrant'],
+         'severity': 'low'},
+        {'type': 'spelling', 'original': 'aestetic', 'suggestion': 'aesthetic',
+         'severity': 'medium'},
+    ])
+
+    checker.check_prompt("retro")
+    checker.check_prompt("gothic")
+    stats = checker.get_stats()
+    assert (stats["cache_hits"], stats["cache_misses"], stats["cache_size"]) == (1, 3, 2)
+    assert stats["corrections_applied"] == 2
+    assert stats["suggestions_made"] == 2
+
+
+def test_check_prompts_dedupes_words_across_prompts(monkeypatch):
+    """Test bulk checking analyzes each distinct word once"""
+    from utils.spell_checker import SpellChecker
+    checker = SpellChecker()
+    looked_up = []
+    original = checker._suggest_corrections
+    monkeypatch.setattr(checker, "_suggest_corrections",
+                        lambda word: looked_up.append(word) or original(word))
+
+    prompts = ["vibrent tones", "Vibrent  tones", "vibrent aestetic", ""]
+    results = list(checker.check_prompts(prompts))
+
+    assert results[0] == ("vibrent tones", [
+        {'type': 'suggestion', 'original': 'vibrent', 'suggestions': ['vibrant'], 'severity': 'low'}
+    ])
+    assert results[1][0] == "Vibrent tones"
+    assert results[1][1][0]["original"] == "Vibrent"
+    assert results[2][0] == "vibrent aesthetic"
+    assert results[3] == ("", [])
+    assert sorted(looked_up) == ["tones", "vibrent"]
+    assert checker.get_stats()["cache_misses"] == 0
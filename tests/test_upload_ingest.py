@@ -0,0 +1,125 @@
+import pytest
+import sys
+import os
+import io
+import struct
+import asyncio
+import zlib
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _encode(image_format, size=(64, 48)):
+    buf = io.BytesIO()
+    Image.effect_noise(size, 40).convert('RGB').save(buf, format=image_format)
+    return buf.getvalue()
+
+
+def _png_chunk(kind, payload):
+    body = kind + payload
+    return struct.pack(">I", len(payload)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+
+def _png_header_only(width, height):
+    """PNG declaring the given size with a tiny, truncated pixel stream"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", ihdr)
+            + _png_chunk(b"IDAT", zlib.compress(b"\x00" * 64)))
+
+
+def _ingest(data, filename="upload.bin", **kwargs):
+    from core.upload_ingest import ingest_upload
+    return asyncio.run(ingest_upload(UploadFile(io.BytesIO(data), filename=filename), **kwargs))
+
+
+def test_sniff_image_format():
+    """Test magic-byte sniffing ignores the declared type"""
+    from utils.validators import sniff_image_format
+    assert sniff_image_format(_encode('JPEG')[:16]) == 'JPEG'
+    assert sniff_image_format(_encode('PNG')[:16]) == 'PNG'
+    assert sniff_image_format(_encode('WEBP')[:16]) == 'WEBP'
+    assert sniff_image_format(b'%PDF-1.7 hello') is None
+
+
+def test_ingest_detects_real_format():
+    """Test ingestion reports the sniffed format and probed dimensions"""
+    with _ingest(_encode('WEBP'), filename="photo.jpg", chunk_size=128) as upload:
+        assert upload.format == 'WEBP'
+        assert upload.type == 'image/webp'
+        assert (upload.width, upload.height) == (64, 48)
+        assert Image.open(upload).size == (64, 48)
+
+
+def test_ingest_rejects_oversized_upload():
+    """Test ingestion aborts once the size cap is crossed"""
+    from utils.validators import UploadTooLargeError
+    with pytest.raises(UploadTooLargeError):
+        _ingest(_encode('PNG'), max_bytes=100, chunk_size=64)
+
+
+def test_ingest_rejects_non_images_and_bombs():
+    """Test unknown content and oversized headers are rejected before decode"""
+    from utils.validators import UnsupportedImageError
+    with pytest.raises(UnsupportedImageError):
+        _ingest(b"%PDF-1.7" + b"0" * 200)
+    with pytest.raises(UnsupportedImageError, match="too many pixels"):
+        _ingest(_png_header_only(5000, 5000))
+    with pytest.raises(UnsupportedImageError, match="decompression limit"):
+        _ingest(_png_header_only(50000, 50000))
+    with pytest.raises(ValueError, match="too small"):
+        _ingest(_encode('PNG', size=(8, 8)))
+
+
+def test_ingest_spools_large_uploads_to_disk():
+    """Test uploads over the threshold roll over to a temp file"""
+    data = _encode('PNG', size=(256, 256))
+    with _ingest(data, spool_threshold=1024) as upload:
+        assert upload.spooled_to_disk
+        assert upload.getvalue() == data
+    with _ingest(data, spool_threshold=len(data) + 1) as upload:
+        assert not upload.spooled_to_disk
+
+
+def test_api_maps_ingest_errors_to_status_codes():
+    """Test the colorize endpoint answers 413 and 415"""
+    from fastapi.testclient import TestClient
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+    from config.settings import settings
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    client = TestClient(api.app)
+    form = {"style_prompt": "warm vintage colors"}
+
+    response = client.post("/api/v1/colorize", data=form,
+                           files={"image": ("doc.jpg", b"%PDF-1.7" + b"0" * 200, "image/jpeg")})
+    assert response.status_code == 415
+
+    oversized = b"\x89PNG\r\n\x1a\n" + b"0" * settings.MAX_IMAGE_SIZE
+    response = client.post("/api/v1/colorize", data=form,
+                           files={"image": ("big.png", oversized, "image/png")})
+    assert response.status_code == 413
+
+
+def test_api_caps_chunked_bodies_without_content_length(monkeypatch):
+    """Test a chunked body is cut off with 413 once it crosses the cap, before multipart parsing"""
+    from fastapi.testclient import TestClient
+    from core.api_server import NANozILLAAPI
+    from config.settings import settings
+
+    monkeypatch.setattr(settings, "MAX_REQUEST_SIZE", 64 * 1024)
+
+    def body():
+        for _ in range(64):
+            yield b"0" * 16 * 1024
+
+    client = TestClient(NANozILLAAPI().app)
+    response = client.post("/api/v1/colorize", content=body(),
+                           headers={"Content-Type": "multipart/form-data; boundary=x"})
+    assert response.status_code == 413
+    assert response.json()["error"]["message"] == "Request body too large"
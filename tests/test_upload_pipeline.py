@@ -0,0 +1,77 @@
+import sys
+import os
+import io
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_upload  # noqa: E402
+from core.image_processor import ImageProcessor  # noqa: E402
+from core.upload_pipeline import SpeculativePreprocessor  # noqa: E402
+
+
+def test_preprocessing_is_cached_by_content():
+    """Test the same bytes under a new upload id reuse the finished work"""
+    preprocessor = SpeculativePreprocessor(ImageProcessor(), max_workers=1, max_entries=1)
+    data = make_upload(256, "JPEG")
+
+    try:
+        first = preprocessor.submit("upload-1", data).result(10)
+        again = preprocessor.submit("upload-2", data).result(10)
+        preprocessor.submit("upload-3", make_upload(128, "PNG")).result(10)
+    finally:
+        preprocessor.shutdown(wait=True)
+
+    assert again is first
+    assert first.image_info["color_analysis"]["color_mode"]
+    info = preprocessor.cache_info()
+    assert (info["entries"], info["cache_hits"], info["completed"]) == (1, 1, 2)
+
+
+def test_replaced_upload_is_cancelled():
+    """Test queued work never starts and running work stops at a step boundary"""
+    preprocessor = SpeculativePreprocessor(ImageProcessor(), max_workers=1)
+    try:
+        running = preprocessor.submit("big", make_upload(2048, "PNG"))
+        stale = preprocessor.submit("stale", make_upload(256, "PNG"))
+        stale.cancel()
+        assert running.result(30) is not None
+        assert stale.future.cancelled()
+    finally:
+        preprocessor.shutdown(wait=True)
+
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(CancelledError):
+        ImageProcessor().prepare_upload(io.BytesIO(make_upload(64, "PNG")), cancelled=cancelled)
+
+
+def test_generation_waits_for_pending_preprocessing():
+    """Test a generation submitted mid-preprocessing reports the preprocess stage when it lands"""
+    import time
+    from core.generation_backend import SimulatorBackend
+    from core.generation_tasks import GenerationExecutor
+    from core.reactor_agent import ReactorAgent
+
+    agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    agent.min_call_interval = 0
+    preprocessor = SpeculativePreprocessor(ImageProcessor(), max_workers=1)
+    executor = GenerationExecutor(agent, max_workers=1)
+
+    try:
+        handle = preprocessor.submit("upload", make_upload(1024, "JPEG"))
+        task = executor.submit(handle.future, "warm vintage tones")
+        deadline = time.time() + 30
+        while not task.done and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        executor.shutdown(wait=True)
+        preprocessor.shutdown(wait=True)
+
+    assert task.result and task.error is None
+    assert [event["stage"] for event in task.events] == ["queued", "preprocess", "api_call", "done"]
+    assert task.events[1]["data"] == {"width": 1024, "height": 768}
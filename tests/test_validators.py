@@ -25,3 +25,50 @@ def test_validate_prompt_empty():
     from utils.validators import validate_prompt
     with pytest.raises(ValueError, match="Prompt cannot be empty"):
         validate_prompt("")
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/a.png", "http://10.1.2.3/a.png", "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/a.png", "http://[::ffff:192.168.0.1]/a.png", "http://0.0.0.0/a.png",
+])
+def test_validate_blob_url_rejects_private_addresses(url, monkeypatch):
+    """Test blob URLs resolving to internal addresses are refused"""
+    from config.settings import settings
+    from utils.validators import UnsafeURLError, validate_blob_url
+    monkeypatch.setattr(settings, "ALLOW_PRIVATE_URLS", False)
+    with pytest.raises(UnsafeURLError):
+        validate_blob_url(url)
+
+
+def test_validate_blob_url_allowlist(monkeypatch):
+    """Test MANIFEST_ALLOWED_HOSTS limits blob URLs to the listed hosts"""
+    from config.settings import settings
+    from utils.validators import UnsafeURLError, validate_blob_url
+    monkeypatch.setattr(settings, "MANIFEST_ALLOWED_HOSTS", ["blobs.example.com"])
+    with pytest.raises(UnsafeURLError, match="not allowed"):
+        validate_blob_url("https://8.8.8.8/a.png")
+
+
+def test_outbound_request_guard_checks_redirect_hops():
+    """Test the request hook refuses a redirect onto a disallowed host"""
+    import asyncio
+    import httpx
+    from utils.validators import UnsafeURLError, outbound_request_guard
+
+    def validate(url):
+        if httpx.URL(url).host == "internal.test":
+            raise UnsafeURLError("internal")
+
+    def handler(request):
+        if request.url.host == "public.test":
+            return httpx.Response(302, headers={"Location": "http://internal.test/secret"})
+        return httpx.Response(200, content=b"secret")
+
+    async def fetch():
+        hooks = {"request": [outbound_request_guard(validate)]}
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True,
+                                     event_hooks=hooks) as client:
+            await client.get("http://public.test/a.png")
+
+    with pytest.raises(UnsafeURLError):
+        asyncio.run(fetch())
@@ -0,0 +1,203 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings  # noqa: E402
+from core.webhooks import (  # noqa: E402
+    SIGNATURE_HEADER, WebhookDispatcher, sign_payload, verify_signature
+)
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture(autouse=True)
+def allow_loopback_receivers(monkeypatch):
+    """StandInReceiver listens on 127.0.0.1, which the URL policy refuses by default"""
+    monkeypatch.setattr(settings, "ALLOW_PRIVATE_URLS", True)
+
+
+class StandInReceiver:
+    """Local HTTP server recording webhook POSTs and answering with scripted statuses"""
+
+    def __init__(self, statuses=(), delay=0.0):
+        self.requests = []
+        self.statuses = list(statuses)
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((dict(self.headers), body))
+                time.sleep(delay)
+                status = receiver.statuses.pop(0) if receiver.statuses else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hooks"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def events(self):
+        return [event for _, body in self.requests for event in json.loads(body)["events"]]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _dispatcher(tmp_path, **kwargs):
+    options = {"backoff_base": 0.01, "linger": 0.01}
+    options.update(kwargs)
+    return WebhookDispatcher(SECRET, str(tmp_path / "webhooks.sqlite3"), **options)
+
+
+def test_signature_round_trip():
+    """Test signatures verify, and tampered or stale ones do not"""
+    header = sign_payload(SECRET, b'{"events": []}')
+    assert verify_signature(SECRET, b'{"events": []}', header)
+    assert not verify_signature(SECRET, b'{"events": [1]}', header)
+    assert not verify_signature("other", b'{"events": []}', header)
+    stale = sign_payload(SECRET, b'{"events": []}', 1000)
+    assert not verify_signature(SECRET, b'{"events": []}', stale)
+
+
+def test_events_are_signed_and_coalesced_per_destination(tmp_path):
+    """Test events queued while a delivery is in flight share the next POST"""
+    receiver = StandInReceiver(delay=0.2)
+    dispatcher = _dispatcher(tmp_path)
+
+    async def scenario():
+        dispatcher.enqueue(receiver.url, "job.completed", {"job_id": "batch_0"})
+        await asyncio.sleep(0.1)  # first POST is now in flight
+        for i in range(1, 6):
+            dispatcher.enqueue(receiver.url, "job.completed", {"job_id": f"batch_{i}"})
+        assert await dispatcher.drain(5)
+        await dispatcher.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        receiver.close()
+
+    assert len(receiver.requests) == 2
+    job_ids = [event["data"]["job_id"] for event in receiver.events()]
+    assert job_ids == [f"batch_{i}" for i in range(6)]
+    for headers, body in receiver.requests:
+        assert verify_signature(SECRET, body, headers[SIGNATURE_HEADER])
+    assert dispatcher.stats["delivered"] == 6
+
+
+def test_failed_deliveries_retry_then_dead_letter(tmp_path):
+    """Test 5xx is retried, and exhausted or refused payloads are dead-lettered"""
+    flaky = StandInReceiver(statuses=[503, 500])
+    down = StandInReceiver(statuses=[500, 500, 500])
+    refusing = StandInReceiver(statuses=[410])
+    dispatcher = _dispatcher(tmp_path, max_attempts=3)
+
+    async def scenario():
+        dispatcher.enqueue(flaky.url, "job.completed", {"job_id": "a"})
+        dispatcher.enqueue(down.url, "job.completed", {"job_id": "b"})
+        dispatcher.enqueue(refusing.url, "job.failed", {"job_id": "c"})
+        assert await dispatcher.drain(5)
+        await dispatcher.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        for receiver in (flaky, down, refusing):
+            receiver.close()
+
+    assert (len(flaky.requests), len(down.requests), len(refusing.requests)) == (3, 3, 1)
+    dead = {letter["url"]: letter for letter in dispatcher.dead_letters()}
+    assert set(dead) == {down.url, refusing.url}
+    assert (dead[down.url]["attempts"], dead[down.url]["last_error"]) == (3, "HTTP 500")
+    assert dead[refusing.url]["events"][0]["data"] == {"job_id": "c"}
+    assert dispatcher.stats["delivered"] == 1
+
+
+def test_batch_callback_url_receives_completion_event(tmp_path, monkeypatch):
+    """Test a batch submitted with callback_url POSTs its signed completion event"""
+    import io
+    from PIL import Image
+    from fastapi.testclient import TestClient
+    from core.api_server import NANozILLAAPI
+    from core.generation_backend import SimulatorBackend
+    from core.reactor_agent import ReactorAgent
+
+    api = NANozILLAAPI()
+    api.reactor_agent = ReactorAgent(backend=SimulatorBackend(latency_mean=0))
+    api.reactor_agent.min_call_interval = 0
+    api.webhooks = _dispatcher(tmp_path)
+    receiver = StandInReceiver()
+    upload = io.BytesIO()
+    Image.effect_noise((64, 48), 40).convert('RGB').save(upload, format='PNG')
+
+    try:
+        with TestClient(api.app) as client:
+            response = client.post(
+                "/api/v1/colorize/batch",
+                data={"style_prompt": "warm vintage tones", "callback_url": receiver.url},
+                files=[("images", ("scan.png", upload.getvalue(), "image/png"))]
+            )
+            assert response.status_code == 200
+            bad = client.post(
+                "/api/v1/colorize/batch",
+                data={"style_prompt": "warm vintage tones", "callback_url": "ftp://example.com/x"},
+                files=[("images", ("scan.png", upload.getvalue(), "image/png"))]
+            )
+            assert bad.status_code == 400
+            monkeypatch.setattr(settings, "ALLOW_PRIVATE_URLS", False)
+            internal = client.post(
+                "/api/v1/colorize/batch",
+                data={"style_prompt": "warm vintage tones",
+                      "callback_url": "http://169.254.169.254/hooks"},
+                files=[("images", ("scan.png", upload.getvalue(), "image/png"))]
+            )
+            assert internal.status_code == 400
+            monkeypatch.setattr(settings, "ALLOW_PRIVATE_URLS", True)
+        # Leaving the client runs the shutdown handler, which drains the dispatcher
+    finally:
+        receiver.close()
+
+    [event] = receiver.events()
+    assert event["type"] == "job.completed"
+    assert event["data"]["job_id"] == response.json()["data"]["job_id"]
+    assert event["data"]["succeeded"] == 1 and "results" not in event["data"]
+
+
+def test_private_destinations_and_unexpected_errors_are_dead_lettered(tmp_path, monkeypatch):
+    """Test a private callback is refused at delivery time and a crashing POST loses no events"""
+    dispatcher = _dispatcher(tmp_path)
+
+    async def crash(url, body):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        dispatcher.enqueue("http://127.0.0.1:9/hooks", "job.completed", {"job_id": "a"})
+        assert await dispatcher.drain(5)
+        monkeypatch.setattr(dispatcher, "_post", crash)
+        dispatcher.enqueue("http://hooks.example.com/x", "job.completed", {"job_id": "b"})
+        assert await dispatcher.drain(5)
+        await dispatcher.aclose()
+
+    monkeypatch.setattr(settings, "ALLOW_PRIVATE_URLS", False)
+    asyncio.run(scenario())
+
+    dead = {letter["url"]: letter for letter in dispatcher.dead_letters()}
+    assert "non-public address" in dead["http://127.0.0.1:9/hooks"]["last_error"]
+    assert dead["http://127.0.0.1:9/hooks"]["attempts"] == 1
+    assert dead["http://hooks.example.com/x"]["last_error"] == "RuntimeError: boom"
+    assert dispatcher.stats["dead_lettered"] == 2
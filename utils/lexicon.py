@@ -0,0 +1,405 @@
+"""
+Compact, memory-mapped spell-check lexicons
+
+A lexicon file holds a sorted string table of terms with frequencies and a
+precomputed deletion index (see SymSpellIndex), laid out as flat arrays:
+
+    header | term offsets (u32) | frequencies (u32) |
+    delete hashes (u64, sorted) | delete term ids (u32) | UTF-8 term blob
+
+The file is opened with mmap and read through zero-copy numpy views, so
+loading is O(1) and the pages are shared read-only by every worker process
+that maps the same file.
+
+Build one from plain word lists ("term" or "term frequency" per line):
+
+    python -m utils.lexicon build data/lexicon/base.nzlx data/lexicon/*.txt
+
+A missing or outdated base lexicon is compiled from LEXICON_SOURCES the
+first time a spell checker needs it.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+
+import numpy as np
+
+from config.settings import settings
+from utils.spell_checker import SymSpellIndex, Suggestion, delete_variants
+
+MAGIC = b'NZLX'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBIQ')  # magic, version, max distance, prefix length, terms, deletes
+TENANT_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_hash(delete: str) -> int:
+    """Stable 64-bit hash; Python's hash() is salted per process"""
+    return int.from_bytes(hashlib.blake2b(delete.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(term_count: int, delete_count: int) -> Dict[str, int]:
+    """Byte offset of every section, each aligned to 8 bytes"""
+    offsets = {}
+    position = _align(HEADER.size)
+    for section, size in (
+        ('term_offsets', 4 * (term_count + 1)),
+        ('frequencies', 4 * term_count),
+        ('delete_hashes', 8 * delete_count),
+        ('delete_terms', 4 * delete_count),
+    ):
+        offsets[section] = position
+        position = _align(position + size)
+    offsets['blob'] = position
+    return offsets
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+
+def read_word_list(path: str) -> Dict[str, int]:
+    """
+    Parse a word list: one term per line with an optional frequency
+
+    Blank lines and '#' comments are skipped, terms are lowercased and
+    duplicate terms have their frequencies summed.
+    """
+    vocabulary: Dict[str, int] = {}
+    with open(path, encoding='utf-8') as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) > 2:
+                raise ValueError(f"{path}:{line_number}: expected 'term [frequency]'")
+            term = parts[0].lower()
+            frequency = int(parts[1]) if len(parts) == 2 else 1
+            vocabulary[term] = vocabulary.get(term, 0) + frequency
+    return vocabulary
+
+
+def build_lexicon(
+    vocabulary: Dict[str, int],
+    output_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 7
+) -> Dict[str, int]:
+    """
+    Compile a term -> frequency map into a lexicon file
+
+    The file is written next to output_path and renamed into place, so
+    processes that already mapped the old file keep a consistent view.
+
+    Returns:
+        Summary with term and delete counts and the file size
+    """
+    merged: Dict[str, int] = {}
+    for term, frequency in vocabulary.items():
+        merged[term.lower()] = merged.get(term.lower(), 0) + frequency
+    terms = sorted(merged, key=lambda t: t.encode('utf-8'))
+
+    encoded = [term.encode('utf-8') for term in terms]
+    term_offsets = np.zeros(len(terms) + 1, dtype='<u4')
+    np.cumsum([len(data) for data in encoded], out=term_offsets[1:])
+    frequencies = np.array([min(merged[term], 0xffffffff) for term in terms], dtype='<u4')
+
+    hashes: List[int] = []
+    term_ids: List[int] = []
+    for term_id, term in enumerate(terms):
+        for delete in delete_variants(term[:prefix_length], max_edit_distance):
+            hashes.append(_delete_hash(delete))
+            term_ids.append(term_id)
+
+    delete_hashes = np.array(hashes, dtype='<u8')
+    order = np.argsort(delete_hashes, kind='stable')
+    delete_hashes = delete_hashes[order]
+    delete_terms = np.array(term_ids, dtype='<u4')[order]
+
+    layout = _layout(len(terms), len(delete_hashes))
+    temp_path = f"{output_path}.tmp{os.getpid()}"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(temp_path, 'wb') as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, max_edit_distance, prefix_length,
+                                 len(terms), len(delete_hashes)))
+        for section, array in (
+            ('term_offsets', term_offsets),
+            ('frequencies', frequencies),
+            ('delete_hashes', delete_hashes),
+            ('delete_terms', delete_terms),
+        ):
+            handle.write(b'\0' * (layout[section] - handle.tell()))
+            handle.write(array.tobytes())
+        handle.write(b'\0' * (layout['blob'] - handle.tell()))
+        handle.write(b''.join(encoded))
+    os.replace(temp_path, output_path)
+
+    return {
+        'terms': len(terms),
+        'deletes': len(delete_hashes),
+        'bytes': os.path.getsize(output_path),
+    }
+
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+
+class Lexicon(SymSpellIndex):
+    """
+    Read-only SymSpellIndex backed by a memory-mapped lexicon file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, max_edit_distance, prefix_length, term_count, delete_count = \
+                HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} lexicon file")
+
+            layout = _layout(term_count, delete_count)
+            self.max_edit_distance = max_edit_distance
+            self.prefix_length = prefix_length
+            view = self._mmap
+            self._term_offsets = np.frombuffer(view, '<u4', term_count + 1, layout['term_offsets'])
+            self._frequencies = np.frombuffer(view, '<u4', term_count, layout['frequencies'])
+            self._delete_hashes = np.frombuffer(view, '<u8', delete_count, layout['delete_hashes'])
+            self._delete_terms = np.frombuffer(view, '<u4', delete_count, layout['delete_terms'])
+            self._blob_start = layout['blob']
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __contains__(self, term: str) -> bool:
+        return self._find(term.lower()) is not None
+
+    def __len__(self) -> int:
+        return len(self._frequencies)
+
+    def add(self, term: str, frequency: int = 1):
+        raise TypeError("Lexicon files are read-only; rebuild them with build_lexicon")
+
+    def frequency(self, term: str) -> int:
+        term_id = self._find(term.lower())
+        return 0 if term_id is None else int(self._frequencies[term_id])
+
+    def term(self, term_id: int) -> str:
+        start = self._blob_start + int(self._term_offsets[term_id])
+        end = self._blob_start + int(self._term_offsets[term_id + 1])
+        return self._mmap[start:end].decode('utf-8')
+
+    def close(self):
+        # Drop the numpy views first: mmap refuses to close while exported
+        self._term_offsets = self._frequencies = None
+        self._delete_hashes = self._delete_terms = None
+        self._mmap.close()
+
+    def _find(self, term: str) -> Optional[int]:
+        """Binary search of the sorted string table"""
+        target = term.encode('utf-8')
+        low, high = 0, len(self._frequencies)
+        while low < high:
+            middle = (low + high) // 2
+            start = self._blob_start + int(self._term_offsets[middle])
+            end = self._blob_start + int(self._term_offsets[middle + 1])
+            current = self._mmap[start:end]
+            if current == target:
+                return middle
+            if current < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _terms_under(self, delete: str) -> Sequence[str]:
+        key = np.uint64(_delete_hash(delete))
+        start = int(np.searchsorted(self._delete_hashes, key, side='left'))
+        end = int(np.searchsorted(self._delete_hashes, key, side='right'))
+        # Hash collisions only add candidates; lookup() verifies every one
+        return [self.term(int(term_id)) for term_id in self._delete_terms[start:end]]
+
+
+class LexiconChain:
+    """
+    Several indexes queried as one, e.g. a tenant lexicon over the base one
+
+    Frequencies of terms present in more than one index are summed.
+    """
+
+    def __init__(self, indexes: Sequence[SymSpellIndex]):
+        self.indexes = list(indexes)
+        self.max_edit_distance = max(index.max_edit_distance for index in self.indexes)
+
+    def __contains__(self, term: str) -> bool:
+        return any(term in index for index in self.indexes)
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.indexes)
+
+    def frequency(self, term: str) -> int:
+        return sum(index.frequency(term) for index in self.indexes)
+
+    def lookup(self, word: str, max_edit_distance: Optional[int] = None,
+               limit: int = 3) -> List[Suggestion]:
+        # Rank only after summing frequencies: a term below the cut in every
+        # single index can still come out on top once merged
+        merged: Dict[str, Suggestion] = {}
+        for index in self.indexes:
+            for suggestion in index.lookup(word, max_edit_distance, limit=len(index)):
+                previous = merged.get(suggestion.term)
+                if previous is None:
+                    merged[suggestion.term] = suggestion
+                else:
+                    merged[suggestion.term] = previous._replace(
+                        frequency=previous.frequency + suggestion.frequency)
+        ranked = sorted(merged.values(), key=lambda s: (s.distance, -s.frequency, s.term))
+        return ranked[:limit]
+
+
+_loaded: Dict[str, Lexicon] = {}
+
+
+def load_lexicon(path: str) -> Lexicon:
+    """Map a lexicon file once per process and reuse it"""
+    path = os.path.abspath(path)
+    if path not in _loaded:
+        _loaded[path] = Lexicon(path)
+    return _loaded[path]
+
+
+def tenant_lexicon_path(tenant: str) -> str:
+    """Path of a tenant's lexicon under TENANT_LEXICON_DIR"""
+    if not TENANT_PATTERN.match(tenant):
+        raise ValueError(f"Invalid tenant id: {tenant!r}")
+    return os.path.join(settings.TENANT_LEXICON_DIR, f"{tenant}.nzlx")
+
+
+def ensure_base_lexicon() -> Optional[str]:
+    """
+    Path of the base lexicon, compiling it from LEXICON_SOURCES when it is
+    missing or older than one of its word lists
+
+    Returns:
+        LEXICON_PATH, or None when it cannot be found or built
+    """
+    path = settings.LEXICON_PATH
+    if not path:
+        return None
+    sources = sorted(glob.glob(settings.LEXICON_SOURCES)) if settings.LEXICON_SOURCES else []
+    built_at = os.path.getmtime(path) if os.path.exists(path) else None
+    if built_at is not None and all(os.path.getmtime(source) <= built_at for source in sources):
+        return path
+    if not sources:
+        logger.warning("No lexicon at %s and no word lists match %s; spell checking falls back to "
+                       "the built-in artistic terms", path, settings.LEXICON_SOURCES)
+        return None
+
+    try:
+        vocabulary: Dict[str, int] = {}
+        for source in sources:
+            for term, frequency in read_word_list(source).items():
+                vocabulary[term] = vocabulary.get(term, 0) + frequency
+        summary = build_lexicon(vocabulary, path)
+    except (OSError, ValueError) as e:
+        if built_at is not None:
+            logger.warning("Could not rebuild lexicon %s (%s); using the existing file", path, e)
+            return path
+        logger.warning("Could not build lexicon %s (%s); spell checking falls back to the built-in "
+                       "artistic terms", path, e)
+        return None
+    _loaded.pop(os.path.abspath(path), None)
+    logger.info("Built lexicon %s from %d word lists (%d terms)",
+                path, len(sources), summary['terms'])
+    return path
+
+
+def create_lexicon_index(tenant: Optional[str] = None):
+    """
+    Index for a spell checker: base lexicon plus the tenant's, if present
+
+    Returns:
+        Lexicon, LexiconChain, or None when no lexicon file has been built
+    """
+    indexes = []
+    if tenant:
+        path = tenant_lexicon_path(tenant)
+        if os.path.exists(path):
+            indexes.append(load_lexicon(path))
+    base_path = ensure_base_lexicon()
+    if base_path:
+        indexes.append(load_lexicon(base_path))
+
+    if not indexes:
+        return None
+    return indexes[0] if len(indexes) == 1 else LexiconChain(indexes)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m utils.lexicon",
+                                     description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Compile word lists into a lexicon file")
+    build.add_argument("output")
+    build.add_argument("word_lists", nargs="+")
+    build.add_argument("--max-edit-distance", type=int, default=2)
+    build.add_argument("--prefix-length", type=int, default=7)
+
+    info = commands.add_parser("info", help="Show lexicon file statistics")
+    info.add_argument("path")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "build":
+        vocabulary: Dict[str, int] = {}
+        for path in args.word_lists:
+            for term, frequency in read_word_list(path).items():
+                vocabulary[term] = vocabulary.get(term, 0) + frequency
+        summary = build_lexicon(vocabulary, args.output, args.max_edit_distance, args.prefix_length)
+        print(json.dumps({"written": args.output, **summary}))
+        return 0
+
+    lexicon = Lexicon(args.path)
+    print(json.dumps({
+        "path": args.path,
+        "terms": len(lexicon),
+        "max_edit_distance": lexicon.max_edit_distance,
+        "prefix_length": lexicon.prefix_length,
+        "bytes": os.path.getsize(args.path),
+    }))
+    lexicon.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
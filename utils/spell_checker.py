@@ -1,11 +1,169 @@
 import streamlit as st
-from typing import List, Tuple, Dict
+from functools import lru_cache
+from typing import (
+    Callable, Iterable, Iterator, List, Tuple, Dict, NamedTuple, Optional, Sequence, Set
+)
+import os
 import re
+import unicodedata
+
+from config.settings import settings
+
+
+TOKEN_PATTERN = re.compile(r'\b[a-zA-Z]+\b')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical form of a prompt, usable as a cache key by any layer
+
+    Applies Unicode NFC, collapses whitespace runs to single spaces, strips
+    the ends and lowercases prompts written entirely in capitals. Mixed-case
+    prompts keep their casing, since corrections preserve capitalization.
+    """
+    prompt = unicodedata.normalize('NFC', prompt)
+    prompt = WHITESPACE_PATTERN.sub(' ', prompt).strip()
+    if prompt.isupper():
+        prompt = prompt.lower()
+    return prompt
+
+
+class Suggestion(NamedTuple):
+    term: str
+    distance: int
+    frequency: int
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance with early exit
+
+    Returns:
+        The distance, or max_distance + 1 once it is known to exceed max_distance
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        row_min = i
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1
+                    and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+
+    distance = previous[-1]
+    return distance if distance <= max_distance else max_distance + 1
+
+
+def delete_variants(word: str, max_edit_distance: int) -> Set[str]:
+    """All strings obtained by deleting up to max_edit_distance characters"""
+    variants = {word}
+    level = {word}
+    for _ in range(max_edit_distance):
+        level = {w[:i] + w[i + 1:] for w in level for i in range(len(w))}
+        variants |= level
+    return variants
+
+
+class SymSpellIndex:
+    """
+    Deletion-neighborhood index for fast edit-distance lookups
+
+    Every term is stored under all strings obtained by deleting up to
+    max_edit_distance characters from its first prefix_length characters.
+    A lookup generates the same deletes for the input word and only
+    verifies the terms found under them, so its cost does not grow with
+    the vocabulary size.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], max_edit_distance: int = 2,
+                 prefix_length: int = 7):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.frequencies: Dict[str, int] = {}
+        self.deletes: Dict[str, List[str]] = {}
+
+        for term, frequency in vocabulary.items():
+            self.add(term, frequency)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.frequencies
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def add(self, term: str, frequency: int = 1):
+        """Add a term, or raise its frequency if already indexed"""
+        term = term.lower()
+        if term in self.frequencies:
+            self.frequencies[term] += frequency
+            return
+
+        self.frequencies[term] = frequency
+        for delete in delete_variants(term[:self.prefix_length], self.max_edit_distance):
+            self.deletes.setdefault(delete, []).append(term)
+
+    def lookup(self, word: str, max_edit_distance: Optional[int] = None,
+               limit: int = 3) -> List[Suggestion]:
+        """
+        Find indexed terms within max_edit_distance of word
+
+        Returns:
+            Up to limit suggestions ordered by distance, then frequency
+        """
+        if max_edit_distance is None:
+            max_edit_distance = self.max_edit_distance
+        max_edit_distance = min(max_edit_distance, self.max_edit_distance)
+        word = word.lower()
+
+        prefix = word[:self.prefix_length]
+        candidates = [prefix]
+        seen_deletes = {prefix}
+        seen_terms = set()
+        found = []
+
+        # Breadth-first over deletes of the input prefix
+        for candidate in candidates:
+            for term in self._terms_under(candidate):
+                if term in seen_terms:
+                    continue
+                seen_terms.add(term)
+                distance = edit_distance(word, term, max_edit_distance)
+                if distance <= max_edit_distance:
+                    found.append(Suggestion(term, distance, self.frequency(term)))
+
+            if len(prefix) - len(candidate) < max_edit_distance:
+                for i in range(len(candidate)):
+                    delete = candidate[:i] + candidate[i + 1:]
+                    if delete not in seen_deletes:
+                        seen_deletes.add(delete)
+                        candidates.append(delete)
+
+        found.sort(key=lambda s: (s.distance, -s.frequency, s.term))
+        return found[:limit]
+
+    def frequency(self, term: str) -> int:
+        """Frequency of an indexed term, 0 if unknown"""
+        return self.frequencies.get(term, 0)
+
+    def _terms_under(self, delete: str) -> Sequence[str]:
+        return self.deletes.get(delete, ())
 
 
 class SpellChecker:
     """
-    Basic spell checker for style prompts with artistic terminology support
+    Spell checker for style prompts with artistic terminology support
     """
 
     # Common artistic and color-related words that might be misspelled
@@ -47,7 +205,28 @@ class SpellChecker:
         'romantik': 'romantic'
     }
 
-    def __init__(self):
+    def __init__(
+        self,
+        vocabulary: Optional[Dict[str, int]] = None,
+        max_edit_distance: int = 2,
+        index=None,
+        cache_size: Optional[int] = None
+    ):
+        """
+        Args:
+            vocabulary: Term -> frequency map; defaults to ARTISTIC_TERMS
+            max_edit_distance: Largest edit distance considered for suggestions
+            index: Prebuilt index (e.g. a memory-mapped Lexicon); overrides vocabulary
+            cache_size: Normalized prompts whose results are memoized (LRU)
+        """
+        if cache_size is None:
+            cache_size = settings.SPELL_CHECK_CACHE_SIZE
+        if index is None:
+            if vocabulary is None:
+                vocabulary = {term: 1 for term in self.ARTISTIC_TERMS}
+            index = SymSpellIndex(vocabulary, max_edit_distance=max_edit_distance)
+        self.index = index
+        self._check_cached = lru_cache(maxsize=cache_size)(self._check_normalized)
         self.suggestions_made = 0
         self.corrections_applied = 0
 
@@ -55,29 +234,85 @@ class SpellChecker:
         """
         Check prompt for common spelling mistakes and provide suggestions
 
+        The prompt is normalized first (see normalize_prompt), and results
+        are memoized per normalized prompt.
+
         Returns:
             Tuple of (corrected_prompt, list_of_issues)
         """
         if not prompt:
             return prompt, []
 
+        corrected_prompt, issues = self._check_cached(normalize_prompt(prompt))
+        issues = [dict(issue) for issue in issues]  # memoized results are shared
+
+        corrections_made = sum(1 for issue in issues if issue['type'] == 'spelling')
+        self.suggestions_made += len(issues) - corrections_made
+        if corrections_made:
+            self.corrections_applied += 1
+            st.info(f"✏️ Auto-corrected {corrections_made} words")
+
+        return corrected_prompt, issues
+
+    def check_prompts(self, prompts: Iterable[str]) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Check many prompts in one pass, yielding results in input order
+
+        Repeated prompts and words shared between prompts are only analyzed
+        once per call. The LRU is bypassed so bulk input does not evict the
+        interactive entries.
+        """
+        word_outcomes: Dict[str, Optional[Tuple]] = {}
+        prompt_results: Dict[str, Tuple[str, Tuple[Dict, ...]]] = {}
+
+        def outcome(word: str):
+            if word not in word_outcomes:
+                word_outcomes[word] = self._word_outcome(word)
+            return word_outcomes[word]
+
+        for prompt in prompts:
+            if not prompt:
+                yield prompt, []
+                continue
+
+            normalized = normalize_prompt(prompt)
+            if normalized not in prompt_results:
+                prompt_results[normalized] = self._check_tokens(normalized, outcome)
+            corrected_prompt, issues = prompt_results[normalized]
+
+            issues = [dict(issue) for issue in issues]
+            corrections_made = sum(1 for issue in issues if issue['type'] == 'spelling')
+            self.suggestions_made += len(issues) - corrections_made
+            if corrections_made:
+                self.corrections_applied += 1
+            yield corrected_prompt, issues
+
+    def _check_normalized(self, prompt: str) -> Tuple[str, Tuple[Dict, ...]]:
+        """Pure spell check of a normalized prompt (memoized per instance)"""
+        return self._check_tokens(prompt, self._word_outcome)
+
+    def _check_tokens(
+        self, prompt: str, outcome: Callable[[str], Optional[Tuple]]
+    ) -> Tuple[str, Tuple[Dict, ...]]:
         issues = []
-        words = re.findall(r'\b[a-zA-Z]+\b', prompt.lower())
-        original_words = re.findall(r'\b[a-zA-Z]+\b', prompt)
+        pieces = []
+        position = 0
 
-        corrected_prompt = prompt
-        corrections_made = []
+        for match in TOKEN_PATTERN.finditer(prompt):
+            original_word = match.group()
+            result = outcome(original_word.lower())
+            if result is None:
+                continue
 
-        for i, (word, original_word) in enumerate(zip(words, original_words)):
-            # Check for common corrections
-            if word in self.COMMON_CORRECTIONS:
-                correction = self.COMMON_CORRECTIONS[word]
+            kind, value = result
+            if kind == 'spelling':
+                correction = value
                 if original_word[0].isupper():
                     correction = correction.capitalize()
 
-                # Replace in prompt (preserving case)
-                corrected_prompt = corrected_prompt.replace(original_word, correction)
-                corrections_made.append((original_word, correction))
+                pieces.append(prompt[position:match.start()])
+                pieces.append(correction)
+                position = match.end()
 
                 issues.append({
                     'type': 'spelling',
@@ -85,43 +320,46 @@ class SpellChecker:
                     'suggestion': correction,
                     'severity': 'medium'
                 })
+            else:
+                issues.append({
+                    'type': 'suggestion',
+                    'original': original_word,
+                    'suggestions': list(value),
+                    'severity': 'low'
+                })
 
-            # Check for artistic terms with close matches
-            elif len(word) > 4:  # Only check longer words
-                suggestions = self._suggest_corrections(word)
-                if suggestions:
-                    issues.append({
-                        'type': 'suggestion',
-                        'original': original_word,
-                        'suggestions': suggestions,
-                        'severity': 'low'
-                    })
-
-        if corrections_made:
-            self.corrections_applied += 1
-            st.info(f"✏️ Auto-corrected {len(corrections_made)} words")
+        if not pieces:
+            return prompt, tuple(issues)
 
-        return corrected_prompt, issues
+        pieces.append(prompt[position:])
+        return ''.join(pieces), tuple(issues)
 
-    def _suggest_corrections(self, word: str) -> List[str]:
-        """
-        Suggest corrections for potentially misspelled words
+    def _word_outcome(self, word: str) -> Optional[Tuple]:
         """
-        suggestions = []
+        Classify a lowercased word
 
-        for term in self.ARTISTIC_TERMS:
-            if self._similarity(word, term) > 0.7:
-                suggestions.append(term)
+        Returns:
+            ('spelling', correction), ('suggestion', suggestions) or None
+        """
+        # Check for common corrections
+        if word in self.COMMON_CORRECTIONS:
+            return 'spelling', self.COMMON_CORRECTIONS[word]
 
-        return suggestions[:3]  # Return top 3 suggestions
+        # Check for artistic terms with close matches
+        if len(word) > 4 and word not in self.index:  # Only check longer words
+            suggestions = self._suggest_corrections(word)
+            if suggestions:
+                return 'suggestion', tuple(suggestions)
+        return None
 
-    def _similarity(self, word1: str, word2: str) -> float:
+    def _suggest_corrections(self, word: str) -> List[str]:
         """
-        Calculate simple similarity between two words
+        Suggest vocabulary terms within edit distance of a word
+
+        Short words tolerate fewer edits so they do not match unrelated terms.
         """
-        # Simple character-based similarity
-        common_chars = set(word1) & set(word2)
-        return len(common_chars) / max(len(set(word1)), len(set(word2)))
+        max_distance = max(1, len(word) // 3)
+        return [suggestion.term for suggestion in self.index.lookup(word, max_distance, limit=3)]
 
     def display_spelling_issues(self, issues: List[Dict]):
         """
@@ -146,24 +384,48 @@ class SpellChecker:
         """
         Get spell checker statistics
         """
+        cache = self._check_cached.cache_info()
         return {
             'suggestions_made': self.suggestions_made,
-            'corrections_applied': self.corrections_applied
+            'corrections_applied': self.corrections_applied,
+            'cache_hits': cache.hits,
+            'cache_misses': cache.misses,
+            'cache_size': cache.currsize
         }
 
 
+_checkers: Dict[Optional[str], SpellChecker] = {}
+
+
+def get_spell_checker(tenant: Optional[str] = None) -> SpellChecker:
+    """
+    Shared spell checker for a tenant (None for the default)
+
+    Uses the compiled lexicon files when they exist and falls back to the
+    built-in ARTISTIC_TERMS otherwise.
+    """
+    from utils.lexicon import create_lexicon_index, tenant_lexicon_path
+
+    if tenant is not None and not os.path.exists(tenant_lexicon_path(tenant)):
+        tenant = None  # tenants without a lexicon share the default checker
+    if tenant not in _checkers:
+        _checkers[tenant] = SpellChecker(index=create_lexicon_index(tenant))
+    return _checkers[tenant]
+
+
 # Global instance
-spell_checker = SpellChecker()
+spell_checker = get_spell_checker()
 
 
-def check_style_prompt(prompt: str) -> Tuple[str, List[Dict]]:
+def check_style_prompt(prompt: str, tenant: Optional[str] = None) -> Tuple[str, List[Dict]]:
     """
     Check style prompt for spelling issues
 
     Returns:
         Tuple of (corrected_prompt, issues_list)
     """
-    return spell_checker.check_prompt(prompt)
+    checker = spell_checker if tenant is None else get_spell_checker(tenant)
+    return checker.check_prompt(prompt)
 
 
 def display_spelling_help():
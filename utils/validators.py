@@ -1,4 +1,69 @@
 from config.settings import settings
+from typing import Iterable, Optional, Sequence
+from urllib.parse import urlsplit
+import asyncio
+import ipaddress
+import socket
+
+
+class UploadTooLargeError(ValueError):
+    """Upload exceeds MAX_IMAGE_SIZE"""
+
+
+class UnsupportedImageError(ValueError):
+    """Upload is not an image in an allowed format"""
+
+
+class UnsafeURLError(ValueError):
+    """URL points at a host the server must not contact"""
+
+
+# Magic bytes of the formats we can identify, mapped to Pillow format names
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'BM', 'BMP'),
+)
+
+FORMAT_MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+    'GIF': 'image/gif',
+    'BMP': 'image/bmp',
+}
+
+ALLOWED_UPLOAD_FORMATS = ('JPEG', 'PNG', 'WEBP')
+
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """
+    Detect the real image format from the first bytes of a file
+
+    Returns:
+        Pillow format name ('JPEG', 'PNG', 'WEBP', ...) or None if unknown
+    """
+    if len(header) >= 12 and header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    for signature, image_format in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    return None
+
+
+def validate_image_dimensions(width: int, height: int):
+    """Validate image dimensions against configured limits"""
+    if width < settings.MIN_DIMENSION or height < settings.MIN_DIMENSION:
+        raise ValueError(
+            f"Image too small ({width}x{height}). Min dimension: {settings.MIN_DIMENSION}px"
+        )
+
+    if width > settings.MAX_DIMENSION or height > settings.MAX_DIMENSION:
+        raise ValueError(
+            f"Image too large ({width}x{height}). Max dimension: {settings.MAX_DIMENSION}px"
+        )
 
 
 def validate_image(uploaded_file):
@@ -7,11 +72,16 @@ def validate_image(uploaded_file):
         raise ValueError("No file uploaded")
 
     if uploaded_file.size > settings.MAX_IMAGE_SIZE:
-        raise ValueError(f"File too large. Max size: {settings.MAX_IMAGE_SIZE // (1024*1024)}MB")
+        raise UploadTooLargeError(
+            f"File too large. Max size: {settings.MAX_IMAGE_SIZE // (1024*1024)}MB"
+        )
 
     allowed_types = ['image/jpeg', 'image/png', 'image/jpg', 'image/webp']
     if uploaded_file.type not in allowed_types:
-        raise ValueError(f"Unsupported file type. Allowed: {', '.join(allowed_types)}")
+        raise UnsupportedImageError(f"Unsupported file type. Allowed: {', '.join(allowed_types)}")
+
+    if sniff_image_format(uploaded_file.getvalue()[:16]) not in ALLOWED_UPLOAD_FORMATS:
+        raise UnsupportedImageError("File content is not a JPEG, PNG or WEBP image")
 
 
 def validate_prompt(prompt):
@@ -21,3 +91,86 @@ def validate_prompt(prompt):
 
     if len(prompt) > settings.MAX_PROMPT_LENGTH:
         raise ValueError(f"Prompt too long. Max {settings.MAX_PROMPT_LENGTH} characters")
+
+
+def validate_http_url(url, label="URL"):
+    """Validate an absolute http or https URL"""
+    if len(url) > settings.MAX_CALLBACK_URL_LENGTH:
+        raise ValueError(f"{label} too long. Max {settings.MAX_CALLBACK_URL_LENGTH} characters")
+
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"{label} must be an absolute http or https URL")
+
+
+def check_public_host(hostname, port=None, label="URL"):
+    """
+    Resolve a host and refuse it unless every address is publicly routable
+
+    Skipped when ALLOW_PRIVATE_URLS is set (local development only).
+
+    Raises:
+        UnsafeURLError: The host does not resolve, or resolves to a private,
+            loopback, link-local, reserved, multicast or unspecified address
+    """
+    if settings.ALLOW_PRIVATE_URLS:
+        return
+
+    try:
+        infos = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise UnsafeURLError(f"{label} host does not resolve: {hostname}")
+
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split('%')[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise UnsafeURLError(f"{label} host resolves to a non-public address: {hostname}")
+
+
+def validate_outbound_url(url, label="URL", allowed_hosts: Sequence[str] = ()):
+    """
+    Validate a URL the server itself will request
+
+    It must be absolute http or https, name one of allowed_hosts when that
+    list is non-empty, and resolve only to public addresses.
+    """
+    validate_http_url(url, label)
+    parts = urlsplit(url)
+    if allowed_hosts and parts.hostname.lower() not in allowed_hosts:
+        raise UnsafeURLError(f"{label} host is not allowed: {parts.hostname}")
+    check_public_host(parts.hostname, parts.port, label)
+
+
+def validate_callback_url(url):
+    """Validate a webhook callback URL (public http or https)"""
+    validate_outbound_url(url, "Callback URL")
+
+
+def validate_blob_url(url):
+    """Validate a manifest blob URL (public http or https, on MANIFEST_ALLOWED_HOSTS if set)"""
+    validate_outbound_url(url, "Blob URL", settings.MANIFEST_ALLOWED_HOSTS)
+
+
+def validate_blob_urls(urls: Iterable[str]):
+    """Validate manifest blob URLs, resolving each distinct host only once"""
+    checked = set()
+    for url in urls:
+        validate_http_url(url, "Blob URL")
+        parts = urlsplit(url)
+        if (parts.hostname, parts.port) not in checked:
+            validate_blob_url(url)
+            checked.add((parts.hostname, parts.port))
+
+
+def outbound_request_guard(validate):
+    """
+    httpx request event hook applying validate to every request it sends
+
+    httpx runs request hooks for each redirect hop too, so a public URL
+    cannot redirect the server onto an internal address.
+    """
+    async def guard(request):
+        await asyncio.to_thread(validate, str(request.url))
+    return guard